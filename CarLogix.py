@@ -1,167 +1,62 @@
+from __future__ import annotations
+
 import flet as ft
 from flet import icons, colors
-import openpyxl
-from openpyxl import Workbook
-from datetime import datetime, timedelta
+from flet.core.protocol import CommandEncoder
+import asyncio
+import json
+from datetime import date, datetime
 import re
 import os
-import pandas as pd
-from dataclasses import dataclass
-from typing import List, Optional
-import tkinter as tk
-from tkinter import filedialog
-from reportlab.lib import colors as pdf_colors
-from reportlab.lib.pagesizes import landscape, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
-from reportlab.lib.units import inch
-import subprocess
-from pydantic import BaseModel, ValidationError, validator
-
-@dataclass
-class Vehicle:
-    id: int
-    immatriculation: str
-    code_carte: str
-    societe_proprietaire: str
-    site: str
-    utilisateur: str
-    marque: str
-    vehicule: str
-    modele: str
-    date_mise_en_service: str
-    crit_air: str
-    carburant: str
-    type_huile: str
-    fluide_dispo: str
-    releve_kms: str
-    date_derniere_revision: str
-    derniere_revision: str
-    periodicite_revision: str
-    prochain_ct: str
-    double_clef: str
-    numero_scelle: str
-    statut: str
-
-class VehicleModel(BaseModel):
-    id: Optional[int] = None
-    immatriculation: str
-    code_carte: str
-    societe_proprietaire: str
-    site: str
-    utilisateur: str
-    marque: str
-    vehicule: str
-    modele: str
-    date_mise_en_service: str
-    crit_air: str
-    carburant: str
-    type_huile: str
-    fluide_dispo: str
-    releve_kms: str
-    date_derniere_revision: str
-    derniere_revision: str
-    periodicite_revision: str
-    prochain_ct: str
-    double_clef: str
-    numero_scelle: str
-    statut: str
-
-    ('immatriculation')
-    def validate_immatriculation(cls, value):
-        if not re.match(r'^[A-Za-z]{2}-\d{3}-[A-Za-z]{2}$', value):
-            raise ValueError('L\'immatriculation doit être sous format AB-123-CD')
-        return value
-
-    ('code_carte')
-    def validate_code_carte(cls, value):
-        if not re.match(r'^\d{4}$', value):
-            raise ValueError('Le code carte doit contenir 4 chiffres')
-        return value
-
-    ('releve_kms', 'derniere_revision', 'numero_scelle')
-    def validate_numeric(cls, value):
-        if not re.match(r'^\d+$', value):
-            raise ValueError('Ce champ doit contenir uniquement des chiffres')
-        return value
-
-class VehicleRepository:
-    def __init__(self, file_path="CarLogix_DATA.xlsx"):
-        self.file_path = file_path
-        if not os.path.exists(self.file_path):
-            self.create_excel_file()
-
-    def create_excel_file(self):
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Vehicules"
-        ws.append([
-            "ID", "Immatriculation", "Code Carte", "Société Propriétaire", "Site", "Utilisateur",
-            "Marque", "Véhicule", "Modèle", "Date de mise en service", "CRIT AIR", "Carburant",
-            "Type Huile", "Fluide Dispo", "Relevé KMS", "Date Dernière Révision",
-            "Dernière Révision", "Périodicité Révision", "Prochain C.T.", "Double de clef", "N° Scellé du double", "Statut",
-        ])
-        wb.save(self.file_path)
-
-    def fetch_all_vehicles(self) -> List[Vehicle]:
-        wb = openpyxl.load_workbook(self.file_path)
-        ws = wb.active
-        vehicles = []
-        for row in ws.iter_rows(min_row=2, values_only=True):
-            vehicles.append(Vehicle(*row))
-        return vehicles
-
-    def add_vehicle(self, vehicle: VehicleModel) -> int:
-        wb = openpyxl.load_workbook(self.file_path)
-        ws = wb.active
-        last_id = ws.max_row - 1
-        new_id = last_id + 1
-        ws.append([
-            new_id, vehicle.immatriculation, vehicle.code_carte, vehicle.societe_proprietaire, vehicle.site,
-            vehicle.utilisateur, vehicle.marque, vehicle.vehicule, vehicle.modele, vehicle.date_mise_en_service,
-            vehicle.crit_air, vehicle.carburant, vehicle.type_huile, vehicle.fluide_dispo, vehicle.releve_kms,
-            vehicle.date_derniere_revision, vehicle.derniere_revision, vehicle.periodicite_revision,
-            vehicle.prochain_ct, vehicle.double_clef, vehicle.numero_scelle, vehicle.statut
-        ])
-        wb.save(self.file_path)
-        return new_id
-
-    def update_vehicle(self, vehicle: VehicleModel):
-        wb = openpyxl.load_workbook(self.file_path)
-        ws = wb.active
-        for row in ws.iter_rows(min_row=2):
-            if row[0].value == vehicle.id:
-                row[1].value = vehicle.immatriculation
-                row[2].value = vehicle.code_carte
-                row[3].value = vehicle.societe_proprietaire
-                row[4].value = vehicle.site
-                row[5].value = vehicle.utilisateur
-                row[6].value = vehicle.marque
-                row[7].value = vehicle.vehicule
-                row[8].value = vehicle.modele
-                row[9].value = vehicle.date_mise_en_service
-                row[10].value = vehicle.crit_air
-                row[11].value = vehicle.carburant
-                row[12].value = vehicle.type_huile
-                row[13].value = vehicle.fluide_dispo
-                row[14].value = vehicle.releve_kms
-                row[15].value = vehicle.date_derniere_revision
-                row[16].value = vehicle.derniere_revision
-                row[17].value = vehicle.periodicite_revision
-                row[18].value = vehicle.prochain_ct
-                row[19].value = vehicle.double_clef
-                row[20].value = vehicle.numero_scelle
-                row[21].value = vehicle.statut
-                break
-        wb.save(self.file_path)
-
-    def delete_vehicle(self, id: int):
-        wb = openpyxl.load_workbook(self.file_path)
-        ws = wb.active
-        for row in ws.iter_rows(min_row=2):
-            if row[0].value == id:
-                ws.delete_rows(row[0].row)
-                break
-        wb.save(self.file_path)
+import multiprocessing
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+from carlogix.core import (
+    CHANGE_ADDED, CHANGE_DELETED, CHANGE_UPDATED, EXPORT_DONE, EXPORT_FAILED, EXPORT_FORMATS, EXPORT_HEADERS, EXPORT_RUNNING, PDF_DEFAULT_COLUMNS, PDF_SECTION_FIELDS,
+    METRICS, METRICS_PORT, SEVERITY_OVERDUE, SEVERITY_WARNING, VEHICLE_FIELDS, AlertThresholds, AsyncVehicleRepository, ExportJob,
+    FleetAlerts, FleetColumns, FleetSnapshot, ImportReport, PdfReportOptions, StaleVehicleError, Vehicle, VehicleRepository,
+    VehicleChange, VehicleSearchIndex, compute_fleet_alerts, compute_fleet_snapshot, format_date, format_field,
+    import_vehicles, shared_async_repository, shared_export_worker, shared_metrics_server, shared_repository, timed,
+    vehicle_model,
+)
+
+# Interface Flet : une couche mince sur carlogix.core. Les dépendances
+# lourdes sont chargées à la demande (benchmarks/startup_benchmark.py).
+
+# Sujet page.pubsub des changements de la flotte (VehicleChange)
+VEHICLES_TOPIC = "vehicules"
+
+# Dépôts déjà relayés vers page.pubsub : id(dépôt) -> désabonnement
+_pubsub_relays: Dict[int, Callable[[], None]] = {}
+_pubsub_relays_lock = threading.Lock()
+
+
+def start_metrics_server():
+    """
+    Métriques Prometheus sur http://127.0.0.1:<port>/metrics, un serveur par
+    processus (CARLOGIX_METRICS_PORT, et CARLOGIX_METRICS_HOST pour les
+    exposer sur une autre interface). Lève OSError si le port est pris.
+    """
+    return shared_metrics_server(
+        int(os.environ.get("CARLOGIX_METRICS_PORT", METRICS_PORT)),
+        os.environ.get("CARLOGIX_METRICS_HOST", "127.0.0.1"),
+    )
+
+
+def relay_repository_changes(page: ft.Page, vehicle_repository: VehicleRepository):
+    """
+    Publie les changements du dépôt sur page.pubsub, une seule fois par dépôt :
+    le hub pubsub est commun à toutes les sessions de l'application.
+    """
+    with _pubsub_relays_lock:
+        if id(vehicle_repository) not in _pubsub_relays:
+            pubsub = page.pubsub
+            _pubsub_relays[id(vehicle_repository)] = vehicle_repository.subscribe(
+                lambda change: pubsub.send_all_on_topic(VEHICLES_TOPIC, change)
+            )
+
 
 class VehicleManagementApp:
     FIELD_WIDTH = 200
@@ -175,15 +70,78 @@ class VehicleManagementApp:
     DOUBLE_CLE_OPTIONS = ["Oui", "Non"]
     SOCIETE_PROPRIETAIRE_OPTIONS = ["JIVAGO", "ARVAL"]
 
-    def __init__(self, page: ft.Page, vehicle_repository: VehicleRepository):
+    MAX_REPORTED_REJECTS = 500
+
+    STATUS_COLORS = {
+        "En service": colors.GREEN,
+        "En maintenance": colors.ORANGE,
+        "Hors service": colors.RED,
+        "En attente": colors.BLUE,
+    }
+
+    SEVERITY_COLORS = {
+        SEVERITY_WARNING: colors.ORANGE,
+        SEVERITY_OVERDUE: colors.RED,
+    }
+
+    # Liste des véhicules : cartes construites par page au défilement, dans
+    # la limite d'un nombre total de contrôles affichés et d'une taille du
+    # message envoyé au navigateur pour chaque page (JSON des commandes Flet)
+    VEHICLES_PAGE_SIZE = 50
+    MAX_RENDERED_CONTROLS = 5000
+    MAX_PAGE_UPDATE_BYTES = 128 * 1024
+    SCROLL_LOAD_THRESHOLD = 300
+
+    def __init__(self, page: ft.Page, vehicle_repository: VehicleRepository,
+                 async_repository: Optional[AsyncVehicleRepository] = None):
         self.page = page
         self.page.title = "CarLogix"
         self.page.icon = "assets/icon.png"
         self.page.theme_mode = ft.ThemeMode.LIGHT
         self.page.padding = 0
         self.vehicle_repository = vehicle_repository
+        # Les gestionnaires async attendent le dépôt sans occuper de thread Flet
+        self.async_repository = async_repository or shared_async_repository(vehicle_repository)
+        # Pool d'exports du processus ; les exports de la session sont annulés à sa fermeture
+        self.export_worker = shared_export_worker()
+        self._export_jobs: Dict[int, ExportJob] = {}
+        self.alert_thresholds = AlertThresholds()
+        self._alerts: Optional[FleetAlerts] = None
+        self._alerts_key = None
+        self._snapshot: Optional[FleetSnapshot] = None
+        self._snapshot_key = None
+        self._displayed_snapshot: Optional[FleetSnapshot] = None
         self.setup_page()
         self.error_style = ft.TextStyle(color="red")
+        # Changements faits par les autres sessions (et par celle-ci, déjà appliqués)
+        self.page.pubsub.subscribe_topic(VEHICLES_TOPIC, self._on_vehicle_change)
+        self.page.on_close = self._on_session_close
+
+    def _update_page(self, *controls: ft.Control):
+        # Envoi des modifications au navigateur, mesuré comme les chemins
+        # critiques (paramètres > Diagnostics) ; controls : ceux à envoyer, sinon la page
+        with METRICS.measure("page.update"):
+            self.page.update(*controls)
+
+    def _on_session_close(self, e):
+        for job in list(self._export_jobs.values()):
+            job.cancel()
+
+    def _on_vehicle_change(self, topic: str, change: VehicleChange):
+        """
+        Applique un changement publié par le dépôt : seule la carte concernée
+        et les compteurs du tableau de bord sont mis à jour.
+        """
+        if change.kind == CHANGE_ADDED:
+            self._on_vehicle_added(change.vehicle_id)
+        elif change.kind == CHANGE_UPDATED:
+            self._on_vehicle_updated(change.vehicle_id)
+        elif change.kind == CHANGE_DELETED:
+            self._on_vehicle_deleted(change.vehicle_id)
+        else:
+            self.update_vehicles_list(self.search_field.value or "")
+        self._refresh_stats_if_visible()
+        self._update_page()
 
     def create_date_picker(self, label: str, hint_text: str = "JJ/MM/AAAA", value: Optional[str] = None) -> ft.Container:
         date_picker = ft.DatePicker(
@@ -203,7 +161,7 @@ class VehicleManagementApp:
         def date_changed(e):
             if date_picker.value:
                 text_field.value = date_picker.value.strftime('%d/%m/%Y')
-                text_field.update()
+                self._update_page(text_field)
 
         date_picker.on_change = date_changed
 
@@ -223,7 +181,7 @@ class VehicleManagementApp:
         )
 
         self.page.controls.append(date_picker)
-        self.page.update()
+        self._update_page()
 
         return container
 
@@ -262,7 +220,7 @@ class VehicleManagementApp:
 
         if current_value != cleaned_value:
             e.control.value = cleaned_value
-            e.control.update()
+            self._update_page(e.control)
 
     def setup_page(self):
         self.search_field = ft.TextField(
@@ -312,13 +270,27 @@ class VehicleManagementApp:
             on_change=self.change_tab
         )
 
+        # Rempli une fois la fenêtre affichée : le chargement de la flotte
+        # (et de pandas) ne retarde pas le premier affichage
         self.stats_view = ft.Container(
-            content=self.create_stats_view(),
+            content=ft.ProgressRing(),
             padding=20,
         )
 
-        self.vehicles_view = ft.ListView(spacing=10, padding=20, auto_scroll=True)
-        self.update_vehicles_list()
+        self.vehicle_results: List[int] = []
+        self.window_start = 0
+        self.window_end = 0
+        self.vehicles_footer: Optional[ft.Control] = None
+        self.vehicle_cards: Dict[int, ft.Card] = {}
+        self.controls_per_card: Optional[int] = None
+        # Plus grande taille moyenne d'une carte sérialisée, mesurée à chaque page
+        self.bytes_per_card: Optional[int] = None
+        self.vehicles_view = ft.ListView(
+            spacing=10,
+            padding=20,
+            on_scroll=self.on_vehicles_scroll,
+            on_scroll_interval=100,
+        )
 
         self.main_content = ft.Container(
             content=self.stats_view,
@@ -336,41 +308,56 @@ class VehicleManagementApp:
             )
         )
 
+        self.stats_view.content = self.create_stats_view()
+        self.update_vehicles_list()
+
+    def fleet_snapshot(self) -> FleetSnapshot:
+        # Version relevée avant la lecture : une écriture concurrente ne fait
+        # que rendre la clé obsolète, et le calcul est refait à l'appel suivant
+        key = (self.vehicle_repository.version, date.today())
+        snapshot = self._snapshot
+        if snapshot is None or self._snapshot_key != key:
+            fleet = self.vehicle_repository.fleet_columns()
+            alerts = self._alerts if self._alerts_key == key else self._compute_fleet_alerts(fleet, key)
+            snapshot = compute_fleet_snapshot(
+                fleet, alerts, key[0],
+                self.vehicle_repository.revision_projection(
+                    fleet, revision_interval_days=self.alert_thresholds.revision_interval_days
+                ),
+            )
+            self._snapshot = snapshot
+            self._snapshot_key = key
+        return snapshot
+
+    def refresh_stats_view(self):
+        # Ne reconstruit les cartes que si la flotte a changé depuis le dernier affichage
+        if self.fleet_snapshot() is not self._displayed_snapshot:
+            self.stats_view.content = self.create_stats_view()
+
+    def _refresh_stats_if_visible(self):
+        if self.main_content.content is self.stats_view:
+            self.refresh_stats_view()
+
+    async def _refresh_stats_if_visible_async(self):
+        # Statistiques calculées dans le pool de lecture, vue reconstruite sur la boucle
+        if self.main_content.content is self.stats_view:
+            await self.async_repository.run_in_reader(self.fleet_snapshot)
+            self.refresh_stats_view()
+
+    @timed("ui.create_stats_view")
     def create_stats_view(self):
-        vehicles = self.vehicle_repository.fetch_all_vehicles()
-        if not vehicles:
+        snapshot = self.fleet_snapshot()
+        self._displayed_snapshot = snapshot
+        if not snapshot.total_vehicles:
             return ft.Text("Aucun véhicule disponible.", size=20, color=colors.RED, weight=ft.FontWeight.BOLD)
 
-        total_kms = sum(int(vehicle.releve_kms) for vehicle in vehicles if isinstance(vehicle.releve_kms, (int, float)))
-        total_vehicles = len(vehicles)
-        avg_kms = total_kms / total_vehicles if total_vehicles > 0 else 0
-
-        avg_monthly_kms = avg_kms / 12
-        avg_co2_emission = 110  # Placeholder value
-        avg_age = 15  # Placeholder value
-
-        vehicle_data = [vars(vehicle) for vehicle in vehicles]
-        if vehicle_data:
-            marque_distribution = pd.DataFrame(vehicle_data)["marque"].value_counts(normalize=True) * 100
-            carburant_distribution = pd.DataFrame(vehicle_data)["carburant"].value_counts(normalize=True) * 100
-            societe_distribution = pd.DataFrame(vehicle_data)["societe_proprietaire"].value_counts(normalize=True) * 100
-            site_distribution = pd.DataFrame(vehicle_data)["site"].value_counts()
-        else:
-            marque_distribution = pd.Series(dtype=float)
-            carburant_distribution = pd.Series(dtype=float)
-            societe_distribution = pd.Series(dtype=float)
-            site_distribution = pd.Series(dtype=float)
-
-        maintenance_count = self.calculate_maintenance_count()
-        ct_count = self.calculate_ct_count()
-
         return ft.Column([
             ft.Row([
                 ft.Card(
                     content=ft.Container(
                         content=ft.Column([
                             ft.Text("Nombre de véhicules", size=18, weight=ft.FontWeight.BOLD),
-                            ft.Text(f"{total_vehicles} véhicules", size=15),
+                            ft.Text(f"{snapshot.total_vehicles} véhicules", size=15),
                         ]),
                         padding=20,
                     ),
@@ -381,7 +368,7 @@ class VehicleManagementApp:
                     content=ft.Container(
                         content=ft.Column([
                             ft.Text("Répartition par marque", size=18, weight=ft.FontWeight.BOLD),
-                            ft.Text("\n".join([f"{marque}: {percent:.2f}%" for marque, percent in marque_distribution.items()]), size=15),
+                            ft.Text("\n".join([f"{marque}: {percent:.2f}%" for marque, percent in snapshot.marque_distribution.items()]), size=15),
                         ]),
                         padding=20,
                     ),
@@ -392,7 +379,7 @@ class VehicleManagementApp:
                     content=ft.Container(
                         content=ft.Column([
                             ft.Text("Répartition par carburant", size=18, weight=ft.FontWeight.BOLD),
-                            ft.Text("\n".join([f"{carburant}: {percent:.2f}%" for carburant, percent in carburant_distribution.items()]), size=14),
+                            ft.Text("\n".join([f"{carburant}: {percent:.2f}%" for carburant, percent in snapshot.carburant_distribution.items()]), size=14),
                         ]),
                         padding=20,
                     ),
@@ -403,7 +390,7 @@ class VehicleManagementApp:
                     content=ft.Container(
                         content=ft.Column([
                             ft.Text("Répartition par société", size=18, weight=ft.FontWeight.BOLD),
-                            ft.Text("\n".join([f"{societe_distribution}: {percent:.2f}%" for societe_distribution, percent in societe_distribution.items()]), size=14),
+                            ft.Text("\n".join([f"{societe}: {percent:.2f}%" for societe, percent in snapshot.societe_distribution.items()]), size=14),
                         ]),
                         padding=20,
                     ),
@@ -414,7 +401,7 @@ class VehicleManagementApp:
                     content=ft.Container(
                         content=ft.Column([
                             ft.Text("Répartition par site", size=18, weight=ft.FontWeight.BOLD),
-                            ft.Text("\n".join([f"{site}: {count}" for site, count in site_distribution.items()]),size=12),
+                            ft.Text("\n".join([f"{site}: {count}" for site, count in snapshot.site_distribution.items()]),size=12),
                         ]),
                         padding=20,
                     ),
@@ -425,7 +412,7 @@ class VehicleManagementApp:
                     content=ft.Container(
                         content=ft.Column([
                             ft.Text("Véhicules nécessitant un entretien", size=18, weight=ft.FontWeight.BOLD),
-                            ft.Text(f"{maintenance_count} véhicules", size=15),
+                            ft.Text(f"{snapshot.maintenance_count} véhicules", size=15),
                         ]),
                         padding=20,
                     ),
@@ -436,7 +423,7 @@ class VehicleManagementApp:
                     content=ft.Container(
                         content=ft.Column([
                             ft.Text("Véhicules nécessitant un contrôle technique", size=18, weight=ft.FontWeight.BOLD),
-                            ft.Text(f"{ct_count} véhicules", size=15),
+                            ft.Text(f"{snapshot.ct_count} véhicules", size=15),
                         ]),
                         padding=20,
                     ),
@@ -448,8 +435,9 @@ class VehicleManagementApp:
                 ft.Card(
                     content=ft.Container(
                         content=ft.Column([
-                            ft.Text("Véhicules nécessitant un contrôle technique", size=18, weight=ft.FontWeight.BOLD),
-                            ft.Text(f"{ct_count} véhicules", size=15),
+                            ft.Text("Kilométrage moyen", size=18, weight=ft.FontWeight.BOLD),
+                            ft.Text(f"{snapshot.avg_kms:,.0f} km".replace(",", " "), size=15),
+                            ft.Text(f"Total : {snapshot.total_kms:,} km".replace(",", " "), size=12),
                         ]),
                         padding=20,
                     ),
@@ -459,89 +447,280 @@ class VehicleManagementApp:
                 ft.Card(
                     content=ft.Container(
                         content=ft.Column([
-                            ft.Text("Véhicules nécessitant un contrôle technique", size=18, weight=ft.FontWeight.BOLD),
-                            ft.Text(f"{ct_count} véhicules", size=15),
+                            ft.Text("Kilométrage mensuel moyen", size=18, weight=ft.FontWeight.BOLD),
+                            ft.Text(f"{snapshot.avg_monthly_kms:,.0f} km".replace(",", " "), size=15),
                         ]),
                         padding=20,
                     ),
                     width=200,
                     height=220,
                 ),
-
             ], spacing=20),
         ], spacing=20)
 
+    @timed("ui.update_vehicles_list")
     def update_vehicles_list(self, search_text: str = ""):
-        vehicles = self.vehicle_repository.fetch_all_vehicles()
-        status_colors = {
-            "En service": colors.GREEN,
-            "En maintenance": colors.ORANGE,
-            "Hors service": colors.RED,
-            "En attente": colors.BLUE,
-        }
+        self.vehicle_results = self.vehicle_repository.search_vehicle_ids(search_text)
+        self._show_vehicles_window(0)
+
+    async def _show_vehicles_window_async(self, start: int):
+        """
+        _show_vehicles_window pour les gestionnaires asynchrones : la première
+        page est lue dans le pool de lecture, pas sur la boucle.
+        """
+        page_ids = self.vehicle_results[start:start + min(self.vehicles_page_size(), self.max_rendered_vehicles())]
+        self._show_vehicles_window(start, await self.async_repository.get_vehicles(page_ids))
 
+    @timed("ui.show_vehicles_window")
+    def _show_vehicles_window(self, start: int, vehicles: Optional[Dict[int, Vehicle]] = None):
+        """
+        Affiche la liste à partir du résultat n° start. Seule une fenêtre de
+        résultats est construite ; la suite est chargée au défilement.
+        vehicles : véhicules de la première page, s'ils sont déjà lus.
+        """
+        self.window_start = start
+        self.window_end = start
         self.vehicles_view.controls.clear()
+        self.vehicle_cards.clear()
+        if start > 0:
+            self.vehicles_view.controls.append(
+                ft.TextButton(
+                    "Afficher les véhicules précédents",
+                    icon=ft.icons.EXPAND_LESS,
+                    on_click=lambda _: self._show_vehicles_window(max(0, start - self.max_rendered_vehicles())),
+                )
+            )
+        self._append_vehicles_page(vehicles)
+        self._update_page()
+
+    def _append_vehicles_page(self, vehicles: Optional[Dict[int, Vehicle]] = None):
+        controls = self.vehicles_view.controls
+        if controls and controls[-1] is self.vehicles_footer:
+            controls.pop()
+
+        window_limit = self.window_start + self.max_rendered_vehicles()
+        end = min(self.window_end + self.vehicles_page_size(), len(self.vehicle_results), window_limit)
+        if vehicles is None:
+            vehicles = self.vehicle_repository.get_vehicles(self.vehicle_results[self.window_end:end])
+        position = self.window_end
+        page_cards = []
+        while position < end:
+            vehicle = vehicles.get(self.vehicle_results[position])
+            if vehicle is None:
+                # supprimé depuis la recherche (autre session) : retiré des résultats
+                del self.vehicle_results[position]
+                end -= 1
+                continue
+            vehicle_card = self._build_vehicle_card(vehicle)
+            self.vehicle_cards[vehicle.id] = vehicle_card
+            controls.append(vehicle_card)
+            page_cards.append(vehicle_card)
+            position += 1
+        self.window_end = position
+        self._measure_page_payload(page_cards)
+        self._refresh_vehicles_footer()
+
+    def _measure_page_payload(self, cards: List[ft.Control]):
+        # Taille des commandes d'ajout de la page, sérialisées comme par Flet :
+        # les pages suivantes sont réduites si les cartes dépassent la taille prévue
+        if not cards:
+            return
+        commands = [command for card in cards for command in card._build_add_commands()]
+        size = len(json.dumps(commands, cls=CommandEncoder, separators=(",", ":")).encode())
+        self.bytes_per_card = max(self.bytes_per_card or 0, -(-size // len(cards)))
+
+    def _refresh_vehicles_footer(self):
+        controls = self.vehicles_view.controls
+        if controls and controls[-1] is self.vehicles_footer:
+            controls.pop()
+
+        self.vehicles_footer = None
+        if self.window_end < len(self.vehicle_results):
+            window_full = self.window_end >= self.window_start + self.max_rendered_vehicles()
+            self.vehicles_footer = ft.Row(
+                [
+                    ft.Text(f"Véhicules {self.window_start + 1} à {self.window_end} sur {len(self.vehicle_results)}", size=12),
+                    ft.TextButton(
+                        "Afficher les véhicules suivants" if window_full else "Afficher plus",
+                        icon=ft.icons.EXPAND_MORE,
+                        on_click=self._show_next_vehicles,
+                    ),
+                ],
+                alignment=ft.MainAxisAlignment.CENTER,
+            )
+            controls.append(self.vehicles_footer)
 
-        for vehicle in vehicles:
-            if search_text.lower() in f"{vehicle.immatriculation} {vehicle.marque} {vehicle.vehicule} {vehicle.utilisateur} {vehicle.site}".lower():
-                status_color = status_colors.get(vehicle.statut, colors.GREY)
+    def _vehicles_list_visible(self) -> bool:
+        return self.main_content.content is self.vehicles_view
 
-                vehicle_card = ft.Card(
-                    content=ft.Container(
-                        content=ft.Column([
-                            ft.ListTile(
-                                leading=ft.Icon(icons.DIRECTIONS_CAR, size=40, color=colors.BLUE),
-                                height=60,
-                                title=ft.Text(
-                                    f"{vehicle.marque} {vehicle.vehicule} // {vehicle.immatriculation} ",
-                                    size=20,
+    def _on_vehicle_added(self, vehicle_id: int):
+        self._show_added_vehicle(self.vehicle_repository.get_vehicle(vehicle_id))
+
+    def _show_added_vehicle(self, vehicle: Optional[Vehicle]):
+        """
+        Insère la carte d'un nouveau véhicule si elle tombe dans la fenêtre affichée.
+        """
+        if vehicle is None or not VehicleSearchIndex.matches(vehicle, self.search_field.value or ""):
+            return
+
+        position = bisect_left(self.vehicle_results, vehicle.id)
+        if position < len(self.vehicle_results) and self.vehicle_results[position] == vehicle.id:
+            # déjà inséré (la session qui a ajouté le véhicule reçoit aussi l'événement)
+            return
+        self.vehicle_results.insert(position, vehicle.id)
+        window_size = self.window_end - self.window_start
+        if self.window_start <= position <= self.window_end and window_size < self.max_rendered_vehicles():
+            vehicle_card = self._build_vehicle_card(vehicle)
+            self.vehicle_cards[vehicle.id] = vehicle_card
+            header = 1 if self.window_start > 0 else 0
+            self.vehicles_view.controls.insert(header + position - self.window_start, vehicle_card)
+            self.window_end += 1
+        elif position < self.window_start:
+            self.window_start += 1
+            self.window_end += 1
+        self._refresh_vehicles_footer()
+        if self._vehicles_list_visible():
+            self._update_page(self.vehicles_view)
+
+    def _on_vehicle_updated(self, vehicle_id: int):
+        self._show_updated_vehicle(vehicle_id, self.vehicle_repository.get_vehicle(vehicle_id))
+
+    def _show_updated_vehicle(self, vehicle_id: int, vehicle: Optional[Vehicle]):
+        """
+        Remplace le contenu de la carte du véhicule modifié et n'envoie que cette carte.
+        """
+        if vehicle is None:
+            # supprimé entre-temps (autre session)
+            self._on_vehicle_deleted(vehicle_id)
+            return
+        if not VehicleSearchIndex.matches(vehicle, self.search_field.value or ""):
+            self._on_vehicle_deleted(vehicle_id)
+            return
+
+        position = bisect_left(self.vehicle_results, vehicle.id)
+        if position >= len(self.vehicle_results) or self.vehicle_results[position] != vehicle.id:
+            # le véhicule ne correspondait pas à la recherche avant modification
+            self._show_added_vehicle(vehicle)
+            return
+
+        vehicle_card = self.vehicle_cards.get(vehicle.id)
+        if vehicle_card is not None:
+            vehicle_card.content = self._build_vehicle_card(vehicle).content
+            if self._vehicles_list_visible():
+                self._update_page(vehicle_card)
+
+    def _on_vehicle_deleted(self, vehicle_id: int):
+        """
+        Retire la carte du véhicule supprimé, sans reconstruire la liste.
+        """
+        position = bisect_left(self.vehicle_results, vehicle_id)
+        if position >= len(self.vehicle_results) or self.vehicle_results[position] != vehicle_id:
+            return
+        del self.vehicle_results[position]
+
+        vehicle_card = self.vehicle_cards.pop(vehicle_id, None)
+        if vehicle_card is not None:
+            self.vehicles_view.controls.remove(vehicle_card)
+            self.window_end -= 1
+        elif position < self.window_start:
+            self.window_start -= 1
+            self.window_end -= 1
+        self._refresh_vehicles_footer()
+        if self._vehicles_list_visible():
+            self._update_page(self.vehicles_view)
+
+    def _show_next_vehicles(self, e):
+        if self.window_end >= self.window_start + self.max_rendered_vehicles():
+            self._show_vehicles_window(self.window_end)
+        else:
+            self._append_vehicles_page()
+            self._update_page(self.vehicles_view)
+
+    def on_vehicles_scroll(self, e: ft.OnScrollEvent):
+        # Charger la page suivante à l'approche du bas de la liste
+        if e.pixels < e.max_scroll_extent - self.SCROLL_LOAD_THRESHOLD:
+            return
+        window_limit = self.window_start + self.max_rendered_vehicles()
+        if self.window_end < min(len(self.vehicle_results), window_limit):
+            self._append_vehicles_page()
+            self._update_page(self.vehicles_view)
+
+    def vehicles_page_size(self) -> int:
+        # Cartes par page sans dépasser MAX_PAGE_UPDATE_BYTES, d'après les pages déjà envoyées
+        if self.bytes_per_card is None:
+            return self.VEHICLES_PAGE_SIZE
+        return max(1, min(self.VEHICLES_PAGE_SIZE, self.MAX_PAGE_UPDATE_BYTES // self.bytes_per_card))
+
+    def max_rendered_vehicles(self) -> int:
+        # Nombre de cartes affichables sans dépasser MAX_RENDERED_CONTROLS,
+        # mesuré sur la taille réelle d'une carte
+        if self.controls_per_card is None:
+            return self.VEHICLES_PAGE_SIZE
+        return max(self.VEHICLES_PAGE_SIZE, self.MAX_RENDERED_CONTROLS // self.controls_per_card)
+
+    @staticmethod
+    def _count_controls(control: ft.Control) -> int:
+        return 1 + sum(VehicleManagementApp._count_controls(child) for child in control._get_children())
+
+    def _build_vehicle_card(self, vehicle: Vehicle) -> ft.Card:
+        status_color = self.STATUS_COLORS.get(vehicle.statut, colors.GREY)
+
+        vehicle_card = ft.Card(
+            content=ft.Container(
+                content=ft.Column([
+                    ft.ListTile(
+                        leading=ft.Icon(icons.DIRECTIONS_CAR, size=40, color=colors.BLUE),
+                        height=60,
+                        title=ft.Text(
+                            f"{vehicle.marque} {vehicle.vehicule} // {vehicle.immatriculation} ",
+                            size=20,
+                            weight=ft.FontWeight.BOLD
+                        ),
+                        subtitle=ft.Column([
+                            ft.Text(f"Utilisateur: {vehicle.utilisateur}", size=10, weight=ft.FontWeight.BOLD),
+                            ft.Text(f"Site: {vehicle.site}", size=10, weight=ft.FontWeight.BOLD),
+                            ft.Container(
+                                content=ft.Text(
+                                    vehicle.statut,
+                                    color=colors.WHITE,
+                                    size=8,
                                     weight=ft.FontWeight.BOLD
                                 ),
-                                subtitle=ft.Column([
-                                    ft.Text(f"Utilisateur: {vehicle.utilisateur}", size=10, weight=ft.FontWeight.BOLD),
-                                    ft.Text(f"Site: {vehicle.site}", size=10, weight=ft.FontWeight.BOLD),
-                                    ft.Container(
-                                        content=ft.Text(
-                                            vehicle.statut,
-                                            color=colors.WHITE,
-                                            size=8,
-                                            weight=ft.FontWeight.BOLD
-                                        ),
-                                        bgcolor=status_color,
-                                        padding=10,
-                                        border_radius=15,
-                                    ),
-                                ]),
-                            ),
-                            ft.Row(
-                                [
-                                    ft.TextButton(
-                                        "Modifier",
-                                        on_click=lambda _, id=vehicle.id: self.edit_vehicle(id)
-                                    ),
-                                    ft.TextButton(
-                                        "Supprimer",
-                                        on_click=lambda _, id=vehicle.id: self.delete_vehicle(id)
-                                    ),
-                                    ft.TextButton(
-                                        "Détails",
-                                        icon=ft.icons.INFO,
-                                        on_click=lambda _, id=vehicle.id: self.show_vehicle_details(id)
-                                    ),
-                                ],
-                                alignment=ft.MainAxisAlignment.END,
+                                bgcolor=status_color,
+                                padding=10,
+                                border_radius=15,
                             ),
                         ]),
-                        padding=5,
-                    )
-                )
-
-                self.vehicles_view.controls.append(vehicle_card)
+                    ),
+                    ft.Row(
+                        [
+                            ft.TextButton(
+                                "Modifier",
+                                on_click=lambda _, id=vehicle.id: self.edit_vehicle(id)
+                            ),
+                            ft.TextButton(
+                                "Supprimer",
+                                on_click=lambda _, id=vehicle.id: self.delete_vehicle(id)
+                            ),
+                            ft.TextButton(
+                                "Détails",
+                                icon=ft.icons.INFO,
+                                on_click=lambda _, id=vehicle.id: self.show_vehicle_details(id)
+                            ),
+                        ],
+                        alignment=ft.MainAxisAlignment.END,
+                    ),
+                ]),
+                padding=5,
+            )
+        )
 
-        self.page.update()
+        if self.controls_per_card is None:
+            self.controls_per_card = self._count_controls(vehicle_card)
+        return vehicle_card
 
     def show_vehicle_details(self, vehicle_id: int):
-        vehicle = next((v for v in self.vehicle_repository.fetch_all_vehicles() if v.id == vehicle_id), None)
+        vehicle = self.vehicle_repository.get_vehicle(vehicle_id)
         if not vehicle:
             return
 
@@ -584,7 +763,7 @@ class VehicleManagementApp:
 
         self.page.dialog = details_dialog
         details_dialog.open = True
-        self.page.update()
+        self._update_page()
 
     def create_detail_section(self, title: str, items: List[tuple]) -> ft.Container:
         return ft.Container(
@@ -594,7 +773,7 @@ class VehicleManagementApp:
                     content=ft.Column([
                         ft.Row([
                             ft.Text(label + ":", weight=ft.FontWeight.BOLD),
-                            ft.Text(str(value))
+                            ft.Text(format_field(value))
                         ])
                         for label, value in items
                     ], spacing=5),
@@ -606,14 +785,22 @@ class VehicleManagementApp:
             padding=10,
         )
 
-    def search_vehicles(self, e):
-        search_text = self.search_field.value
-        self.update_vehicles_list(search_text)
+    async def search_vehicles(self, e):
+        search_text = self.search_field.value or ""
+        vehicle_results = await self.async_repository.search_vehicle_ids(search_text)
+        if (self.search_field.value or "") != search_text:
+            # une frappe plus récente a lancé sa propre recherche
+            return
+        self.vehicle_results = vehicle_results
+        await self._show_vehicles_window_async(0)
+        self._update_page()
 
     def add_vehicle(self, e):
-        def save_vehicle(e):
+        async def save_vehicle(e):
+            from pydantic import ValidationError
+
             try:
-                vehicle = VehicleModel(
+                vehicle = vehicle_model()(
                     immatriculation=immatriculation_field.value,
                     code_carte=code_carte_field.value,
                     societe_proprietaire=societe_proprietaire_field.value,
@@ -636,12 +823,12 @@ class VehicleManagementApp:
                     numero_scelle=numero_scelle_field.value,
                     statut=statut_field.value,
                 )
-                self.vehicle_repository.add_vehicle(vehicle)
+                new_id = await self.async_repository.add_vehicle(vehicle)
                 dialog.open = False
-                self.page.update()
-                self.update_vehicles_list()
-                self.create_stats_view()
-                self.page.update()
+                self._update_page()
+                self._show_added_vehicle(await self.async_repository.get_vehicle(new_id))
+                await self._refresh_stats_if_visible_async()
+                self._update_page()
             except ValidationError as e:
                 self._show_error_dialog(str(e))
 
@@ -721,16 +908,18 @@ class VehicleManagementApp:
 
         self.page.dialog = dialog
         dialog.open = True
-        self.page.update()
+        self._update_page()
 
     def edit_vehicle(self, vehicle_id: int):
-        vehicle = next((v for v in self.vehicle_repository.fetch_all_vehicles() if v.id == vehicle_id), None)
+        vehicle = self.vehicle_repository.get_vehicle(vehicle_id)
         if not vehicle:
             return
 
-        def save_changes(e):
+        async def save_changes(e):
+            from pydantic import ValidationError
+
             try:
-                updated_vehicle = VehicleModel(
+                updated_vehicle = vehicle_model()(
                     id=vehicle.id,
                     immatriculation=immatriculation_field.value,
                     code_carte=code_carte_field.value,
@@ -753,15 +942,20 @@ class VehicleManagementApp:
                     double_clef=double_clef_field.value,
                     numero_scelle=numero_scelle_field.value,
                     statut=statut_field.value,
+                    row_version=vehicle.row_version,
                 )
-                self.vehicle_repository.update_vehicle(updated_vehicle)
+                await self.async_repository.update_vehicle(updated_vehicle)
                 dialog.open = False
-                self.page.update()
-                self.update_vehicles_list()
-                self.create_stats_view()
-                self.page.update()
+                self._update_page()
+                self._show_updated_vehicle(vehicle.id, await self.async_repository.get_vehicle(vehicle.id))
+                await self._refresh_stats_if_visible_async()
+                self._update_page()
             except ValidationError as e:
                 self._show_error_dialog(str(e))
+            except StaleVehicleError as e:
+                # Modifié ou supprimé dans une autre session : la liste affiche la version enregistrée
+                self._show_updated_vehicle(vehicle.id, await self.async_repository.get_vehicle(vehicle.id))
+                self._show_error_dialog(str(e))
 
         immatriculation_field = ft.TextField(
             label="Immatriculation",
@@ -777,19 +971,19 @@ class VehicleManagementApp:
         marque_field = ft.TextField(label="Marque", value=vehicle.marque, width=self.FIELD_WIDTH, height=self.FIELD_HEIGHT)
         vehicule_field = ft.TextField(label="Véhicule", value=vehicle.vehicule, width=self.FIELD_WIDTH, height=self.FIELD_HEIGHT)
         modele_field = ft.TextField(label="Modèle", value=vehicle.modele, width=self.FIELD_WIDTH, height=self.FIELD_HEIGHT)
-        date_mise_en_service_field = self.create_date_picker("Date de mise en service", hint_text="JJ/MM/AA", value=vehicle.date_mise_en_service)
+        date_mise_en_service_field = self.create_date_picker("Date de mise en service", hint_text="JJ/MM/AA", value=format_date(vehicle.date_mise_en_service))
         crit_air_field = self.create_dropdown("CRIT AIR", self.CRIT_AIR_OPTIONS, value=vehicle.crit_air)
         carburant_field = self.create_dropdown("Carburant", self.CARBURANT_OPTIONS, value=vehicle.carburant)
         type_huile_field = ft.TextField(label="Type Huile", value=vehicle.type_huile, width=self.FIELD_WIDTH, height=self.FIELD_HEIGHT)
         fluide_dispo_field = self.create_dropdown("Fluide dispo", self.FLUIDE_DISPO_OPTIONS, value=vehicle.fluide_dispo)
-        date_derniere_revision_field = self.create_date_picker("Date Dernière Révision", hint_text="JJ/MM/AA", value=vehicle.date_derniere_revision)
+        date_derniere_revision_field = self.create_date_picker("Date Dernière Révision", hint_text="JJ/MM/AA", value=format_date(vehicle.date_derniere_revision))
         releve_kms_field = ft.TextField(
             label="Relevé KMS",
             width=self.FIELD_WIDTH,
             height=self.FIELD_HEIGHT,
             keyboard_type="number",
             hint_text="Entrez que les chiffres",
-            value=vehicle.releve_kms,
+            value=format_field(vehicle.releve_kms),
             on_change=self.validate_numeric,
             error_text=""
         )
@@ -799,12 +993,12 @@ class VehicleManagementApp:
             height=self.FIELD_HEIGHT,
             keyboard_type="number",
             hint_text="Entrez que les chiffres",
-            value=vehicle.derniere_revision,
+            value=format_field(vehicle.derniere_revision),
             on_change=self.validate_numeric,
             error_text=""
         )
-        periodicite_revision_field = ft.TextField(label="Périodicité Révision", value=vehicle.periodicite_revision, width=self.FIELD_WIDTH)
-        prochain_ct_field = self.create_date_picker(label="Prochain C.T.", hint_text="JJ/MM/AA", value=vehicle.prochain_ct)
+        periodicite_revision_field = ft.TextField(label="Périodicité Révision", value=format_field(vehicle.periodicite_revision), width=self.FIELD_WIDTH)
+        prochain_ct_field = self.create_date_picker(label="Prochain C.T.", hint_text="JJ/MM/AA", value=format_date(vehicle.prochain_ct))
         double_clef_field = self.create_dropdown("Double de clef", self.DOUBLE_CLE_OPTIONS, value=vehicle.double_clef)
         numero_scelle_field = ft.TextField(
             label="N° Scellé du double",
@@ -843,15 +1037,15 @@ class VehicleManagementApp:
 
         self.page.dialog = dialog
         dialog.open = True
-        self.page.update()
+        self._update_page()
 
     def delete_vehicle(self, vehicle_id: int):
-        def confirm_delete(e):
-            self.vehicle_repository.delete_vehicle(vehicle_id)
+        async def confirm_delete(e):
+            await self.async_repository.delete_vehicle(vehicle_id)
             confirm_dialog.open = False
-            self.update_vehicles_list()
-            self.create_stats_view()
-            self.page.update()
+            self._on_vehicle_deleted(vehicle_id)
+            await self._refresh_stats_if_visible_async()
+            self._update_page()
 
         confirm_dialog = ft.AlertDialog(
             title=ft.Text("Confirmer la suppression"),
@@ -864,19 +1058,24 @@ class VehicleManagementApp:
 
         self.page.dialog = confirm_dialog
         confirm_dialog.open = True
-        self.page.update()
+        self._update_page()
 
-    def change_tab(self, e):
+    async def change_tab(self, e):
+        # Les calculs sur la flotte (lecture, alertes, statistiques) sont faits
+        # dans le pool de lecture ; la construction des vues réutilise leur cache
         if e.control.selected_index == 0:
+            await self.async_repository.run_in_reader(self.fleet_snapshot)
+            self.refresh_stats_view()
             self.main_content.content = self.stats_view
         elif e.control.selected_index == 1:
-            self.update_vehicles_list()
+            self.vehicle_results = await self.async_repository.search_vehicle_ids("")
+            await self._show_vehicles_window_async(0)
             self.main_content.content = self.vehicles_view
         elif e.control.selected_index == 2:
-            self.show_maintenance_alerts()
+            self.show_maintenance_alerts(await self.async_repository.run_in_reader(self.calculate_maintenance_info))
         elif e.control.selected_index == 3:
-            self.show_ct_alerts()
-        self.page.update()
+            self.show_ct_alerts(await self.async_repository.run_in_reader(self.calculate_ct_info))
+        self._update_page()
 
     def show_settings(self, e):
         settings_dialog = ft.AlertDialog(
@@ -897,11 +1096,26 @@ class VehicleManagementApp:
                     title=ft.Text("Exporter les données"),
                     on_click=self.show_export_dialog
                 ),
+                ft.ListTile(
+                    leading=ft.Icon(icons.UPLOAD_FILE),
+                    title=ft.Text("Importer des véhicules"),
+                    on_click=self.show_import_dialog
+                ),
+                ft.ListTile(
+                    leading=ft.Icon(icons.RULE),
+                    title=ft.Text("Qualité des données"),
+                    on_click=self.show_data_quality_dialog
+                ),
                 ft.ListTile(
                     leading=ft.Icon(icons.EDIT),
                     title=ft.Text("Modifier les listes déroulantes"),
                     on_click=self.show_dropdown_edit_dialog
                 ),
+                ft.ListTile(
+                    leading=ft.Icon(icons.SPEED),
+                    title=ft.Text("Diagnostics"),
+                    on_click=self.show_diagnostics_dialog
+                ),
             ]),
             actions=[
                 ft.TextButton("Fermer", on_click=lambda _: setattr(settings_dialog, 'open', False))
@@ -911,7 +1125,121 @@ class VehicleManagementApp:
 
         self.page.dialog = settings_dialog
         settings_dialog.open = True
-        self.page.update()
+        self._update_page()
+
+    def show_data_quality_dialog(self, e):
+        """
+        Liste les cellules illisibles (dates, kilométrages) détectées au chargement.
+        """
+        issues = self.vehicle_repository.data_quality_report()
+        shown_issues = issues[:self.MAX_REPORTED_REJECTS]
+        if shown_issues:
+            content = ft.ListView(
+                [
+                    ft.Text(f"Véhicule {issue.vehicle_id} - {issue.field} : {issue.message} ({issue.value!r})", size=12)
+                    for issue in shown_issues
+                ],
+                height=300,
+                width=600,
+            )
+        else:
+            content = ft.Text("Aucune anomalie détectée.", size=15, color=colors.GREEN)
+
+        data_quality_dialog = ft.AlertDialog(
+            title=ft.Text(f"Qualité des données ({len(issues)} anomalies)"),
+            content=content,
+            actions=[
+                ft.TextButton("Fermer", on_click=lambda _: setattr(data_quality_dialog, 'open', False))
+            ],
+        )
+        self.page.dialog = data_quality_dialog
+        data_quality_dialog.open = True
+        self._update_page()
+
+    def show_diagnostics_dialog(self, e):
+        """
+        Latences des chemins critiques (dépôt, liste, tableau de bord, alertes,
+        page.update) depuis le démarrage ou la dernière remise à zéro.
+        """
+        table = ft.DataTable(
+            columns=[
+                ft.DataColumn(ft.Text("Opération")),
+                ft.DataColumn(ft.Text("Appels"), numeric=True),
+                ft.DataColumn(ft.Text("p50 (ms)"), numeric=True),
+                ft.DataColumn(ft.Text("p95 (ms)"), numeric=True),
+                ft.DataColumn(ft.Text("p99 (ms)"), numeric=True),
+                ft.DataColumn(ft.Text("Total (s)"), numeric=True),
+                ft.DataColumn(ft.Text("Lignes"), numeric=True),
+            ],
+            column_spacing=20,
+        )
+        status_text = ft.Text(size=12)
+        endpoint_text = ft.Text(size=12, selectable=True)
+
+        def show_endpoint():
+            # Le point d'accès démarre à la première activation des mesures
+            if not METRICS.enabled:
+                endpoint_text.value = ""
+                return
+            try:
+                server = start_metrics_server()
+            except OSError as error:
+                endpoint_text.value = f"Point d'accès /metrics indisponible : {error}"
+                return
+            host, port = server.server_address[:2]
+            endpoint_text.value = f"Métriques Prometheus : http://{host}:{port}/metrics"
+
+        def refresh(e=None):
+            stats = METRICS.stats()
+            table.rows = [
+                ft.DataRow(cells=[
+                    ft.DataCell(ft.Text(operation.name, size=12)),
+                    ft.DataCell(ft.Text(str(operation.count), size=12)),
+                    ft.DataCell(ft.Text(f"{operation.p50 * 1000:.1f}", size=12)),
+                    ft.DataCell(ft.Text(f"{operation.p95 * 1000:.1f}", size=12)),
+                    ft.DataCell(ft.Text(f"{operation.p99 * 1000:.1f}", size=12)),
+                    ft.DataCell(ft.Text(f"{operation.total_seconds:.2f}", size=12)),
+                    ft.DataCell(ft.Text(str(operation.rows), size=12)),
+                ])
+                for operation in stats
+            ]
+            if not METRICS.enabled:
+                status_text.value = "Mesures désactivées."
+            elif not stats:
+                status_text.value = "Aucune mesure pour l'instant."
+            else:
+                status_text.value = f"{len(stats)} opérations mesurées."
+            if e is not None:
+                self._update_page()
+
+        def toggle_metrics(e):
+            METRICS.enabled = e.control.value
+            show_endpoint()
+            refresh(e)
+
+        def reset_metrics(e):
+            METRICS.reset()
+            refresh(e)
+
+        show_endpoint()
+        refresh()
+        diagnostics_dialog = ft.AlertDialog(
+            title=ft.Text("Diagnostics"),
+            content=ft.Column([
+                ft.Switch(label="Mesurer les performances", value=METRICS.enabled, on_change=toggle_metrics),
+                status_text,
+                endpoint_text,
+                ft.Column([table], scroll=ft.ScrollMode.AUTO, height=350),
+            ], tight=True, width=800),
+            actions=[
+                ft.TextButton("Actualiser", on_click=refresh),
+                ft.TextButton("Réinitialiser", on_click=reset_metrics),
+                ft.TextButton("Fermer", on_click=lambda _: setattr(diagnostics_dialog, 'open', False)),
+            ],
+        )
+        self.page.dialog = diagnostics_dialog
+        diagnostics_dialog.open = True
+        self._update_page()
 
     def show_dropdown_edit_dialog(self, e):
         dropdown_edit_dialog = ft.AlertDialog(
@@ -932,7 +1260,7 @@ class VehicleManagementApp:
 
         self.page.dialog = dropdown_edit_dialog
         dropdown_edit_dialog.open = True
-        self.page.update()
+        self._update_page()
 
     def show_edit_dropdown_dialog(self, dropdown_name: str, options: List[str]):
         options_field = ft.TextField(
@@ -960,7 +1288,7 @@ class VehicleManagementApp:
             elif dropdown_name == "Société Propriétaire":
                 self.SOCIETE_PROPRIETAIRE_OPTIONS = new_options
             edit_dropdown_dialog.open = False
-            self.page.update()
+            self._update_page()
 
         edit_dropdown_dialog = ft.AlertDialog(
             title=ft.Text(f"Modifier les options de {dropdown_name}"),
@@ -977,7 +1305,7 @@ class VehicleManagementApp:
 
         self.page.dialog = edit_dropdown_dialog
         edit_dropdown_dialog.open = True
-        self.page.update()
+        self._update_page()
 
     def toggle_theme_mode(self, e):
         self.page.theme_mode = (
@@ -985,56 +1313,67 @@ class VehicleManagementApp:
             if self.page.theme_mode == ft.ThemeMode.DARK
             else ft.ThemeMode.DARK
         )
-        self.page.update()
+        self._update_page()
 
     def show_export_dialog(self, e):
         """
         Affiche une boîte de dialogue permettant d'exporter les données
-        au format Excel, CSV ou PDF.
+        au format Excel, CSV ou PDF, avec choix des colonnes et filtre par
+        site ou par statut.
         """
+        all_values = "Tous"
+        extensions = {"Excel": "xlsx", "CSV": "csv", "PDF": "pdf"}
+
+        def ask_file_path(format: str) -> str:
+            # Utiliser tkinter pour la sélection du fichier
+            import tkinter as tk
+            from tkinter import filedialog
+
+            root = tk.Tk()
+            root.withdraw()  # Cacher la fenêtre principale de tkinter
+            root.attributes('-topmost', True)  # Mettre la fenêtre au premier plan
+            file_path = filedialog.asksaveasfilename(
+                defaultextension=f".{extensions[format]}",
+                filetypes=[(f"{format} files", f"*.{extensions[format]}")]
+            )
+            root.attributes('-topmost', False)
+            return file_path
 
-        def export_data(e):
+        async def export_data(e):
             """
             Gère l'exportation des données selon le format choisi.
             """
             try:
                 format = export_format_field.value
-                if format not in ["Excel", "CSV", "PDF"]:
+                if format not in EXPORT_FORMATS:
                     raise ValueError("Format d'exportation non pris en charge.")
-
-                # Utiliser tkinter pour la sélection du fichier
-                root = tk.Tk()
-                root.withdraw()  # Cacher la fenêtre principale de tkinter
-                root.attributes('-topmost', True)  # Mettre la fenêtre au premier plan
-                file_path = filedialog.asksaveasfilename(
-                    defaultextension=f".{format.lower()}",
-                    filetypes=[(f"{format} files", f"*.{format.lower()}")]
-                )
-                root.attributes('-topmost', False)
+                columns = [name for name, checkbox in column_checkboxes.items() if checkbox.value]
+                if not columns:
+                    raise ValueError("Sélectionnez au moins une colonne à exporter.")
+                filters = {
+                    name: field.value
+                    for name, field in (("site", site_filter_field), ("statut", statut_filter_field))
+                    if field.value and field.value != all_values
+                }
+
+                # La boîte de dialogue bloque jusqu'au choix : hors de la boucle asyncio
+                file_path = await asyncio.to_thread(ask_file_path, format)
 
                 if not file_path:
                     return
 
-                # Récupération des données
-                vehicles = self.vehicle_repository.fetch_all_vehicles()
-                df = pd.DataFrame([vars(vehicle) for vehicle in vehicles])
-
-                # Export en fonction du format
-                if format == "Excel":
-                    df.to_excel(file_path, index=False)
-                elif format == "CSV":
-                    df.to_csv(file_path, index=False)
-                elif format == "PDF":
-                    self.export_to_pdf(df, file_path)
+                pdf_options = PdfReportOptions(
+                    section_by=section_field.value if section_field.value in PDF_SECTION_FIELDS else None
+                )
 
-                # Afficher le message de confirmation
-                self._show_export_complete_dialog(format, file_path)
+                # L'export tourne en arrière-plan ; la confirmation est affichée à la fin
+                self._start_export(format, file_path, columns, filters, pdf_options)
             except Exception as error:
                 # Afficher un message en cas d'erreur
                 self._show_error_dialog(str(error))
             finally:
                 export_dialog.open = False
-                self.page.update()
+                self._update_page()
 
         # Création du champ de sélection de format
         export_format_field = ft.Dropdown(
@@ -1044,13 +1383,63 @@ class VehicleManagementApp:
                 ft.dropdown.Option("CSV"),
                 ft.dropdown.Option("PDF")
             ],
-            value="Excel"
+            value="Excel",
+            on_change=lambda e: select_format_columns(),
+        )
+
+        # Rapport PDF : une section par site ou par société, avec sous-totaux
+        section_field = ft.Dropdown(
+            label="Sections (PDF)",
+            options=[
+                ft.dropdown.Option(key="", text="Aucune"),
+                ft.dropdown.Option(key="site", text="Par site"),
+                ft.dropdown.Option(key="societe_proprietaire", text="Par société"),
+            ],
+            value="",
+            visible=False,
+        )
+
+        # Filtres appliqués à la lecture des véhicules
+        site_filter_field = ft.Dropdown(
+            label="Site",
+            options=[ft.dropdown.Option(option) for option in [all_values] + self.SITE_OPTIONS],
+            value=all_values,
+        )
+        statut_filter_field = ft.Dropdown(
+            label="Statut",
+            options=[ft.dropdown.Option(option) for option in [all_values] + self.STATUT_OPTIONS],
+            value=all_values,
         )
 
+        # Colonnes exportées (l'ID est toujours inclus)
+        column_checkboxes = {
+            name: ft.Checkbox(label=EXPORT_HEADERS[name], value=True) for name in VEHICLE_FIELDS
+        }
+
+        def select_format_columns():
+            # Le PDF ne reste lisible qu'avec quelques colonnes : sélection par défaut réduite
+            is_pdf = export_format_field.value == "PDF"
+            section_field.visible = is_pdf
+            for name, checkbox in column_checkboxes.items():
+                checkbox.value = name in PDF_DEFAULT_COLUMNS if is_pdf else True
+            self._update_page()
+
         # Boîte de dialogue principale
         export_dialog = ft.AlertDialog(
             title=ft.Text("Exporter les données"),
-            content=ft.Column([export_format_field], spacing=10),
+            content=ft.Column(
+                [
+                    export_format_field,
+                    section_field,
+                    site_filter_field,
+                    statut_filter_field,
+                    ft.Text("Colonnes", weight=ft.FontWeight.BOLD),
+                    *column_checkboxes.values(),
+                ],
+                spacing=10,
+                scroll=ft.ScrollMode.AUTO,
+                height=500,
+            ),
             actions=[
                 ft.TextButton("Annuler", on_click=lambda _: setattr(export_dialog, 'open', False)),
                 ft.TextButton("Exporter", on_click=export_data),
@@ -1060,52 +1449,129 @@ class VehicleManagementApp:
         # Affichage de la boîte de dialogue
         self.page.dialog = export_dialog
         export_dialog.open = True
-        self.page.update()
+        self._update_page()
 
         # Mettre la fenêtre au premier plan
         self.page.window_to_front()
 
-    def export_to_pdf(self, df: pd.DataFrame, file_path: str):
+    async def show_import_dialog(self, e):
         """
-        Exporte un DataFrame Pandas au format PDF, en s'assurant que toutes les colonnes sont incluses.
+        Importe des véhicules depuis un fichier CSV ou Excel, puis affiche
+        le nombre de véhicules importés et les lignes rejetées. L'import est
+        fait dans le thread des écritures : la boucle reste disponible.
         """
+        file_path = await asyncio.to_thread(self._ask_import_path)
+        if not file_path:
+            return
+
         try:
-            # Utiliser l'orientation paysage pour avoir plus d'espace horizontal
-            doc = SimpleDocTemplate(file_path, pagesize=landscape(A4))
-            elements = []
-
-            # Préparation des données pour le tableau
-            data = [df.columns.tolist()] + df.values.tolist()
-
-            # Calculer la largeur disponible
-            available_width = doc.width - inch  # Soustraire une marge
-
-            # Calculer la largeur de chaque colonne
-            col_widths = [available_width / len(df.columns)] * len(df.columns)
-
-            # Création du tableau avec les largeurs de colonnes spécifiées
-            table = Table(data, colWidths=col_widths, repeatRows=1)
-
-            # Stylisation du tableau
-            style = TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), pdf_colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), pdf_colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),  # Réduire la taille de la police pour les en-têtes
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), pdf_colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, pdf_colors.black),
-                ('FONTSIZE', (0, 1), (-1, -1), 8),  # Réduire la taille de la police pour le contenu
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [pdf_colors.whitesmoke, pdf_colors.lightgrey])
-            ])
-            table.setStyle(style)
-            elements.append(table)
-
-            # Génération du PDF
-            doc.build(elements)
-        except Exception as e:
-            raise RuntimeError(f"Erreur lors de l'exportation en PDF : {e}")
+            report = await self.async_repository.run_in_writer(import_vehicles, self.vehicle_repository, file_path)
+        except Exception as error:
+            self._show_error_dialog(str(error))
+            return
+
+        search_text = self.search_field.value or ""
+        self.vehicle_results = await self.async_repository.search_vehicle_ids(search_text)
+        await self._show_vehicles_window_async(0)
+        await self.async_repository.run_in_reader(self.fleet_snapshot)
+        self.refresh_stats_view()
+        self._show_import_report_dialog(report)
+
+    @staticmethod
+    def _ask_import_path() -> str:
+        import tkinter as tk
+        from tkinter import filedialog
+
+        root = tk.Tk()
+        root.withdraw()
+        root.attributes('-topmost', True)
+        file_path = filedialog.askopenfilename(
+            filetypes=[("Fichiers CSV ou Excel", "*.csv *.xlsx")]
+        )
+        root.attributes('-topmost', False)
+        root.destroy()
+        return file_path
+
+    def _show_import_report_dialog(self, report: ImportReport):
+        """
+        Affiche le résultat d'un import avec la liste des lignes rejetées.
+        """
+        shown_rejects = report.rejects[:self.MAX_REPORTED_REJECTS]
+        content = [
+            ft.Text(f"{len(report.imported_ids)} véhicules importés.", size=15),
+            ft.Text(f"{len(report.rejects)} lignes rejetées.", size=15,
+                    color=colors.RED if report.rejects else None),
+        ]
+        if shown_rejects:
+            content.append(ft.ListView(
+                [ft.Text(f"Ligne {row_number} : {message}", size=12) for row_number, message in shown_rejects],
+                height=300,
+                width=600,
+            ))
+        if len(report.rejects) > len(shown_rejects):
+            content.append(ft.Text(f"... et {len(report.rejects) - len(shown_rejects)} autres lignes.", size=12))
+
+        import_report_dialog = ft.AlertDialog(
+            title=ft.Text("Importation terminée"),
+            content=ft.Column(content, tight=True, spacing=10),
+            actions=[
+                ft.TextButton("OK", on_click=lambda _: setattr(import_report_dialog, 'open', False))
+            ],
+        )
+        self.page.dialog = import_report_dialog
+        import_report_dialog.open = True
+        self._update_page()
+
+    def _start_export(self, format: str, file_path: str, columns: List[str],
+                      filters: Dict[str, object], pdf_options: Optional[PdfReportOptions] = None) -> ExportJob:
+        """
+        Lance l'export dans le pool de threads et affiche sa progression,
+        avec un bouton d'annulation. L'interface reste utilisable pendant l'export.
+        """
+        progress_bar = ft.ProgressBar(value=0, width=400)
+        progress_text = ft.Text("Préparation de l'export...", size=14)
+        cancel_button = ft.TextButton("Annuler")
+        progress_dialog = ft.AlertDialog(
+            title=ft.Text(f"Exportation {format} en cours"),
+            content=ft.Column([progress_bar, progress_text], tight=True),
+            actions=[cancel_button],
+        )
+        self.page.dialog = progress_dialog
+        progress_dialog.open = True
+        self._update_page()
+
+        def on_progress(job: ExportJob):
+            progress_bar.value = job.progress
+            total = f" / {job.total}" if job.total is not None else ""
+            progress_text.value = f"{job.written}{total} véhicules"
+            self._update_page()
+
+        def on_done(job: ExportJob):
+            self._export_jobs.pop(job.job_id, None)
+            progress_dialog.open = False
+            if job.status == EXPORT_DONE:
+                self._show_export_complete_dialog(job.format, job.file_path)
+            elif job.status == EXPORT_FAILED:
+                self._show_error_dialog(job.error)
+            else:
+                self._update_page()
+
+        def cancel_export(e):
+            job.cancel()
+            cancel_button.disabled = True
+            progress_text.value = "Annulation..."
+            self._update_page()
+
+        job = self.export_worker.submit(
+            self.vehicle_repository, file_path, format, columns, filters,
+            on_progress=on_progress, on_done=on_done, pdf_options=pdf_options,
+        )
+        self._export_jobs[job.job_id] = job
+        if job.status != EXPORT_RUNNING:
+            # terminé avant d'être enregistré : on_done ne l'a pas trouvé
+            self._export_jobs.pop(job.job_id, None)
+        cancel_button.on_click = cancel_export
+        return job
 
     def _show_export_complete_dialog(self, format: str, file_path: str):
         """
@@ -1117,9 +1583,10 @@ class VehicleManagementApp:
                 if os.name == 'nt':  # Windows
                     os.startfile(file_path)
                 elif os.name == 'posix':  # macOS et Linux
+                    import subprocess
                     subprocess.call(('open', file_path))
             export_complete_dialog.open = False
-            self.page.update()
+            self._update_page()
 
         export_complete_dialog = ft.AlertDialog(
             title=ft.Text("Exportation terminée"),
@@ -1132,7 +1599,7 @@ class VehicleManagementApp:
         )
         self.page.dialog = export_complete_dialog
         export_complete_dialog.open = True
-        self.page.update()
+        self._update_page()
 
     def _show_error_dialog(self, message: str):
         """
@@ -1147,62 +1614,32 @@ class VehicleManagementApp:
         )
         self.page.dialog = error_dialog
         error_dialog.open = True
-        self.page.update()
+        self._update_page()
+
+    @timed("ui.fleet_alerts")
+    def fleet_alerts(self) -> FleetAlerts:
+        # Un seul calcul par version de la flotte et par jour
+        key = (self.vehicle_repository.version, date.today())
+        if self._alerts_key != key:
+            return self._compute_fleet_alerts(self.vehicle_repository.fleet_columns(), key)
+        return self._alerts
+
+    def _compute_fleet_alerts(self, fleet: FleetColumns, key: Tuple[int, date]) -> FleetAlerts:
+        # fleet est un instantané, lu après le relevé de la version key[0]
+        alerts = compute_fleet_alerts(fleet, self.alert_thresholds)
+        self._alerts = alerts
+        self._alerts_key = key
+        return alerts
 
     def calculate_maintenance_count(self):
-        vehicles = self.vehicle_repository.fetch_all_vehicles()
-        today = datetime.today()
-        maintenance_count = 0
-
-        for vehicle in vehicles:
-            try:
-                derniere_revision_kms = int(vehicle.derniere_revision or 0)
-                periodicite_revision_kms = int(vehicle.periodicite_revision or 0)
-                releve_kms = int(vehicle.releve_kms or 0)
-
-                prochaine_revision_kms = derniere_revision_kms + periodicite_revision_kms
-                kms_difference = prochaine_revision_kms - releve_kms
-
-                if isinstance(vehicle.date_derniere_revision, datetime):
-                    derniere_revision_date = vehicle.date_derniere_revision
-                else:
-                    derniere_revision_date = datetime.strptime(vehicle.date_derniere_revision, '%d/%m/%Y')
-
-                days_difference = (derniere_revision_date + timedelta(days=365)) - today
-                days_remaining = days_difference.days
-
-                if 0 <= kms_difference <= 1000 or 0 < days_remaining <= 45:
-                    maintenance_count += 1
-                elif kms_difference < 0 or days_remaining < 0:
-                    maintenance_count += 1
-            except (ValueError, AttributeError):
-                continue
-
-        return maintenance_count
+        return self.fleet_alerts().maintenance_count
 
     def calculate_ct_count(self):
-        vehicles = self.vehicle_repository.fetch_all_vehicles()
-        today = datetime.today()
-        ct_count = 0
-
-        for vehicle in vehicles:
-            if vehicle.prochain_ct:
-                try:
-                    if isinstance(vehicle.prochain_ct, str):
-                        prochain_ct_date = datetime.strptime(vehicle.prochain_ct, '%d/%m/%Y')
-                    else:
-                        prochain_ct_date = vehicle.prochain_ct
-                except ValueError:
-                    continue
-
-                difference = (prochain_ct_date - today).days
-                if difference <= 60:
-                    ct_count += 1
-
-        return ct_count
-
-    def show_maintenance_alerts(self):
-        maintenance_info = self.calculate_maintenance_info()
+        return self.fleet_alerts().ct_count
+
+    def show_maintenance_alerts(self, maintenance_info: Optional[list] = None):
+        if maintenance_info is None:
+            maintenance_info = self.calculate_maintenance_info()
         alert_view = ft.ListView(spacing=10, padding=20, auto_scroll=True)
 
         if not maintenance_info:
@@ -1227,6 +1664,7 @@ class VehicleManagementApp:
                 kms_difference = info["kms_difference"]
                 days_remaining = info["days_remaining"]
                 status_color = info["status_color"]
+                kms_per_day = info["kms_per_day"]
 
                 alert_card = ft.Card(
                     content=ft.Container(
@@ -1248,7 +1686,7 @@ class VehicleManagementApp:
                                 content=ft.Column([
                                     ft.Text(f"Plaque d'immatriculation: {vehicle.immatriculation}", size=14,
                                             weight=ft.FontWeight.BOLD),
-                                    ft.Text(f"Date de la prochaine révision: {vehicle.date_derniere_revision}", size=14,
+                                    ft.Text(f"Date prévue de la prochaine révision: {format_date(info['revision_date'])}", size=14,
                                             weight=ft.FontWeight.BOLD),
                                     ft.Text(f"Kilométrage de la prochaine révision: {prochaine_revision_kms} km",
                                             size=14, weight=ft.FontWeight.BOLD),
@@ -1256,6 +1694,11 @@ class VehicleManagementApp:
                                             weight=ft.FontWeight.BOLD),
                                     ft.Text(f"Jours restants: {days_remaining} jours", size=14,
                                             weight=ft.FontWeight.BOLD),
+                                    ft.Text(
+                                        f"Rythme: {kms_per_day:,.0f} km/jour".replace(",", " ") if kms_per_day is not None
+                                        else "Rythme: inconnu",
+                                        size=14, weight=ft.FontWeight.BOLD,
+                                    ),
                                 ]),
                                 padding=10,
                             ),
@@ -1266,51 +1709,33 @@ class VehicleManagementApp:
                 alert_view.controls.append(alert_card)
 
         self.main_content.content = alert_view
-        self.page.update()
+        self._update_page()
 
+    @timed("ui.calculate_maintenance_info", rows=len)
     def calculate_maintenance_info(self):
-        vehicles = self.vehicle_repository.fetch_all_vehicles()
-        today = datetime.today()
+        # Seuls les véhicules proches d'une échéance (index des échéances) sont évalués
+        candidates, _ = self.vehicle_repository.alert_candidates(self.alert_thresholds)
+        alerts = compute_fleet_alerts(candidates, self.alert_thresholds)
+        projection = self.vehicle_repository.revision_projection(
+            candidates, self.alert_thresholds.revision_interval_days
+        )
         maintenance_info = []
-
-        for vehicle in vehicles:
-            try:
-                derniere_revision_kms = int(vehicle.derniere_revision or 0)
-                periodicite_revision_kms = int(vehicle.periodicite_revision or 0)
-                releve_kms = int(vehicle.releve_kms or 0)
-
-                prochaine_revision_kms = derniere_revision_kms + periodicite_revision_kms
-                kms_difference = prochaine_revision_kms - releve_kms
-
-                if isinstance(vehicle.date_derniere_revision, datetime):
-                    derniere_revision_date = vehicle.date_derniere_revision
-                else:
-                    derniere_revision_date = datetime.strptime(vehicle.date_derniere_revision, '%d/%m/%Y')
-
-                days_difference = (derniere_revision_date + timedelta(days=365)) - today
-                days_remaining = days_difference.days
-
-                if 0 <= kms_difference <= 1000 or 0 < days_remaining <= 45:
-                    status_color = colors.ORANGE
-                elif kms_difference < 0 or days_remaining < 0:
-                    status_color = colors.RED
-                else:
-                    continue
-
-                maintenance_info.append({
-                    "vehicle": vehicle,
-                    "prochaine_revision_kms": prochaine_revision_kms,
-                    "kms_difference": kms_difference,
-                    "days_remaining": days_remaining,
-                    "status_color": status_color,
-                })
-            except (ValueError, AttributeError):
-                continue
-
+        for row in alerts.maintenance_rows():
+            kms_per_day, revision_date = projection.row(row)
+            maintenance_info.append({
+                "vehicle": candidates.row(row),
+                "prochaine_revision_kms": int(alerts.prochaine_revision_kms[row]),
+                "kms_difference": int(alerts.kms_difference[row]),
+                "days_remaining": int(alerts.days_to_revision[row]),
+                "kms_per_day": kms_per_day,
+                "revision_date": revision_date,
+                "status_color": self.SEVERITY_COLORS[alerts.maintenance_severity[row]],
+            })
         return maintenance_info
 
-    def show_ct_alerts(self):
-        ct_info = self.calculate_ct_info()
+    def show_ct_alerts(self, ct_info: Optional[list] = None):
+        if ct_info is None:
+            ct_info = self.calculate_ct_info()
         alert_view = ft.ListView(spacing=10, padding=20, auto_scroll=True)
 
         if not ct_info:
@@ -1363,39 +1788,36 @@ class VehicleManagementApp:
                 )
                 alert_view.controls.append(alert_card)
         self.main_content.content = alert_view
-        self.page.update()
+        self._update_page()
 
+    @timed("ui.calculate_ct_info", rows=len)
     def calculate_ct_info(self):
-        vehicles = self.vehicle_repository.fetch_all_vehicles()
-        today = datetime.today()
+        _, candidates = self.vehicle_repository.alert_candidates(self.alert_thresholds)
+        alerts = compute_fleet_alerts(candidates, self.alert_thresholds)
         ct_info = []
-
-        for vehicle in vehicles:
-            if vehicle.prochain_ct:
-                try:
-                    if isinstance(vehicle.prochain_ct, str):
-                        prochain_ct_date = datetime.strptime(vehicle.prochain_ct, '%d/%m/%Y')
-                    else:
-                        prochain_ct_date = vehicle.prochain_ct
-                except ValueError:
-                    continue
-
-                difference = (prochain_ct_date - today).days
-                days_remaining = abs(difference)
-                icon_color = colors.ORANGE if 0 < difference <= 60 else colors.RED if difference < 0 else colors.GREEN
-
-                if difference <= 60:
-                    status_message = (
-                        f"C.T valide pour encore {days_remaining} jours" if difference > 0 else
-                        f"C.T périmé depuis {days_remaining} jours"
-                    )
-                    ct_info.append((vehicle, vehicle.immatriculation, prochain_ct_date.strftime('%d/%m/%Y'),
-                                    status_message, icon_color))
-
+        for row in alerts.ct_rows():
+            vehicle = candidates.row(row)
+            difference = int(alerts.days_to_ct[row])
+            # Échéance du jour : pas encore périmé (SEVERITY_WARNING, comme dans compute_fleet_alerts)
+            status_message = (
+                f"C.T valide pour encore {difference} jours" if difference > 0 else
+                "C.T à passer aujourd'hui" if difference == 0 else
+                f"C.T périmé depuis {-difference} jours"
+            )
+            ct_info.append((vehicle, vehicle.immatriculation, format_date(vehicle.prochain_ct), status_message,
+                            self.SEVERITY_COLORS[alerts.ct_severity[row]]))
         return ct_info
 
 def main(page: ft.Page):
-    vehicle_repository = VehicleRepository()
+    # Un seul dépôt par processus, partagé par les sessions (une par navigateur)
+    vehicle_repository = shared_repository()
+    relay_repository_changes(page, vehicle_repository)
     VehicleManagementApp(page, vehicle_repository)
 
-ft.app(target=main, view=ft.AppView.WEB_BROWSER)
+if __name__ == "__main__":
+    # Requis par le pool de processus du rapport PDF dans l'exécutable PyInstaller
+    multiprocessing.freeze_support()
+    if METRICS.enabled:
+        # Sinon démarré à l'activation des mesures dans les paramètres (Diagnostics)
+        start_metrics_server()
+    ft.app(target=main, view=ft.AppView.WEB_BROWSER)
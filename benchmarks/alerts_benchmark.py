@@ -0,0 +1,100 @@
+"""
+Compare le moteur d'alertes vectorisé (compute_fleet_alerts) aux anciennes
+boucles calculate_maintenance_count / calculate_ct_count sur des flottes
+synthétiques.
+
+Usage : python benchmarks/alerts_benchmark.py [taille ...]
+"""
+import os
+import random
+import sys
+import time
+from dataclasses import astuple
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from carlogix.core import FleetColumns, Vehicle, compute_fleet_alerts, format_field
+
+
+def make_fleet(size: int, seed: int = 0):
+    rng = random.Random(seed)
+    today = date.today()
+    vehicles = []
+    for vehicle_id in range(1, size + 1):
+        derniere_revision = rng.randrange(0, 200000)
+        vehicles.append(Vehicle(
+            vehicle_id, f"AB-{vehicle_id % 1000:03d}-CD", "1234", "ARVAL", "ELAN", "Utilisateur",
+            "PEUGEOT", "208", "1.2 PureTech", date(2020, 1, 1), "1", "Essence", "5W30", "Oui",
+            derniere_revision + rng.randrange(0, 25000),
+            today - timedelta(days=rng.randrange(0, 500)),
+            derniere_revision, 20000,
+            today + timedelta(days=rng.randrange(-60, 730)),
+            "Oui", "12", "En service",
+        ))
+    return vehicles
+
+
+def as_text(vehicles):
+    # Les anciennes boucles travaillaient sur des champs texte (JJ/MM/AAAA)
+    return [Vehicle(vehicle.id, *[format_field(value) for value in astuple(vehicle)[1:]]) for vehicle in vehicles]
+
+
+def legacy_maintenance_count(vehicles):
+    # Boucle d'origine de VehicleManagementApp.calculate_maintenance_count
+    today = datetime.today()
+    maintenance_count = 0
+    for vehicle in vehicles:
+        try:
+            prochaine_revision_kms = int(vehicle.derniere_revision or 0) + int(vehicle.periodicite_revision or 0)
+            kms_difference = prochaine_revision_kms - int(vehicle.releve_kms or 0)
+            derniere_revision_date = datetime.strptime(vehicle.date_derniere_revision, '%d/%m/%Y')
+            days_remaining = ((derniere_revision_date + timedelta(days=365)) - today).days
+            if 0 <= kms_difference <= 1000 or 0 < days_remaining <= 45:
+                maintenance_count += 1
+            elif kms_difference < 0 or days_remaining < 0:
+                maintenance_count += 1
+        except (ValueError, AttributeError):
+            continue
+    return maintenance_count
+
+
+def legacy_ct_count(vehicles):
+    # Boucle d'origine de VehicleManagementApp.calculate_ct_count
+    today = datetime.today()
+    ct_count = 0
+    for vehicle in vehicles:
+        if vehicle.prochain_ct:
+            try:
+                prochain_ct_date = datetime.strptime(vehicle.prochain_ct, '%d/%m/%Y')
+            except ValueError:
+                continue
+            if (prochain_ct_date - today).days <= 60:
+                ct_count += 1
+    return ct_count
+
+
+def best_of(function, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(sizes):
+    print(f"{'véhicules':>10} {'boucles (ms)':>14} {'vectorisé (ms)':>15} {'gain':>6}")
+    for size in sizes:
+        vehicles = make_fleet(size)
+        text_vehicles = as_text(vehicles)
+        # Le dépôt garde la flotte en colonnes : le moteur les lit directement
+        columns = FleetColumns.from_vehicles(vehicles)
+        # Le tableau de bord appelait les deux boucles, chacune relisant la flotte
+        legacy = best_of(lambda: (legacy_maintenance_count(text_vehicles), legacy_ct_count(text_vehicles)))
+        vectorized = best_of(lambda: compute_fleet_alerts(columns))
+        print(f"{size:>10} {legacy * 1000:>14.1f} {vectorized * 1000:>15.1f} {legacy / vectorized:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,234 @@
+"""
+Suite de benchmarks sur des flottes synthétiques (synthetic_fleet) : lecture,
+ajout, modification, suppression, recherche, alertes, projection des
+révisions, tableau de bord et exports. Les résultats sont écrits en JSON ; --compare les confronte à ceux
+d'une version précédente et signale les régressions.
+
+Usage :
+    python benchmarks/benchmark_suite.py [--sizes 1000 10000 ...] [--full] [--output resultats.json]
+    python benchmarks/benchmark_suite.py --compare v1.2.json [--tolerance 1.25]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, replace
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from CarLogix import VehicleManagementApp
+from carlogix.core import EXPORT_FORMATS, VehicleModel, VehicleRepository, compute_fleet_alerts, export_vehicles
+from synthetic_fleet import FLEET_SIZES, generate_fleet, generate_odometer_readings, write_database
+
+# Version du format du fichier de résultats
+RESULTS_FORMAT = 1
+DEFAULT_SIZES = FLEET_SIZES[:3]
+# Au-delà, les opérations lentes (chargement, exports...) ne sont mesurées qu'une fois
+SLOW_REPEAT_MAX_SIZE = 10000
+# Mois de relevés kilométriques enregistrés avant les mesures
+HISTORY_MONTHS = 12
+# Écarts ignorés par --compare : en dessous, la mesure est surtout du bruit
+MIN_COMPARED_SECONDS = 0.005
+
+EXPORT_EXTENSIONS = {"Excel": "xlsx", "CSV": "csv", "PDF": "pdf"}
+SEARCH_TERMS = ("PEU", "AB-1", "DSO", "martin")
+
+
+class NullPubSub:
+    def subscribe_topic(self, topic, handler):
+        pass
+
+
+class HeadlessPage:
+    """
+    Page Flet minimale : suffisante pour construire VehicleManagementApp et
+    mesurer create_stats_view sans serveur ni navigateur.
+    """
+    pubsub = NullPubSub()
+
+    def add(self, *controls):
+        pass
+
+    def update(self, *controls):
+        pass
+
+
+def timed(function, repeat: int, setup=None) -> list:
+    runs = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        runs.append(time.perf_counter() - start)
+    return runs
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_size(size: int, directory: str, repeat: int, seed: int) -> dict:
+    """
+    Mesure toutes les opérations sur une flotte de size véhicules.
+    Retourne {opération: [durées (s)]}.
+    """
+    slow_repeat = repeat if size <= SLOW_REPEAT_MAX_SIZE else 1
+    results = {}
+    db_path = os.path.join(directory, f"fleet-{size}.db")
+
+    start = time.perf_counter()
+    write_database(size, db_path, seed)
+    results["add_vehicles"] = [time.perf_counter() - start]
+
+    repository = VehicleRepository(db_path=db_path, xlsx_path=None)
+    try:
+        start = time.perf_counter()
+        repository.add_odometer_readings(generate_odometer_readings(size, seed, months=HISTORY_MONTHS))
+        results["add_odometer_readings"] = [time.perf_counter() - start]
+
+        results["fetch_all_vehicles_cold"] = timed(repository.fetch_all_vehicles, slow_repeat,
+                                                   setup=repository.invalidate_cache)
+        results["fetch_all_vehicles"] = timed(repository.fetch_all_vehicles, repeat)
+
+        # Première recherche : construit l'index ; les suivantes le réutilisent
+        results["search_cold"] = timed(lambda: repository.search_vehicle_ids(SEARCH_TERMS[0]), slow_repeat,
+                                       setup=repository.invalidate_cache)
+        results["search"] = timed(lambda: [repository.search_vehicle_ids(term) for term in SEARCH_TERMS], repeat)
+
+        # Écritures unitaires, cache chaud (celles de l'interface)
+        template = next(generate_fleet(1, seed + 1))
+        new_vehicle = VehicleModel(**{**asdict(template), "id": None, "row_version": None})
+        new_ids = []
+        results["add_vehicle"] = timed(lambda: new_ids.append(repository.add_vehicle(new_vehicle)), repeat)
+        vehicle = repository.get_vehicle(max(1, size // 2))
+        updates = iter(range(1, repeat + 1))
+        results["update_vehicle"] = timed(
+            lambda: repository.update_vehicle(VehicleModel(**asdict(replace(
+                vehicle, releve_kms=vehicle.releve_kms + next(updates), row_version=None,
+            )))),
+            repeat,
+        )
+        deletions = iter(new_ids)
+        results["delete_vehicle"] = timed(lambda: repository.delete_vehicle(next(deletions)), repeat)
+
+        results["alerts"] = timed(lambda: compute_fleet_alerts(repository.fleet_columns()), slow_repeat)
+
+        # Première projection : relit l'historique des relevés
+        results["revision_projection_cold"] = timed(
+            repository.revision_projection, slow_repeat,
+            setup=lambda: (repository.invalidate_cache(), repository.fleet_columns()),
+        )
+        results["revision_projection"] = timed(repository.revision_projection, repeat)
+
+        # Tableau de bord après une écriture : alertes et statistiques recalculées
+        app = VehicleManagementApp(HeadlessPage(), repository)
+
+        def reset_dashboard():
+            app._alerts_key = None
+            app._snapshot = None
+
+        results["create_stats_view"] = timed(app.create_stats_view, slow_repeat, setup=reset_dashboard)
+
+        for format in EXPORT_FORMATS:
+            file_path = os.path.join(directory, f"export.{EXPORT_EXTENSIONS[format]}")
+            results[f"export_{EXPORT_EXTENSIONS[format]}"] = timed(
+                lambda: export_vehicles(repository, file_path, format), slow_repeat,
+            )
+            os.remove(file_path)
+    finally:
+        repository.close()
+        os.remove(db_path)
+    return results
+
+
+def summarize(runs: list) -> dict:
+    return {"median": statistics.median(runs), "min": min(runs), "runs": runs}
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Compare les meilleures durées (min, moins sensibles à la charge de la
+    machine que la médiane) à celles de baseline. Retourne les régressions
+    (taille, opération, ancienne durée, nouvelle durée).
+    """
+    regressions = []
+    print(f"\nComparaison avec {baseline.get('commit') or '?'} du {baseline.get('date', '?')} :")
+    print(f"{'véhicules':>10} {'opération':>24} {'avant (s)':>10} {'après (s)':>10} {'rapport':>8}")
+    for size, operations in results["results"].items():
+        for operation, measure in operations.items():
+            previous = baseline.get("results", {}).get(size, {}).get(operation)
+            if previous is None:
+                continue
+            before, after = previous["min"], measure["min"]
+            ratio = after / before if before else float("inf")
+            regression = ratio > tolerance and max(before, after) >= MIN_COMPARED_SECONDS
+            if regression:
+                regressions.append((size, operation, before, after))
+            print(f"{size:>10} {operation:>24} {before:>10.4f} {after:>10.4f} {ratio:>7.2f}x"
+                  + ("  RÉGRESSION" if regression else ""))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de CarLogix sur des flottes synthétiques")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="tailles de flotte")
+    parser.add_argument("--full", action="store_true", help=f"toutes les tailles : {FLEET_SIZES}")
+    parser.add_argument("--repeat", type=int, default=5, help="mesures par opération rapide")
+    parser.add_argument("--seed", type=int, default=0, help="graine de la flotte synthétique")
+    parser.add_argument("--output", default="benchmark_results.json", help="fichier JSON des résultats")
+    parser.add_argument("--compare", help="résultats JSON d'une version précédente")
+    parser.add_argument("--tolerance", type=float, default=1.25,
+                        help="rapport de durée au-delà duquel --compare signale une régression")
+    args = parser.parse_args()
+    sizes = list(FLEET_SIZES) if args.full else args.sizes
+
+    results = {
+        "format": RESULTS_FORMAT,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "results": {},
+    }
+    print(f"{'véhicules':>10} {'opération':>24} {'médiane (s)':>12} {'min (s)':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            measures = {operation: summarize(runs)
+                        for operation, runs in run_size(size, directory, args.repeat, args.seed).items()}
+            # Clés texte : les tailles sont relues telles quelles depuis le JSON
+            results["results"][str(size)] = measures
+            for operation, measure in measures.items():
+                print(f"{size:>10} {operation:>24} {measure['median']:>12.4f} {measure['min']:>10.4f}")
+
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(results, output, indent=2)
+    print(f"\nRésultats enregistrés dans {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nÉCHEC : {len(regressions)} régression(s) au-delà de {args.tolerance:g}x")
+            sys.exit(1)
+        print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
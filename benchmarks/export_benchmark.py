@@ -0,0 +1,59 @@
+"""
+Compare le pic mémoire et la durée de l'ancien export (tous les véhicules puis
+un DataFrame) à l'export en flux (export_vehicles), en CSV et en Excel.
+
+Usage : python benchmarks/export_benchmark.py [taille ...]
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from carlogix.core import VehicleRepository, export_vehicles
+from synthetic_fleet import make_database
+
+
+def dataframe_export(repository: VehicleRepository, file_path: str, format: str):
+    # Ancienne méthode de show_export_dialog
+    df = pd.DataFrame([asdict(vehicle) for vehicle in repository.fetch_all_vehicles()])
+    if format == "CSV":
+        df.to_csv(file_path, index=False)
+    else:
+        df.to_excel(file_path, index=False)
+
+
+def measure(export, db_path: str, file_path: str, format: str):
+    repository = VehicleRepository(db_path=db_path, xlsx_path=None)
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    export(repository, file_path, format)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    repository.close()
+    return peak, elapsed
+
+
+def main(sizes):
+    print(f"{'véhicules':>10} {'format':>7} {'méthode':>10} {'pic (Mo)':>9} {'durée (s)':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            db_path = make_database(size, directory)
+            for format, extension in (("CSV", "csv"), ("Excel", "xlsx")):
+                file_path = os.path.join(directory, f"export.{extension}")
+                for name, export in (("DataFrame", dataframe_export), ("flux", export_vehicles)):
+                    peak, elapsed = measure(export, db_path, file_path, format)
+                    print(f"{size:>10} {format:>7} {name:>10} {peak / 2 ** 20:>9.1f} {elapsed:>10.1f}")
+            os.remove(db_path)
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or [10000, 100000])
@@ -0,0 +1,76 @@
+"""
+Mesure la mémoire occupée par la flotte chargée depuis SQLite : un dataclass
+par véhicule (ancienne représentation, puis Vehicle à slots) ou FleetColumns,
+et le temps de conversion en DataFrame.
+
+Usage : python benchmarks/fleet_memory_benchmark.py [taille ...]
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, astuple, fields, make_dataclass
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from carlogix.core import FleetColumns, Vehicle, VehicleRepository, VEHICLE_FIELDS
+from carlogix.core.models import _vehicle_from_row
+from synthetic_fleet import make_database
+
+# Représentation d'origine : dataclass sans slots, un __dict__ par véhicule
+# (son temps de chargement inclut la conversion depuis Vehicle)
+LegacyVehicle = make_dataclass("LegacyVehicle", [(field.name, field.type) for field in fields(Vehicle)])
+
+
+def measure(load):
+    # Mémoire restant allouée une fois la flotte chargée (lignes SQLite libérées)
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    fleet = load()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return fleet, current, elapsed
+
+
+def main(sizes):
+    print(f"{'véhicules':>10} {'représentation':>16} {'Mo / 100k':>10} {'chargement (ms)':>16} {'DataFrame (ms)':>15}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            db_path = make_database(size, directory)
+            repository = VehicleRepository(db_path=db_path, xlsx_path=None)
+            query = f"SELECT id, {', '.join(VEHICLE_FIELDS)} FROM vehicles ORDER BY id"
+
+            def rows():
+                return repository.connection.execute(query).fetchall()
+
+            loaders = {
+                "dataclass": lambda: {row[0]: LegacyVehicle(*astuple(_vehicle_from_row(row, []))) for row in rows()},
+                "dataclass slots": lambda: {row[0]: _vehicle_from_row(row, []) for row in rows()},
+                "colonnes": lambda: FleetColumns.from_rows(rows(), []),
+            }
+            for name, load in loaders.items():
+                fleet, memory, elapsed = measure(load)
+                start = time.perf_counter()
+                if isinstance(fleet, FleetColumns):
+                    frame = fleet.to_frame()
+                    assert np.shares_memory(frame["releve_kms"].array._data, fleet.column("releve_kms"))
+                else:
+                    frame = pd.DataFrame([asdict(vehicle) for vehicle in fleet.values()])
+                to_frame = time.perf_counter() - start
+                per_100k = memory / size * 100000 / 2 ** 20
+                print(f"{size:>10} {name:>16} {per_100k:>10.1f} {elapsed * 1000:>16.0f} {to_frame * 1000:>15.1f}")
+                del fleet, frame
+            repository.close()
+            os.remove(db_path)
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or [10000, 100000])
@@ -0,0 +1,83 @@
+"""
+Compare l'ancien export PDF (un seul Table reportlab pour toute la flotte)
+au moteur de rapport par pages, en séquentiel et en parallèle, avec
+sections par site.
+
+Usage : python benchmarks/pdf_benchmark.py [taille ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reportlab.lib import colors as pdf_colors
+from reportlab.lib.pagesizes import landscape, A4
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
+
+from carlogix.core import (
+    EXPORT_HEADERS, PDF_DEFAULT_COLUMNS, PdfReportOptions, VehicleRepository, export_vehicles,
+    iter_export_rows,
+)
+from synthetic_fleet import make_database
+
+# Au-delà, l'ancien export dépasse plusieurs minutes
+LEGACY_MAX_SIZE = 10000
+
+
+def legacy_pdf(repository: VehicleRepository, file_path: str, columns):
+    # Ancien VehicleManagementApp.export_to_pdf : un seul tableau, colonnes de largeur égale
+    header = [EXPORT_HEADERS[name] for name in ["id"] + columns]
+    data = [header] + [[str(value) for value in row] for row in iter_export_rows(repository, columns)]
+    doc = SimpleDocTemplate(file_path, pagesize=landscape(A4))
+    col_widths = [(doc.width - inch) / len(header)] * len(header)
+    table = Table(data, colWidths=col_widths, repeatRows=1)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), pdf_colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), pdf_colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), pdf_colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, pdf_colors.black),
+        ('FONTSIZE', (0, 1), (-1, -1), 8),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [pdf_colors.whitesmoke, pdf_colors.lightgrey]),
+    ]))
+    doc.build([table])
+
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main(sizes):
+    print(f"{os.cpu_count()} processeur(s)")
+    print(f"{'véhicules':>10} {'ancien (s)':>11} {'pages (s)':>10} {'parallèle (s)':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "rapport.pdf")
+        for size in sizes:
+            db_path = make_database(size, directory)
+            repository = VehicleRepository(db_path=db_path, xlsx_path=None)
+            legacy = "-"
+            if size <= LEGACY_MAX_SIZE:
+                legacy = f"{timed(lambda: legacy_pdf(repository, file_path, PDF_DEFAULT_COLUMNS)):.1f}"
+            sequential = timed(lambda: export_vehicles(
+                repository, file_path, "PDF", PDF_DEFAULT_COLUMNS,
+                pdf_options=PdfReportOptions(section_by="site", parallel=False),
+            ))
+            parallel = timed(lambda: export_vehicles(
+                repository, file_path, "PDF", PDF_DEFAULT_COLUMNS,
+                pdf_options=PdfReportOptions(section_by="site"),
+            ))
+            print(f"{size:>10} {legacy:>11} {sequential:>10.1f} {parallel:>14.1f}")
+            repository.close()
+            os.remove(db_path)
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or [1000, 10000, 50000])
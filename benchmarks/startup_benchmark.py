@@ -0,0 +1,164 @@
+"""
+Mesure le temps de démarrage de CarLogix dans un nouvel interpréteur :
+premier affichage (page.add de la fenêtre principale) puis fenêtre complète
+(flotte chargée, statistiques et liste affichées), et liste les imports les
+plus coûteux avant le premier affichage (python -X importtime). Mesure
+aussi l'import du cœur sans interface (carlogix.core), utilisé par les scripts.
+
+Avec --check, le script échoue (code de sortie 1) si le premier affichage
+dépasse le budget, si une dépendance lourde est importée avant lui ou si
+carlogix.core charge Flet ou une dépendance lourde.
+
+Usage : python benchmarks/startup_benchmark.py [--check] [--budget secondes] [--size taille]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic_fleet import make_database
+
+# Budget du premier affichage, interpréteur compris
+STARTUP_BUDGET = 1.5
+
+# Dépendances chargées à la demande (exports, statistiques, validation)
+LAZY_MODULES = ("pandas", "openpyxl", "reportlab", "pypdf", "tkinter", "pydantic")
+
+PAINT_MARKER = "-- premier affichage --"
+
+# Exécuté dans l'interpréteur mesuré : une page minimale note l'instant du premier affichage
+CHILD = f"""
+import sys
+from CarLogix import VehicleManagementApp, VehicleRepository
+
+class NullPubSub:
+    def subscribe_topic(self, topic, handler):
+        pass
+
+class FirstPaintPage:
+    painted = False
+    pubsub = NullPubSub()
+
+    def add(self, *controls):
+        if not self.painted:
+            self.painted = True
+            loaded = [name for name in {LAZY_MODULES!r} if name in sys.modules]
+            sys.stderr.write({PAINT_MARKER!r} + "\\n")
+            sys.stderr.flush()
+            print("paint", *loaded, flush=True)
+
+    def update(self, *controls):
+        pass
+
+VehicleManagementApp(FirstPaintPage(), VehicleRepository(db_path=sys.argv[1], xlsx_path=None))
+print("ready", flush=True)
+"""
+
+
+# Import du cœur seul : ni Flet ni dépendance lourde
+CORE_CHILD = f"""
+import sys
+import carlogix.core
+print(*[name for name in ("flet",) + {LAZY_MODULES!r} if name in sys.modules])
+"""
+
+
+def run_core_import():
+    """
+    Importe carlogix.core dans un nouvel interpréteur. Retourne la durée (s)
+    jusqu'à la fin du processus et les modules indésirables chargés.
+    """
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", CORE_CHILD], capture_output=True, text=True,
+                            env=dict(os.environ, PYTHONPATH=ROOT), check=True)
+    return time.perf_counter() - start, result.stdout.split()
+
+
+def run_child(db_path: str, importtime: bool = False):
+    """
+    Lance CarLogix dans un nouvel interpréteur. Retourne les durées (s) du
+    premier affichage et de la fenêtre complète, les modules lourds déjà
+    chargés au premier affichage et la sortie d'importtime.
+    """
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", CHILD, db_path]
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    # stderr dans un fichier : la sortie d'importtime ne bloque pas l'enfant
+    with tempfile.TemporaryFile("w+") as errors:
+        start = time.perf_counter()
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=errors, text=True, env=env)
+        paint, loaded = None, []
+        for line in process.stdout:
+            words = line.split()
+            if words and words[0] == "paint":
+                paint, loaded = time.perf_counter() - start, words[1:]
+            elif words and words[0] == "ready":
+                break
+        ready = time.perf_counter() - start
+        process.communicate()
+        errors.seek(0)
+        output = errors.read()
+    if process.returncode or paint is None:
+        raise RuntimeError(f"Échec du démarrage :\n{output}")
+    return paint, ready, loaded, output
+
+
+def slowest_imports(importtime_output: str, limit: int = 10):
+    # Imports de premier niveau (cumulés) effectués avant le premier affichage
+    imports = []
+    for line in importtime_output.split(PAINT_MARKER)[0].splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit() and name.startswith("   ") and not name.startswith("    "):
+            imports.append((int(cumulative) / 1000, name.strip()))
+    return sorted(imports, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps de démarrage de CarLogix")
+    parser.add_argument("--check", action="store_true", help="échoue si le budget est dépassé")
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET, help="budget du premier affichage (s)")
+    parser.add_argument("--size", type=int, default=10000, help="nombre de véhicules de la base")
+    parser.add_argument("--repeat", type=int, default=3, help="nombre de démarrages mesurés")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = make_database(args.size, directory)
+        runs = [run_child(db_path) for _ in range(args.repeat)]
+        *_, importtime_output = run_child(db_path, importtime=True)
+    core_runs = [run_core_import() for _ in range(args.repeat)]
+
+    paint = min(run[0] for run in runs)
+    ready = min(run[1] for run in runs)
+    loaded = sorted({name for run in runs for name in run[2]})
+    print(f"{'premier affichage (s)':>24} {paint:>6.2f}   budget {args.budget:.2f}")
+    print(f"{'fenêtre complète (s)':>24} {ready:>6.2f}   {args.size} véhicules")
+    print(f"{'modules lourds chargés':>24} {', '.join(loaded) or 'aucun'}")
+    core = min(run[0] for run in core_runs)
+    core_loaded = sorted({name for run in core_runs for name in run[1]})
+    print(f"{'import carlogix.core (s)':>24} {core:>6.2f}   chargés : {', '.join(core_loaded) or 'aucun'}")
+    print("\nImports les plus longs avant le premier affichage (ms, cumulés) :")
+    for milliseconds, name in slowest_imports(importtime_output):
+        print(f"{milliseconds:>10.0f}  {name}")
+
+    if args.check:
+        failures = []
+        if paint > args.budget:
+            failures.append(f"premier affichage en {paint:.2f} s (budget {args.budget:.2f} s)")
+        if loaded:
+            failures.append(f"importés avant le premier affichage : {', '.join(loaded)}")
+        if core_loaded:
+            failures.append(f"importés par carlogix.core : {', '.join(core_loaded)}")
+        if failures:
+            print("\nÉCHEC : " + " ; ".join(failures))
+            sys.exit(1)
+        print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Flotte synthétique déterministe pour les benchmarks : immatriculations SIV
+uniques, marques et motorisations pondérées, dates et kilométrages cohérents
+entre eux (révisions, contrôles techniques), répartition par site et statut.
+
+Une même graine et une même date de référence donnent la même flotte ; les
+dates sont relatives à la date de référence (aujourd'hui par défaut), pour que
+la part de véhicules en alerte ne dépende pas du jour de la mesure.
+
+Un historique de relevés kilométriques mensuels peut être ajouté
+(generate_odometer_readings), cohérent avec le kilométrage de chaque véhicule,
+ainsi qu'un flux de relevés de télématique du jour (write_telematics_feed).
+
+Usage : python benchmarks/synthetic_fleet.py taille fichier.db [graine] [mois d'historique]
+"""
+import math
+import os
+import random
+import sys
+from datetime import date, timedelta
+from typing import Iterator, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from carlogix.core import OdometerReading, Vehicle, VehicleRepository
+
+# Tailles de flotte de référence
+FLEET_SIZES = (1000, 10000, 100000, 1000000)
+
+# marque : (poids, [(véhicule, [(motorisation, carburant)])])
+CATALOGUE = {
+    "RENAULT": (24, [
+        ("Clio", [("1.0 TCe 90", "Essence"), ("1.5 Blue dCi 100", "Diesel"), ("E-Tech 145", "Hybride")]),
+        ("Mégane", [("1.3 TCe 140", "Essence"), ("1.5 Blue dCi 115", "Diesel")]),
+        ("Kangoo", [("1.5 Blue dCi 95", "Diesel"), ("E-Tech Electric", "Électrique")]),
+        ("Zoe", [("R110", "Électrique")]),
+    ]),
+    "PEUGEOT": (22, [
+        ("208", [("1.2 PureTech 100", "Essence"), ("1.5 BlueHDi 100", "Diesel"), ("e-208", "Électrique")]),
+        ("308", [("1.2 PureTech 130", "Essence"), ("1.5 BlueHDi 130", "Diesel"), ("Hybrid 180", "Hybride")]),
+        ("Partner", [("1.5 BlueHDi 100", "Diesel"), ("e-Partner", "Électrique")]),
+    ]),
+    "CITROËN": (14, [
+        ("C3", [("1.2 PureTech 83", "Essence"), ("1.5 BlueHDi 100", "Diesel")]),
+        ("Berlingo", [("1.5 BlueHDi 100", "Diesel"), ("ë-Berlingo", "Électrique")]),
+        ("Jumpy", [("2.0 BlueHDi 145", "Diesel")]),
+    ]),
+    "DACIA": (10, [
+        ("Sandero", [("1.0 TCe 90", "Essence"), ("ECO-G 100", "GPL")]),
+        ("Duster", [("1.5 Blue dCi 115", "Diesel"), ("ECO-G 100", "GPL")]),
+    ]),
+    "TOYOTA": (9, [
+        ("Yaris", [("1.5 Hybrid 116", "Hybride")]),
+        ("Corolla", [("1.8 Hybrid 140", "Hybride")]),
+        ("Proace", [("2.0 D-4D 145", "Diesel")]),
+    ]),
+    "VOLKSWAGEN": (8, [
+        ("Polo", [("1.0 TSI 95", "Essence")]),
+        ("Golf", [("1.5 TSI 130", "Essence"), ("2.0 TDI 115", "Diesel")]),
+        ("Caddy", [("2.0 TDI 102", "Diesel")]),
+    ]),
+    "FORD": (7, [
+        ("Fiesta", [("1.0 EcoBoost 100", "Essence")]),
+        ("Transit", [("2.0 EcoBlue 130", "Diesel")]),
+    ]),
+    "FIAT": (6, [
+        ("500", [("1.0 Hybrid 70", "Hybride"), ("500e", "Électrique")]),
+        ("Doblo", [("1.5 BlueHDi 100", "Diesel")]),
+    ]),
+}
+
+SITES = (("ELAN", 40), ("DSO", 25), ("DSE", 20), ("DNE", 15))
+SOCIETES = (("ARVAL", 60), ("JIVAGO", 40))
+STATUTS = (("En service", 85), ("En maintenance", 10), ("Hors service", 5))
+
+# carburant : (Crit'Air, huile, périodicité de révision en km, km par jour médian)
+MOTORISATIONS = {
+    "Essence": ("1", "5W30", 20000, 35),
+    "Diesel": ("2", "5W30", 30000, 60),
+    "Hybride": ("1", "0W20", 15000, 40),
+    "Électrique": ("0", "", 30000, 30),
+    "GPL": ("1", "5W40", 15000, 45),
+}
+
+PRENOMS = ("Camille", "Louis", "Léa", "Hugo", "Manon", "Lucas", "Chloé", "Nathan", "Inès", "Karim",
+           "Sarah", "Thomas", "Yasmine", "Julien", "Emma", "Mehdi", "Claire", "Antoine", "Nora", "Paul")
+NOMS = ("MARTIN", "BERNARD", "DUBOIS", "THOMAS", "ROBERT", "RICHARD", "PETIT", "DURAND", "LEROY",
+        "MOREAU", "SIMON", "LAURENT", "LEFEBVRE", "MICHEL", "GARCIA", "DAVID", "BERTRAND", "ROUX",
+        "BENALI", "FOURNIER", "GIRARD", "BONNET", "DUPONT", "LAMBERT", "FONTAINE", "ROUSSEAU")
+
+# Lettres des plaques SIV (ni I, ni O, ni U)
+PLATE_LETTERS = "ABCDEFGHJKLMNPQRSTVWXYZ"
+_PAIRS = len(PLATE_LETTERS) ** 2
+_PLATES = _PAIRS * 999 * _PAIRS
+# Premier avec _PLATES : index -> plaque est une bijection
+_PLATE_STRIDE = 1000003
+
+# Premier contrôle technique à 4 ans, puis tous les 2 ans
+FIRST_CT_DAYS = 4 * 365
+CT_PERIOD_DAYS = 2 * 365
+
+# Un relevé tous les READING_PERIOD_DAYS jours dans l'historique synthétique
+READING_PERIOD_DAYS = 30
+
+
+def plate(index: int, seed: int = 0) -> str:
+    """
+    Immatriculation SIV (AB-123-CD) du véhicule n° index, unique pour une graine.
+    """
+    number = (index * _PLATE_STRIDE + seed * 7919) % _PLATES
+    number, right = divmod(number, _PAIRS)
+    left, digits = divmod(number, 999)
+    return (
+        f"{PLATE_LETTERS[left // len(PLATE_LETTERS)]}{PLATE_LETTERS[left % len(PLATE_LETTERS)]}"
+        f"-{digits + 1:03d}-"
+        f"{PLATE_LETTERS[right // len(PLATE_LETTERS)]}{PLATE_LETTERS[right % len(PLATE_LETTERS)]}"
+    )
+
+
+def _weighted(choices):
+    values = [value for value, _ in choices]
+    weights = [weight for _, weight in choices]
+    return lambda rng: rng.choices(values, weights)[0]
+
+
+def generate_fleet(size: int, seed: int = 0, reference: Optional[date] = None) -> Iterator[Vehicle]:
+    """
+    Génère size véhicules (ID 1 à size) sans les garder en mémoire : le
+    générateur peut être passé tel quel à VehicleRepository.add_vehicles.
+    """
+    rng = random.Random(seed)
+    reference = reference or date.today()
+    pick_marque = _weighted([(marque, weight) for marque, (weight, _) in CATALOGUE.items()])
+    pick_site = _weighted(SITES)
+    pick_societe = _weighted(SOCIETES)
+    pick_statut = _weighted(STATUTS)
+    # Un utilisateur pour 3 véhicules environ
+    utilisateurs = [f"{rng.choice(PRENOMS)} {rng.choice(NOMS)}" for _ in range(max(1, size // 3))]
+
+    for index in range(size):
+        marque = pick_marque(rng)
+        vehicule, motorisations = rng.choice(CATALOGUE[marque][1])
+        modele, carburant = rng.choice(motorisations)
+        crit_air, huile, periodicite, km_par_jour = MOTORISATIONS[carburant]
+
+        # Flotte plutôt récente : de 1 mois à 10 ans, le plus souvent un peu plus d'un an
+        age = int(rng.triangular(30, 3650, 400))
+        mise_en_service = reference - timedelta(days=age)
+        km_par_jour = rng.lognormvariate(math.log(km_par_jour), 0.5)
+        releve_kms = int(age * km_par_jour)
+
+        # Dernière révision : environ 13 % des véhicules ont dépassé la périodicité
+        km_depuis_revision = min(releve_kms, rng.randrange(int(periodicite * 1.15)))
+        derniere_revision = releve_kms - km_depuis_revision
+        jours_depuis_revision = min(age, int(km_depuis_revision / km_par_jour))
+
+        prochain_ct = mise_en_service + timedelta(days=FIRST_CT_DAYS)
+        while prochain_ct < reference:
+            prochain_ct += timedelta(days=CT_PERIOD_DAYS)
+        if age > FIRST_CT_DAYS and rng.random() < 0.03:
+            # contrôle technique en retard
+            prochain_ct = reference - timedelta(days=rng.randrange(1, 90))
+
+        yield Vehicle(
+            id=index + 1,
+            immatriculation=plate(index, seed),
+            code_carte=f"{rng.randrange(10000):04d}",
+            societe_proprietaire=pick_societe(rng),
+            site=pick_site(rng),
+            utilisateur=rng.choice(utilisateurs),
+            marque=marque,
+            vehicule=vehicule,
+            modele=modele,
+            date_mise_en_service=mise_en_service,
+            crit_air=crit_air,
+            carburant=carburant,
+            type_huile=huile,
+            fluide_dispo="Oui" if rng.random() < 0.7 else "Non",
+            releve_kms=releve_kms,
+            date_derniere_revision=reference - timedelta(days=jours_depuis_revision),
+            derniere_revision=derniere_revision,
+            periodicite_revision=periodicite,
+            prochain_ct=prochain_ct,
+            double_clef="Oui" if rng.random() < 0.8 else "Non",
+            numero_scelle=str(rng.randrange(100000, 1000000)),
+            statut=pick_statut(rng),
+        )
+
+
+def generate_odometer_readings(size: int, seed: int = 0, reference: Optional[date] = None,
+                               months: int = 12) -> Iterator[OdometerReading]:
+    """
+    Relevés mensuels des months derniers mois (hors relevé du jour, enregistré
+    avec le véhicule) de la flotte generate_fleet(size, seed, reference) :
+    rythme propre à chaque véhicule, variable d'un mois à l'autre.
+    """
+    rng = random.Random(seed + 1)
+    reference = reference or date.today()
+    for vehicle in generate_fleet(size, seed, reference):
+        age = (reference - vehicle.date_mise_en_service).days
+        kms_per_day = vehicle.releve_kms / age
+        kms = vehicle.releve_kms
+        for month in range(1, months + 1):
+            day = reference - timedelta(days=month * READING_PERIOD_DAYS)
+            if day <= vehicle.date_mise_en_service:
+                break
+            kms -= int(READING_PERIOD_DAYS * kms_per_day * rng.uniform(0.6, 1.4))
+            if kms <= 0:
+                break
+            yield OdometerReading(vehicle.id, day, kms)
+
+
+def write_telematics_feed(size: int, file_path: str, rows: int, seed: int = 0, reference: Optional[date] = None,
+                          chunk_size: int = 1000000) -> str:
+    """
+    Écrit un flux CSV de rows relevés de télématique (immatriculation,
+    horodatage, kms) de la flotte generate_fleet(size, seed, reference),
+    horodatés le jour de référence, dans le désordre : le compteur avance au
+    rythme propre à chaque véhicule. Environ 0,5 % des lignes portent une
+    plaque inconnue et 0,1 % un kilométrage en recul.
+    """
+    import numpy as np
+    import pandas as pd
+
+    reference = reference or date.today()
+    plates, kms, kms_per_day = [], [], []
+    for vehicle in generate_fleet(size, seed, reference):
+        plates.append(vehicle.immatriculation)
+        kms.append(vehicle.releve_kms)
+        kms_per_day.append(vehicle.releve_kms / (reference - vehicle.date_mise_en_service).days)
+    plates, kms, kms_per_day = np.array(plates, dtype=object), np.array(kms), np.array(kms_per_day)
+
+    rng = np.random.default_rng(seed)
+    header = True
+    for start in range(0, rows, chunk_size):
+        count = min(chunk_size, rows - start)
+        vehicles = rng.integers(0, size, count)
+        seconds = rng.integers(0, 86400, count)
+        feed_plates = plates[vehicles]
+        unknown = rng.random(count) < 0.005
+        feed_plates[unknown] = [f"ZZ-{number:03d}-ZZ" for number in rng.integers(1, 1000, int(unknown.sum()))]
+        feed_kms = kms[vehicles] + (kms_per_day[vehicles] * seconds / 86400).astype(np.int64)
+        rollback = rng.random(count) < 0.001
+        feed_kms[rollback] -= rng.integers(1, 1000, int(rollback.sum()))
+        pd.DataFrame({
+            "immatriculation": feed_plates,
+            "horodatage": np.datetime_as_string(np.datetime64(reference, "s") + seconds.astype("timedelta64[s]")),
+            "kms": feed_kms,
+        }).to_csv(file_path, mode="w" if header else "a", header=header, index=False)
+        header = False
+    return file_path
+
+
+def write_database(size: int, db_path: str, seed: int = 0, reference: Optional[date] = None,
+                   history_months: int = 0) -> str:
+    """
+    Enregistre une flotte synthétique (et history_months mois de relevés)
+    dans une nouvelle base SQLite.
+    """
+    repository = VehicleRepository(db_path=db_path, xlsx_path=None)
+    try:
+        repository.add_vehicles(generate_fleet(size, seed, reference), chunk_size=10000)
+        if history_months:
+            repository.add_odometer_readings(generate_odometer_readings(size, seed, reference, history_months))
+    finally:
+        repository.close()
+    return db_path
+
+
+def make_database(size: int, directory: str, seed: int = 0, history_months: int = 0) -> str:
+    db_path = os.path.join(directory, "fleet.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    return write_database(size, db_path, seed, history_months=history_months)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        sys.exit(__doc__.strip().splitlines()[-1])
+    write_database(int(sys.argv[1]), sys.argv[2], int(sys.argv[3]) if len(sys.argv) > 3 else 0,
+                   history_months=int(sys.argv[4]) if len(sys.argv) > 4 else 0)
@@ -0,0 +1,74 @@
+"""
+Mesure l'ingestion d'un flux de relevés de télématique par la ligne de
+commande (python -m carlogix releves) : durée totale et mémoire
+maximale du processus, pour des flux de plus en plus longs sur une même
+flotte. La mémoire doit dépendre de la flotte et des paquets, pas du flux.
+
+Usage : python benchmarks/telematics_benchmark.py [--fleet 100000] [--rows 1000000 10000000 ...]
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from carlogix.core import FEED_CHUNK_SIZE
+from synthetic_fleet import write_database, write_telematics_feed
+
+# Objectif : 10 millions de relevés en moins d'une minute (en deçà, le
+# démarrage du processus et le chargement de la flotte dominent)
+TARGET_ROWS = 10000000
+TARGET_SECONDS = 60
+
+
+def ingest(feed_path: str, db_path: str, chunk_size: int):
+    """
+    Ingère le flux dans un processus séparé. Retourne (durée en s, mémoire
+    maximale en Mo, sortie de la commande).
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "carlogix", "releves", feed_path, "--db", db_path,
+         "--chunk-size", str(chunk_size)],
+        cwd=ROOT, stdout=subprocess.PIPE, text=True,
+    )
+    output = process.stdout.read()
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode:
+        sys.exit(f"Échec de l'ingestion ({process.returncode})")
+    # ru_maxrss : Ko sous Linux
+    return elapsed, usage.ru_maxrss / 1024, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'ingestion des relevés de télématique")
+    parser.add_argument("--fleet", type=int, default=100000, help="véhicules de la flotte")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000000, 10000000], help="lignes des flux")
+    parser.add_argument("--chunk-size", type=int, default=FEED_CHUNK_SIZE, help="lignes lues par paquet")
+    parser.add_argument("--seed", type=int, default=0, help="graine de la flotte synthétique")
+    args = parser.parse_args()
+
+    print(f"{'véhicules':>10} {'lignes':>10} {'durée (s)':>10} {'lignes/s':>10} {'mémoire (Mo)':>13}")
+    with tempfile.TemporaryDirectory() as directory:
+        fleet_path = write_database(args.fleet, os.path.join(directory, "fleet.db"), args.seed)
+        db_path = os.path.join(directory, "ingest.db")
+        for rows in args.rows:
+            feed_path = write_telematics_feed(args.fleet, os.path.join(directory, "feed.csv"), rows, args.seed)
+            shutil.copyfile(fleet_path, db_path)
+            elapsed, memory, output = ingest(feed_path, db_path, args.chunk_size)
+            status = "  (objectif non atteint)" if rows >= TARGET_ROWS and elapsed > TARGET_SECONDS * rows / TARGET_ROWS else ""
+            print(f"{args.fleet:>10} {rows:>10} {elapsed:>10.2f} {rows / elapsed:>10.0f} {memory:>13.0f}{status}")
+            # Bilan de la commande, sans les exemples de plaques inconnues et de reculs
+            print("\n".join("    " + line for line in output.splitlines()[:2]))
+            os.remove(feed_path)
+
+
+if __name__ == "__main__":
+    main()
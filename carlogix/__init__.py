@@ -0,0 +1,4 @@
+"""
+CarLogix : gestion de parc de véhicules. Le cœur sans interface est dans
+carlogix.core ; l'interface Flet reste dans CarLogix.py.
+"""
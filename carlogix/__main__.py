@@ -0,0 +1,59 @@
+"""
+Ligne de commande de CarLogix, sans interface.
+
+Usage :
+    python -m carlogix releves flux.csv [--db CarLogix_DATA.db] [--chunk-size N] [--delimiter ;] [--dry-run]
+"""
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+from carlogix.core import FEED_CHUNK_SIZE, VehicleRepository, ingest_odometer_feed
+
+
+def ingest_feed(args: argparse.Namespace) -> int:
+    # VehicleRepository créerait une base vide à la place d'un chemin mal saisi
+    if not os.path.exists(args.db):
+        print(f"Erreur : base introuvable : {args.db}", file=sys.stderr)
+        return 1
+    repository = VehicleRepository(db_path=args.db, xlsx_path=None)
+    try:
+        report = ingest_odometer_feed(repository, args.feed, args.chunk_size, args.delimiter, args.dry_run)
+    except (OSError, ValueError) as error:
+        print(f"Erreur : {error}", file=sys.stderr)
+        return 1
+    finally:
+        repository.close()
+
+    print(f"{report.rows} lignes lues, {report.applied} relevés "
+          f"{'à enregistrer' if args.dry_run else 'enregistrés'}")
+    print(f"{report.ignored_rows} ignorées (déjà connues ou dépassées), {report.invalid_rows} illisibles, "
+          f"{report.unknown_rows} sans véhicule, {report.rollback_rows} reculs du compteur")
+    if report.unknown_plates:
+        print(f"Immatriculations inconnues : {', '.join(map(str, report.unknown_plates))}")
+    for plate, day, kms, latest in report.rollbacks:
+        print(f"Recul du compteur : {plate} le {day:%d/%m/%Y}, {kms} km après un relevé à {latest} km")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m carlogix", description="CarLogix sans interface")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    releves = commands.add_parser(
+        "releves", help="ingère un flux CSV de relevés kilométriques (immatriculation, date, kms)",
+    )
+    releves.add_argument("feed", help="fichier CSV du flux")
+    releves.add_argument("--db", default="CarLogix_DATA.db", help="base SQLite de CarLogix")
+    releves.add_argument("--chunk-size", type=int, default=FEED_CHUNK_SIZE, help="lignes lues par paquet")
+    releves.add_argument("--delimiter", help="séparateur (détecté par défaut)")
+    releves.add_argument("--dry-run", action="store_true", help="analyse le flux sans rien enregistrer")
+    releves.set_defaults(run=ingest_feed)
+
+    args = parser.parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
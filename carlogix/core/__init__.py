@@ -0,0 +1,47 @@
+"""
+Cœur de CarLogix, sans interface : dépôt SQLite, modèle des véhicules,
+moteur d'alertes, statistiques, imports (dont les relevés de la
+télématique) et exports.
+
+Importable sans Flet et sans effet de bord (aucun serveur, aucune fenêtre),
+depuis un script, un worker ou l'interface (CarLogix.py). Les dépendances
+lourdes (pandas, openpyxl, reportlab, pypdf, pydantic) ne sont chargées
+que par les fonctions qui s'en servent.
+"""
+from .aio import AsyncVehicleRepository, shared_async_repository
+from .alerts import (
+    SEVERITY_NONE, SEVERITY_OVERDUE, SEVERITY_WARNING, AlertThresholds, FleetAlerts, compute_fleet_alerts,
+)
+from .columns import CATEGORICAL_FIELDS, FleetColumns
+from .deadlines import (
+    DEADLINE_CT, DEADLINE_KINDS, DEADLINE_REVISION, DEADLINE_REVISION_KMS, Deadline, DeadlineIndex,
+)
+from .events import CHANGE_ADDED, CHANGE_DELETED, CHANGE_RELOADED, CHANGE_UPDATED, VehicleChange
+from .export import (
+    EXPORT_CANCELLED, EXPORT_DONE, EXPORT_FAILED, EXPORT_FORMATS, EXPORT_HEADERS, EXPORT_RUNNING,
+    PDF_DEFAULT_COLUMNS, PDF_SECTION_FIELDS, ExportCancelled, ExportJob, ExportWorker, PdfReportOptions,
+    export_vehicles, iter_export_rows, shared_export_worker,
+)
+from .importer import ImportReport, import_vehicles, read_vehicle_rows
+from .metrics import (
+    METRICS, METRICS_PORT, MetricsRegistry, OperationStats, serve_metrics, shared_metrics_server, timed,
+)
+from .models import (
+    DATE_FIELDS, EXCEL_HEADERS, KMS_FIELDS, VEHICLE_FIELDS, DataQualityIssue, Vehicle,
+    format_date, format_field, parse_date, parse_kms, vehicle_model,
+)
+from .odometer import (
+    DAYS_PER_MONTH, MIN_RATE_SPAN_DAYS, RATE_WINDOW_DAYS, FleetProjection, OdometerHistory, OdometerReading,
+    project_fleet, project_vehicle,
+)
+from .repository import SCHEMA_VERSION, StaleVehicleError, VehicleRepository, shared_repository
+from .search import SEARCH_FIELDS, VehicleSearchIndex
+from .stats import FleetSnapshot, compute_fleet_snapshot
+from .telematics import FEED_CHUNK_SIZE, FEED_HEADERS, IngestReport, ingest_odometer_feed
+
+
+def __getattr__(name: str):
+    # VehicleModel est construit à la demande (pydantic)
+    if name == "VehicleModel":
+        return vehicle_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
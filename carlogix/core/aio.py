@@ -0,0 +1,152 @@
+"""
+Façade asyncio du dépôt, pour les gestionnaires async de l'interface Flet.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, TypeVar
+
+from .events import VehicleChange
+from .repository import VehicleRepository
+from .telematics import FEED_CHUNK_SIZE, ingest_odometer_feed
+
+if TYPE_CHECKING:
+    from .columns import FleetColumns
+    from .models import DataQualityIssue, Vehicle, VehicleModel
+    from .odometer import OdometerReading
+    from .telematics import IngestReport
+
+T = TypeVar("T")
+
+
+class AsyncVehicleRepository:
+    """
+    Méthodes awaitables sur un VehicleRepository : chaque appel bloquant
+    (SQLite, verrou de fichier, openpyxl) tourne dans un pool de threads et
+    la boucle asyncio reste libre pour les autres sessions.
+
+    Les écritures passent par un seul thread, dans l'ordre d'appel (elles sont
+    de toute façon sérialisées par le dépôt) ; les lectures ont leur propre
+    pool et ne font pas la queue derrière une sauvegarde lente. Le nombre de
+    threads ne dépend donc pas du nombre de sessions.
+
+    Une lecture concurrente d'une écriture reste cohérente : chaque méthode
+    du dépôt prend son verrou, et la flotte est lue sur un instantané
+    (fleet_columns) que les écritures ne modifient pas.
+    """
+
+    def __init__(self, repository: VehicleRepository, max_readers: int = 4):
+        self.repository = repository
+        self._read_executor = ThreadPoolExecutor(max_readers, thread_name_prefix="carlogix-lecture")
+        self._write_executor = ThreadPoolExecutor(1, thread_name_prefix="carlogix-ecriture")
+
+    async def _run(self, executor: ThreadPoolExecutor, function: Callable[..., T], *args, **kwargs) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, partial(function, *args, **kwargs))
+
+    async def run_in_reader(self, function: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Exécute function dans le pool de lecture : calculs sur la flotte
+        (alertes, statistiques) qui lisent le dépôt sans le modifier. function
+        ne doit lire le dépôt que par ses méthodes publiques, et la flotte que
+        par fleet_columns() : jamais son état interne, modifié par les écritures.
+        """
+        return await self._run(self._read_executor, function, *args, **kwargs)
+
+    async def run_in_writer(self, function: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Exécute function dans le thread des écritures, après celles déjà demandées.
+        """
+        return await self._run(self._write_executor, function, *args, **kwargs)
+
+    # Lectures
+
+    async def fetch_all_vehicles(self) -> List[Vehicle]:
+        return await self.run_in_reader(self.repository.fetch_all_vehicles)
+
+    async def fleet_columns(self) -> FleetColumns:
+        # Instantané : lisible depuis la boucle pendant les écritures suivantes
+        return await self.run_in_reader(self.repository.fleet_columns)
+
+    async def get_vehicle(self, id: int) -> Optional[Vehicle]:
+        return await self.run_in_reader(self.repository.get_vehicle, id)
+
+    async def get_vehicles(self, ids: Iterable[int]) -> Dict[int, Vehicle]:
+        return await self.run_in_reader(self.repository.get_vehicles, list(ids))
+
+    async def search_vehicles(self, text: str) -> List[Vehicle]:
+        return await self.run_in_reader(self.repository.search_vehicles, text)
+
+    async def search_vehicle_ids(self, text: str) -> List[int]:
+        return await self.run_in_reader(self.repository.search_vehicle_ids, text)
+
+    async def data_quality_report(self) -> List[DataQualityIssue]:
+        return await self.run_in_reader(self.repository.data_quality_report)
+
+    async def count_rows(self, filters: Optional[Dict[str, object]] = None) -> int:
+        return await self.run_in_reader(self.repository.count_rows, filters)
+
+    async def odometer_readings(self, vehicle_id: int) -> List[OdometerReading]:
+        return await self.run_in_reader(self.repository.odometer_readings, vehicle_id)
+
+    # Écritures
+
+    async def add_vehicle(self, vehicle: VehicleModel) -> int:
+        return await self.run_in_writer(self.repository.add_vehicle, vehicle)
+
+    async def add_vehicles(self, vehicles: Iterable[VehicleModel], chunk_size: int = 1000) -> List[int]:
+        return await self.run_in_writer(self.repository.add_vehicles, vehicles, chunk_size)
+
+    async def update_vehicle(self, vehicle: VehicleModel):
+        await self.run_in_writer(self.repository.update_vehicle, vehicle)
+
+    async def delete_vehicle(self, id: int):
+        await self.run_in_writer(self.repository.delete_vehicle, id)
+
+    async def add_odometer_readings(self, readings: Iterable[OdometerReading], chunk_size: int = 10000) -> int:
+        return await self.run_in_writer(self.repository.add_odometer_readings, readings, chunk_size)
+
+    async def apply_odometer_readings(self, readings: Iterable[OdometerReading], chunk_size: int = 10000) -> int:
+        return await self.run_in_writer(self.repository.apply_odometer_readings, readings, chunk_size)
+
+    async def ingest_odometer_feed(self, file_path: str, chunk_size: int = FEED_CHUNK_SIZE,
+                                   delimiter: Optional[str] = None, dry_run: bool = False) -> IngestReport:
+        return await self.run_in_writer(
+            ingest_odometer_feed, self.repository, file_path, chunk_size, delimiter, dry_run,
+        )
+
+    async def import_xlsx(self, file_path: str, keep_ids: bool = False) -> int:
+        return await self.run_in_writer(self.repository.import_xlsx, file_path, keep_ids)
+
+    async def flush(self) -> int:
+        return await self.run_in_writer(self.repository.flush)
+
+    def subscribe(self, listener: Callable[[VehicleChange], None]) -> Callable[[], None]:
+        return self.repository.subscribe(listener)
+
+    def close(self):
+        """
+        Arrête les pools de threads après les appels en cours. Le dépôt n'est
+        pas fermé (il peut être partagé).
+        """
+        self._write_executor.shutdown(wait=True)
+        self._read_executor.shutdown(wait=True)
+
+
+_shared_async_repositories: Dict[int, AsyncVehicleRepository] = {}
+_shared_async_lock = threading.Lock()
+
+
+def shared_async_repository(repository: VehicleRepository) -> AsyncVehicleRepository:
+    """
+    Façade asynchrone unique pour repository, partagée par toutes les sessions
+    de l'interface : un seul pool de threads par processus.
+    """
+    with _shared_async_lock:
+        async_repository = _shared_async_repositories.get(id(repository))
+        if async_repository is None or async_repository.repository is not repository:
+            async_repository = _shared_async_repositories[id(repository)] = AsyncVehicleRepository(repository)
+        return async_repository
@@ -0,0 +1,122 @@
+"""
+Moteur d'alertes d'entretien et de contrôle technique, vectorisé sur les colonnes de la flotte.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .columns import FleetColumns
+from .metrics import timed
+
+
+# Niveaux d'alerte du moteur d'entretien / contrôle technique
+SEVERITY_NONE = 0
+SEVERITY_WARNING = 1
+SEVERITY_OVERDUE = 2
+
+
+@dataclass
+class AlertThresholds:
+    revision_kms: int = 1000
+    revision_days: int = 45
+    revision_interval_days: int = 365
+    ct_days: int = 60
+
+
+@dataclass
+class FleetAlerts:
+    """
+    Résultat du moteur d'alertes : une valeur par véhicule, dans l'ordre de ids.
+    """
+    ids: np.ndarray
+    prochaine_revision_kms: np.ndarray
+    kms_difference: np.ndarray
+    days_to_revision: np.ndarray
+    days_to_ct: np.ndarray
+    maintenance_severity: np.ndarray
+    ct_severity: np.ndarray
+
+    @property
+    def maintenance_count(self) -> int:
+        return int(np.count_nonzero(self.maintenance_severity))
+
+    @property
+    def ct_count(self) -> int:
+        return int(np.count_nonzero(self.ct_severity))
+
+    def maintenance_rows(self) -> np.ndarray:
+        return np.flatnonzero(self.maintenance_severity)
+
+    def ct_rows(self) -> np.ndarray:
+        return np.flatnonzero(self.ct_severity)
+
+
+def _kms_column(fleet: FleetColumns, name: str) -> np.ndarray:
+    # Kilométrage absent (ou signalé illisible au chargement) : 0, comme int(valeur or 0)
+    return np.where(fleet.missing(name), 0, fleet.column(name))
+
+
+def _days_until_column(fleet: FleetColumns, name: str, today: date, offset_days: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    dates = fleet.column(name)
+    valid = ~np.isnat(dates)
+    days = (dates.astype("datetime64[D]") - np.datetime64(today, "D")).astype(np.int64)
+    return np.where(valid, days + offset_days, 0), valid
+
+
+@timed("alerts.compute_fleet_alerts", rows=lambda alerts: len(alerts.ids))
+def compute_fleet_alerts(fleet, thresholds: Optional[AlertThresholds] = None,
+                         today: Optional[date] = None) -> FleetAlerts:
+    """
+    Calcule en une passe vectorisée les échéances de révision (km et jours)
+    et de contrôle technique de toute la flotte, avec leur niveau d'alerte.
+    fleet est un FleetColumns ou une liste de Vehicle.
+    """
+    if not isinstance(fleet, FleetColumns):
+        fleet = FleetColumns.from_vehicles(fleet)
+    thresholds = thresholds or AlertThresholds()
+    today = today or date.today()
+
+    derniere_revision = _kms_column(fleet, "derniere_revision")
+    periodicite = _kms_column(fleet, "periodicite_revision")
+    releve_kms = _kms_column(fleet, "releve_kms")
+    days_to_revision, revision_date_valid = _days_until_column(
+        fleet, "date_derniere_revision", today, thresholds.revision_interval_days
+    )
+    days_to_ct, ct_date_valid = _days_until_column(fleet, "prochain_ct", today)
+
+    prochaine_revision_kms = derniere_revision + periodicite
+    kms_difference = prochaine_revision_kms - releve_kms
+
+    # Révision : alerte proche en km ou en jours, sinon dépassée
+    maintenance_valid = revision_date_valid
+    revision_warning = (
+        ((kms_difference >= 0) & (kms_difference <= thresholds.revision_kms))
+        | ((days_to_revision > 0) & (days_to_revision <= thresholds.revision_days))
+    )
+    revision_overdue = (kms_difference < 0) | (days_to_revision < 0)
+    maintenance_severity = np.select(
+        [maintenance_valid & revision_warning, maintenance_valid & revision_overdue],
+        [SEVERITY_WARNING, SEVERITY_OVERDUE],
+        SEVERITY_NONE,
+    ).astype(np.int8)
+
+    # Contrôle technique : dépassé, ou dans moins de ct_days jours
+    ct_severity = np.select(
+        [ct_date_valid & (days_to_ct < 0), ct_date_valid & (days_to_ct <= thresholds.ct_days)],
+        [SEVERITY_OVERDUE, SEVERITY_WARNING],
+        SEVERITY_NONE,
+    ).astype(np.int8)
+
+    return FleetAlerts(
+        ids=fleet.ids.copy(),
+        prochaine_revision_kms=prochaine_revision_kms,
+        kms_difference=kms_difference,
+        days_to_revision=days_to_revision,
+        days_to_ct=days_to_ct,
+        maintenance_severity=maintenance_severity,
+        ct_severity=ct_severity,
+    )
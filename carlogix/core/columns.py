@@ -0,0 +1,327 @@
+"""
+Stockage de la flotte en colonnes NumPy.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from .models import (
+    DATE_FIELDS, KMS_FIELDS, VEHICLE_FIELDS, DataQualityIssue, Vehicle, parse_date, parse_kms,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Colonnes encodées par dictionnaire dans FleetColumns (peu de valeurs distinctes)
+CATEGORICAL_FIELDS = ("societe_proprietaire", "site", "marque", "crit_air", "carburant", "statut")
+
+_MISSING_DATE = np.datetime64("NaT", "s")
+
+
+def _code_dtype(category_count: int) -> np.dtype:
+    # Même type de codes que pandas : pd.Categorical réutilise alors le tableau sans copie
+    if category_count < 2 ** 7:
+        return np.dtype(np.int8)
+    if category_count < 2 ** 15:
+        return np.dtype(np.int16)
+    return np.dtype(np.int32)
+
+
+class FleetColumns:
+    """
+    Flotte stockée en colonnes (struct-of-arrays) : un tableau NumPy par champ.
+    Les champs CATEGORICAL_FIELDS sont encodés par dictionnaire, les dates en
+    datetime64[s] et les kilométrages en int64 avec un masque des valeurs absentes.
+    Les Vehicle ne sont pas conservés : ils sont créés à la demande (row, get, values).
+    Les lignes sont triées par ID.
+
+    Copie sur écriture : snapshot() partage les tableaux sans les copier, et
+    la première écriture qui suit (put, remove) remplace les tableaux de
+    l'objet modifié par des copies. Une copie obtenue par snapshot() reste
+    donc cohérente, même lue depuis un autre thread pendant les écritures.
+    """
+
+    def __init__(self, capacity: int = 0):
+        self._size = 0
+        # Tableaux partagés avec un snapshot : à copier avant d'écrire
+        self._shared = False
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._row_versions = np.ones(capacity, dtype=np.int64)
+        self._columns: Dict[str, np.ndarray] = {}
+        self._missing: Dict[str, np.ndarray] = {}
+        self._categories: Dict[str, List[str]] = {}
+        self._category_codes: Dict[str, Dict[str, int]] = {}
+        for name in VEHICLE_FIELDS:
+            if name in CATEGORICAL_FIELDS:
+                self._columns[name] = np.full(capacity, -1, dtype=_code_dtype(0))
+                self._categories[name] = []
+                self._category_codes[name] = {}
+            elif name in KMS_FIELDS:
+                self._columns[name] = np.zeros(capacity, dtype=np.int64)
+                self._missing[name] = np.ones(capacity, dtype=bool)
+            elif name in DATE_FIELDS:
+                self._columns[name] = np.full(capacity, _MISSING_DATE)
+            else:
+                self._columns[name] = np.full(capacity, None, dtype=object)
+
+    @classmethod
+    def from_rows(cls, rows: List[tuple], issues: List[DataQualityIssue]) -> "FleetColumns":
+        """
+        Construit les colonnes à partir des lignes SQLite (id, VEHICLE_FIELDS
+        puis, si elle est lue, row_version).
+        Les cellules illisibles valent None et sont ajoutées à issues.
+        """
+        store = cls(len(rows))
+        store._size = len(rows)
+        columns = list(zip(*rows)) if rows else [()] * (len(VEHICLE_FIELDS) + 1)
+        store._ids[:] = columns[0]
+        for name, values in zip(VEHICLE_FIELDS, columns[1:]):
+            # Cas courant : colonne entièrement lisible, convertie en une fois
+            # (dates ISO AAAA-MM-JJ par NumPy, entiers par pandas)
+            try:
+                if name in DATE_FIELDS and set(map(len, filter(None, values))) <= {10}:
+                    store._fill_column(name, values)
+                    continue
+                if name in KMS_FIELDS:
+                    store._fill_column(name, values)
+                    continue
+            except (TypeError, ValueError):
+                pass
+            if name in DATE_FIELDS or name in KMS_FIELDS:
+                parse, message = (parse_date, "Date illisible") if name in DATE_FIELDS else (parse_kms, "Kilométrage illisible")
+                parsed = []
+                for vehicle_id, value in zip(columns[0], values):
+                    try:
+                        parsed.append(parse(value))
+                    except ValueError:
+                        issues.append(DataQualityIssue(vehicle_id, name, value, message))
+                        parsed.append(None)
+                values = parsed
+            store._fill_column(name, values)
+        if len(columns) > len(VEHICLE_FIELDS) + 1:
+            store._row_versions[:] = columns[-1]
+        return store
+
+    @classmethod
+    def from_vehicles(cls, vehicles: List[Vehicle]) -> "FleetColumns":
+        vehicles = sorted(vehicles, key=lambda vehicle: vehicle.id)
+        store = cls(len(vehicles))
+        store._size = len(vehicles)
+        store._ids[:] = [vehicle.id for vehicle in vehicles]
+        store._row_versions[:] = [vehicle.row_version for vehicle in vehicles]
+        for name in VEHICLE_FIELDS:
+            store._fill_column(name, [getattr(vehicle, name) for vehicle in vehicles])
+        return store
+
+    def _fill_column(self, name: str, values: list):
+        import pandas as pd
+
+        if name in KMS_FIELDS:
+            kms = pd.array(values, dtype="Int64")
+            self._missing[name][:] = kms.isna()
+            self._columns[name][:] = kms.to_numpy(dtype=np.int64, na_value=0)
+        elif name in DATE_FIELDS:
+            self._columns[name][:] = np.array(values, dtype="datetime64[D]")
+        else:
+            codes, uniques = pd.factorize(np.array(values, dtype=object))
+            if name in CATEGORICAL_FIELDS:
+                self._categories[name] = list(uniques)
+                self._category_codes[name] = {value: code for code, value in enumerate(uniques)}
+                self._columns[name] = codes.astype(_code_dtype(len(uniques)))
+            else:
+                # Une seule instance par texte répété (utilisateur, modèle, huile...) ;
+                # le code -1 (valeur absente) désigne le None ajouté en fin de table
+                self._columns[name][:] = np.append(uniques, None)[codes]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, vehicle_id: int) -> bool:
+        return self._position(vehicle_id) is not None
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._ids[:self._size]
+
+    def _position(self, vehicle_id: int) -> Optional[int]:
+        position = int(np.searchsorted(self.ids, vehicle_id))
+        if position < self._size and self._ids[position] == vehicle_id:
+            return position
+        return None
+
+    def row(self, position: int) -> Vehicle:
+        values = []
+        for name in VEHICLE_FIELDS:
+            value = self._columns[name][position]
+            if name in CATEGORICAL_FIELDS:
+                value = self._categories[name][value] if value >= 0 else None
+            elif name in KMS_FIELDS:
+                value = None if self._missing[name][position] else int(value)
+            elif name in DATE_FIELDS:
+                value = None if np.isnat(value) else value.astype(datetime).date()
+            values.append(value)
+        return Vehicle(int(self._ids[position]), *values, int(self._row_versions[position]))
+
+    def get(self, vehicle_id: int) -> Optional[Vehicle]:
+        position = self._position(vehicle_id)
+        return self.row(position) if position is not None else None
+
+    def values(self) -> Iterator[Vehicle]:
+        for position in range(self._size):
+            yield self.row(position)
+
+    def take(self, vehicle_ids: Iterable[int]) -> "FleetColumns":
+        """
+        Copie des lignes de vehicle_ids (ID absents ignorés), sans créer de Vehicle.
+        """
+        positions = np.flatnonzero(np.isin(self.ids, np.fromiter(vehicle_ids, dtype=np.int64)))
+        store = FleetColumns.__new__(FleetColumns)
+        store._size = len(positions)
+        store._shared = False
+        store._ids = self._ids[positions]
+        store._row_versions = self._row_versions[positions]
+        store._columns = {name: column[positions] for name, column in self._columns.items()}
+        store._missing = {name: missing[positions] for name, missing in self._missing.items()}
+        store._categories = {name: list(categories) for name, categories in self._categories.items()}
+        store._category_codes = {name: dict(codes) for name, codes in self._category_codes.items()}
+        return store
+
+    def snapshot(self) -> "FleetColumns":
+        """
+        Copie en lecture seule, sans copier les tableaux : les écritures
+        suivantes dans self ne la modifient pas (copie sur écriture).
+        """
+        store = FleetColumns.__new__(FleetColumns)
+        store._size = self._size
+        store._ids = self._ids
+        store._row_versions = self._row_versions
+        store._columns = dict(self._columns)
+        store._missing = dict(self._missing)
+        store._categories = {name: list(categories) for name, categories in self._categories.items()}
+        store._category_codes = {name: dict(codes) for name, codes in self._category_codes.items()}
+        store._shared = self._shared = True
+        return store
+
+    def _unshare(self):
+        # Avant une écriture : ne plus modifier les tableaux d'un snapshot
+        if not self._shared:
+            return
+        self._ids = self._ids.copy()
+        self._row_versions = self._row_versions.copy()
+        self._columns = {name: column.copy() for name, column in self._columns.items()}
+        self._missing = {name: missing.copy() for name, missing in self._missing.items()}
+        self._shared = False
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Vue sur une colonne (codes pour une colonne catégorielle).
+        Partagée avec le stockage : valable jusqu'à la prochaine écriture
+        dans cet objet (un snapshot n'est jamais modifié).
+        """
+        return self._columns[name][:self._size]
+
+    def missing(self, name: str) -> np.ndarray:
+        return self._missing[name][:self._size]
+
+    def categories(self, name: str) -> List[str]:
+        return self._categories[name]
+
+    def put(self, vehicle: Vehicle):
+        """
+        Ajoute ou remplace un véhicule.
+        """
+        self._unshare()
+        position = self._position(vehicle.id)
+        if position is None:
+            position = int(np.searchsorted(self.ids, vehicle.id))
+            self._insert_row(position)
+            self._ids[position] = vehicle.id
+        self._row_versions[position] = vehicle.row_version
+        for name in VEHICLE_FIELDS:
+            value = getattr(vehicle, name)
+            if name in CATEGORICAL_FIELDS:
+                # _encode peut remplacer la colonne par un tableau plus large :
+                # coder avant de lire la colonne
+                code = -1 if value is None else self._encode(name, value)
+                self._columns[name][position] = code
+                continue
+            column = self._columns[name]
+            if name in KMS_FIELDS:
+                self._missing[name][position] = value is None
+                column[position] = value or 0
+            elif name in DATE_FIELDS:
+                column[position] = np.datetime64(value, "s") if value is not None else _MISSING_DATE
+            else:
+                column[position] = value
+
+    def remove(self, vehicle_id: int) -> bool:
+        position = self._position(vehicle_id)
+        if position is None:
+            return False
+        self._unshare()
+        for array in self._arrays():
+            array[position:self._size - 1] = array[position + 1:self._size]
+        self._size -= 1
+        return True
+
+    def _arrays(self) -> List[np.ndarray]:
+        return [self._ids, self._row_versions, *self._columns.values(), *self._missing.values()]
+
+    def _insert_row(self, position: int):
+        if self._size == len(self._ids):
+            self._grow(max(16, self._size * 3 // 2))
+        for array in self._arrays():
+            array[position + 1:self._size + 1] = array[position:self._size]
+        self._size += 1
+
+    def _grow(self, capacity: int):
+        self._ids = np.resize(self._ids, capacity)
+        self._row_versions = np.resize(self._row_versions, capacity)
+        for name, column in self._columns.items():
+            self._columns[name] = np.resize(column, capacity)
+        for name, missing in self._missing.items():
+            self._missing[name] = np.resize(missing, capacity)
+
+    def _encode(self, name: str, value: str) -> int:
+        codes = self._category_codes[name]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+            self._categories[name].append(value)
+            dtype = _code_dtype(len(codes))
+            if dtype != self._columns[name].dtype:
+                self._columns[name] = self._columns[name].astype(dtype)
+        return code
+
+    def to_frame(self, columns: Optional[Iterable[str]] = None, copy: bool = False) -> pd.DataFrame:
+        """
+        DataFrame de la flotte (id puis columns, par défaut tous les champs).
+        Sans copy, les colonnes du DataFrame sont des vues sur le stockage :
+        aucune donnée n'est copiée, mais le DataFrame n'est valable que
+        jusqu'à la prochaine écriture dans cet objet.
+        """
+        import pandas as pd
+
+        data = {"id": self.ids}
+        for name in columns or VEHICLE_FIELDS:
+            column = self.column(name)
+            if name in CATEGORICAL_FIELDS:
+                data[name] = pd.Categorical.from_codes(
+                    column, dtype=pd.CategoricalDtype(self._categories[name]), validate=False
+                )
+            elif name in KMS_FIELDS:
+                data[name] = pd.arrays.IntegerArray(column, self.missing(name))
+            else:
+                data[name] = column
+        frame = pd.DataFrame(data, copy=False)
+        return frame.copy() if copy else frame
+
+    def memory_usage(self) -> int:
+        """
+        Octets occupés par les tableaux (hors textes des colonnes objet).
+        """
+        return sum(array.nbytes for array in self._arrays())
@@ -0,0 +1,201 @@
+"""
+Index des échéances (contrôle technique, révision), tenu à jour à chaque écriture.
+"""
+from __future__ import annotations
+
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date, timedelta
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .alerts import AlertThresholds, _kms_column
+from .columns import FleetColumns
+from .models import Vehicle
+from .odometer import OdometerHistory, project_fleet, project_vehicle
+
+# Types d'échéance
+DEADLINE_CT = "ct"
+# Date de la dernière révision + intervalle de révision
+DEADLINE_REVISION = "revision"
+# Date projetée où le kilométrage de la prochaine révision sera atteint
+DEADLINE_REVISION_KMS = "revision_kms"
+DEADLINE_KINDS = (DEADLINE_CT, DEADLINE_REVISION, DEADLINE_REVISION_KMS)
+
+# Clé non datée : kilomètres restants avant la prochaine révision
+_KMS_REMAINING = "kms_restants"
+
+# Clé = (valeur + _VALUE_OFFSET) << 32 | ID, triée dans un array('q') :
+# 8 octets par véhicule et par échéance, bisect pour les intervalles
+_ID_BITS = 32
+_ID_MASK = (1 << _ID_BITS) - 1
+_VALUE_OFFSET = 1 << 30
+_EPOCH = date(1970, 1, 1)
+
+
+@dataclass(frozen=True)
+class Deadline:
+    due: date
+    kind: str
+    vehicle_id: int
+
+
+def _encode(value: int, vehicle_id: int) -> int:
+    value = min(max(value, 1 - _VALUE_OFFSET), _VALUE_OFFSET - 1)
+    return ((value + _VALUE_OFFSET) << _ID_BITS) | vehicle_id
+
+
+def _day(value: date) -> int:
+    return (value - _EPOCH).days
+
+
+def _kms(value: Optional[int]) -> int:
+    # Kilométrage absent : 0, comme le moteur d'alertes
+    return int(value or 0)
+
+
+class DeadlineIndex:
+    """
+    Échéances de la flotte triées par date (et kilomètres restants avant
+    révision) : « dû dans les N jours », « en retard » et « 20 prochaines
+    échéances » sont des recherches par intervalle en O(log n + k) au lieu
+    d'un parcours de la flotte. Construit en une passe vectorisée, puis mis
+    à jour véhicule par véhicule.
+
+    L'échéance kilométrique est projetée au rythme du véhicule
+    (project_fleet) : l'historique des relevés doit être celui de la flotte
+    indexée, et le véhicule réindexé (update) après chaque nouveau relevé.
+    """
+
+    def __init__(self, fleet: Optional[FleetColumns] = None, revision_interval_days: int = 365,
+                 history: Optional[OdometerHistory] = None):
+        self.revision_interval_days = revision_interval_days
+        self.history = history
+        self._keys: Dict[str, array] = {kind: array("q") for kind in DEADLINE_KINDS + (_KMS_REMAINING,)}
+        if fleet is not None and len(fleet):
+            for kind, keys in self._fleet_keys(fleet).items():
+                self._keys[kind].frombytes(np.sort(keys).astype(np.int64).tobytes())
+
+    def _fleet_keys(self, fleet: FleetColumns) -> Dict[str, np.ndarray]:
+        ids = fleet.ids.astype(np.int64)
+
+        def days(name: str) -> Tuple[np.ndarray, np.ndarray]:
+            column = fleet.column(name)
+            return column.astype("datetime64[D]").astype(np.int64), ~np.isnat(column)
+
+        def encode(values: np.ndarray, valid: np.ndarray) -> np.ndarray:
+            values = np.clip(values[valid], 1 - _VALUE_OFFSET, _VALUE_OFFSET - 1)
+            return ((values + _VALUE_OFFSET) << _ID_BITS) | ids[valid]
+
+        ct, ct_valid = days("prochain_ct")
+        revision, revision_valid = days("date_derniere_revision")
+        derniere_revision = _kms_column(fleet, "derniere_revision")
+        periodicite = _kms_column(fleet, "periodicite_revision")
+        releve_kms = _kms_column(fleet, "releve_kms")
+        revision_kms = project_fleet(fleet, self.history, self.revision_interval_days).revision_kms_date
+        return {
+            DEADLINE_CT: encode(ct, ct_valid),
+            DEADLINE_REVISION: encode(revision + self.revision_interval_days, revision_valid),
+            DEADLINE_REVISION_KMS: encode(revision_kms.astype(np.int64), ~np.isnat(revision_kms)),
+            _KMS_REMAINING: encode(derniere_revision + periodicite - releve_kms, revision_valid),
+        }
+
+    def _vehicle_keys(self, vehicle: Vehicle) -> Iterator[Tuple[str, int]]:
+        # Mêmes règles que _fleet_keys, pour un seul véhicule
+        if vehicle.prochain_ct is not None:
+            yield DEADLINE_CT, _encode(_day(vehicle.prochain_ct), vehicle.id)
+        if vehicle.date_derniere_revision is None:
+            return
+        revision = _day(vehicle.date_derniere_revision)
+        remaining = _kms(vehicle.derniere_revision) + _kms(vehicle.periodicite_revision) - _kms(vehicle.releve_kms)
+        yield DEADLINE_REVISION, _encode(revision + self.revision_interval_days, vehicle.id)
+        yield _KMS_REMAINING, _encode(remaining, vehicle.id)
+        _, revision_kms = project_vehicle(vehicle, self.history)
+        if revision_kms is not None:
+            yield DEADLINE_REVISION_KMS, _encode(_day(revision_kms), vehicle.id)
+
+    def add(self, vehicle: Vehicle):
+        for kind, key in self._vehicle_keys(vehicle):
+            keys = self._keys[kind]
+            keys.insert(bisect_left(keys, key), key)
+
+    def remove(self, vehicle: Vehicle):
+        for kind, key in self._vehicle_keys(vehicle):
+            keys = self._keys[kind]
+            position = bisect_left(keys, key)
+            if position < len(keys) and keys[position] == key:
+                del keys[position]
+
+    def update(self, previous: Optional[Vehicle], vehicle: Vehicle):
+        if previous is not None:
+            self.remove(previous)
+        self.add(vehicle)
+
+    def _range(self, kind: str, low: Optional[int], high: Optional[int]) -> Tuple[int, int]:
+        keys = self._keys[kind]
+        start = 0 if low is None else bisect_left(keys, _encode(low, 0))
+        end = len(keys) if high is None else bisect_right(keys, _encode(high, _ID_MASK))
+        return start, end
+
+    def due_between(self, kind: str, since: Optional[date], until: Optional[date]) -> List[int]:
+        """
+        ID des véhicules dont l'échéance kind tombe entre since et until
+        (inclus, None = sans borne), par date croissante.
+        """
+        start, end = self._range(
+            kind, None if since is None else _day(since), None if until is None else _day(until)
+        )
+        return [key & _ID_MASK for key in self._keys[kind][start:end]]
+
+    def due_within(self, kind: str, days: int, today: Optional[date] = None) -> List[int]:
+        today = today or date.today()
+        return self.due_between(kind, today, today + timedelta(days=days))
+
+    def overdue(self, kind: str, today: Optional[date] = None) -> List[int]:
+        return self.due_between(kind, None, (today or date.today()) - timedelta(days=1))
+
+    def kms_remaining_at_most(self, kms: int) -> List[int]:
+        """
+        ID des véhicules à moins de kms km de leur prochaine révision (ou qui
+        l'ont dépassée), par kilomètres restants croissants.
+        """
+        start, end = self._range(_KMS_REMAINING, None, kms)
+        return [key & _ID_MASK for key in self._keys[_KMS_REMAINING][start:end]]
+
+    def next_deadlines(self, count: int = 20, today: Optional[date] = None,
+                       kinds: Iterable[str] = DEADLINE_KINDS) -> List[Deadline]:
+        """
+        Les count prochaines échéances à partir d'aujourd'hui, tous types confondus.
+        """
+        low = _day(today or date.today())
+
+        def deadlines(kind: str) -> Iterator[Tuple[int, str, int]]:
+            keys = self._keys[kind]
+            for position in range(self._range(kind, low, None)[0], len(keys)):
+                key = keys[position]
+                yield (key >> _ID_BITS) - _VALUE_OFFSET, kind, key & _ID_MASK
+
+        merged = heapq.merge(*(deadlines(kind) for kind in kinds))
+        return [Deadline(_EPOCH + timedelta(days=day), kind, vehicle_id)
+                for day, kind, vehicle_id in islice(merged, count)]
+
+    def maintenance_candidates(self, thresholds: AlertThresholds, today: Optional[date] = None) -> List[int]:
+        """
+        Véhicules pouvant être en alerte de révision (compute_fleet_alerts
+        décide) : proches ou au-delà du kilométrage ou de la date de révision.
+        """
+        today = today or date.today()
+        ids = set(self.kms_remaining_at_most(thresholds.revision_kms))
+        ids.update(self.due_between(DEADLINE_REVISION, None, today + timedelta(days=thresholds.revision_days)))
+        return sorted(ids)
+
+    def ct_candidates(self, thresholds: AlertThresholds, today: Optional[date] = None) -> List[int]:
+        """
+        Véhicules dont le contrôle technique est dépassé ou tombe dans moins de ct_days jours.
+        """
+        today = today or date.today()
+        return sorted(self.due_between(DEADLINE_CT, None, today + timedelta(days=thresholds.ct_days)))
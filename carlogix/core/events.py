@@ -0,0 +1,27 @@
+"""
+Événements publiés par le dépôt après chaque modification enregistrée.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+# Types de changement
+CHANGE_ADDED = "ajout"
+CHANGE_UPDATED = "modification"
+CHANGE_DELETED = "suppression"
+# Modification en masse (import) : la flotte est à relire
+CHANGE_RELOADED = "rechargement"
+
+
+@dataclass(frozen=True)
+class VehicleChange:
+    """
+    Changement d'un véhicule : son ID, les champs modifiés (tous pour un
+    ajout, aucun pour une suppression) et sa nouvelle version de ligne.
+    Pour CHANGE_RELOADED, vehicle_id vaut None.
+    """
+    kind: str
+    vehicle_id: Optional[int] = None
+    fields: Tuple[str, ...] = ()
+    row_version: Optional[int] = None
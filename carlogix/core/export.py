@@ -0,0 +1,542 @@
+"""
+Exports CSV, Excel et PDF écrits en flux, et exécution en arrière-plan.
+"""
+from __future__ import annotations
+
+import csv
+import multiprocessing
+import os
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from itertools import chain, count
+from typing import TYPE_CHECKING, Callable, Deque, Dict, Iterable, Iterator, List, Optional
+
+from .metrics import timed
+from .models import DATE_FIELDS, EXCEL_HEADERS, KMS_FIELDS, VEHICLE_FIELDS, format_field, parse_date, parse_kms
+
+if TYPE_CHECKING:
+    from reportlab.platypus import SimpleDocTemplate
+
+    from .repository import VehicleRepository
+
+
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_FORMATS = ("Excel", "CSV", "PDF")
+
+# Libellés des colonnes exportées : ceux du classeur CarLogix, relus par l'import
+EXPORT_HEADERS = dict(zip(["id"] + VEHICLE_FIELDS, EXCEL_HEADERS))
+
+
+def _export_values(names: List[str], row: tuple) -> list:
+    # Dates et kilométrages typés ; une cellule illisible est exportée telle quelle
+    values = list(row)
+    for position, name in enumerate(names):
+        parse = parse_date if name in DATE_FIELDS else parse_kms if name in KMS_FIELDS else None
+        if parse is None:
+            continue
+        try:
+            values[position] = parse(values[position])
+        except ValueError:
+            pass
+    return values
+
+
+def iter_export_rows(repository: VehicleRepository, columns: Optional[List[str]] = None,
+                     filters: Optional[Dict[str, object]] = None,
+                     chunk_size: int = EXPORT_CHUNK_SIZE,
+                     order_by: Optional[List[str]] = None) -> Iterator[list]:
+    """
+    Produit les lignes à exporter (ID puis columns), lues par paquets :
+    la flotte n'est jamais chargée en entier.
+    """
+    names = ["id"] + list(columns or VEHICLE_FIELDS)
+    for chunk in repository.iter_rows(columns, filters, chunk_size, order_by):
+        for row in chunk:
+            yield _export_values(names, row)
+
+
+# Masque des droits du processus, lu une fois (os.umask le modifie pour le lire)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+@contextmanager
+def _atomic_output(file_path: str) -> Iterator[str]:
+    # Écrit dans un fichier temporaire puis le renomme, pour qu'un arrêt en
+    # cours d'écriture ne laisse jamais un fichier tronqué. Nom unique dans
+    # le dossier cible : deux exports vers le même fichier ne se mélangent pas
+    directory, name = os.path.split(os.path.abspath(file_path))
+    handle, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".tmp")
+    os.close(handle)
+    try:
+        yield temp_path
+        # mkstemp crée le fichier en 0600 : droits habituels d'un fichier créé
+        os.chmod(temp_path, 0o666 & ~_UMASK)
+        os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _write_csv(file_path: str, header: List[str], rows: Iterable[list]) -> int:
+    count = 0
+    with _atomic_output(file_path) as temp_path:
+        with open(temp_path, "w", newline="", encoding="utf-8-sig") as output:
+            writer = csv.writer(output)
+            writer.writerow(header)
+            for row in rows:
+                writer.writerow([format_field(value) for value in row])
+                count += 1
+    return count
+
+
+def _write_xlsx(file_path: str, header: List[str], rows: Iterable[list]) -> int:
+    from openpyxl import Workbook
+
+    count = 0
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Vehicules")
+    ws.append(header)
+    try:
+        for row in rows:
+            ws.append(row)
+            count += 1
+    except BaseException:
+        # Termine la feuille en cours pour libérer son fichier temporaire
+        ws.close()
+        raise
+    with _atomic_output(file_path) as temp_path:
+        wb.save(temp_path)
+    return count
+
+
+# Rapport PDF : tableaux d'une page, sections par site ou société avec sous-totaux
+PDF_SECTION_FIELDS = ("site", "societe_proprietaire")
+PDF_DEFAULT_COLUMNS = [
+    "immatriculation", "marque", "vehicule", "utilisateur", "site",
+    "releve_kms", "prochain_ct", "statut",
+]
+# Largeurs relatives des colonnes (1.0 par défaut), réparties sur la largeur de la page
+PDF_COLUMN_WEIGHTS = {
+    "id": 0.5, "immatriculation": 1.3, "code_carte": 0.8, "societe_proprietaire": 1.2, "site": 0.8,
+    "utilisateur": 1.6, "marque": 1.1, "vehicule": 1.1, "modele": 1.4, "date_mise_en_service": 1.1,
+    "crit_air": 0.6, "fluide_dispo": 0.7, "date_derniere_revision": 1.1, "prochain_ct": 1.1,
+    "double_clef": 0.7, "statut": 1.1,
+}
+# Au-delà de PDF_PARALLEL_MIN_ROWS lignes, les parties de PDF_ROWS_PER_PART lignes
+# sont rendues dans des processus séparés puis fusionnées
+PDF_ROWS_PER_PART = 5000
+PDF_PARALLEL_MIN_ROWS = 5000
+
+
+@dataclass
+class PdfReportOptions:
+    section_by: Optional[str] = None
+    widths: Optional[Dict[str, float]] = None
+    title: str = "CarLogix - Parc de véhicules"
+    font_size: float = 7
+    row_height: float = 12
+    margin: float = 36
+    parallel: bool = True
+    max_workers: Optional[int] = None
+
+
+@dataclass
+class _PdfLayout:
+    header: List[str]
+    col_widths: List[float]
+    max_chars: List[int]
+    rows_per_table: int
+    options: PdfReportOptions
+
+
+@dataclass
+class _PdfPart:
+    title: Optional[str]
+    rows: List[List[str]]
+    subtotal: Optional[str] = None
+    total: Optional[str] = None
+    report_title: bool = False
+
+
+def _pdf_layout(columns: List[str], options: PdfReportOptions) -> _PdfLayout:
+    from reportlab.lib.pagesizes import landscape, A4
+
+    page_width, page_height = landscape(A4)
+    available_width = page_width - 2 * options.margin - 12
+    weights = [(options.widths or {}).get(name, PDF_COLUMN_WEIGHTS.get(name, 1.0)) for name in columns]
+    col_widths = [available_width * weight / sum(weights) for weight in weights]
+    # Texte tronqué à la largeur de la colonne plutôt que débordant sur la suivante
+    max_chars = [max(3, int((width - 4) / (options.font_size * 0.55))) for width in col_widths]
+    frame_height = page_height - 2 * options.margin - 12
+    return _PdfLayout(
+        header=[EXPORT_HEADERS.get(name, name) for name in columns],
+        col_widths=col_widths,
+        max_chars=max_chars,
+        rows_per_table=max(1, int(frame_height // options.row_height) - 1),
+        options=options,
+    )
+
+
+def _pdf_cells(row, max_chars: List[int]) -> List[str]:
+    cells = []
+    for value, limit in zip(row, max_chars):
+        text = format_field(value)
+        cells.append(text if len(text) <= limit else text[:limit - 1] + "…")
+    return cells
+
+
+def _pdf_flowables(part: _PdfPart, layout: _PdfLayout) -> list:
+    from reportlab.lib import colors as pdf_colors
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, Spacer, Table, TableStyle
+
+    styles = getSampleStyleSheet()
+    options = layout.options
+    table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), pdf_colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), pdf_colors.whitesmoke),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), options.font_size),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('TOPPADDING', (0, 0), (-1, -1), 1),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
+        ('GRID', (0, 0), (-1, -1), 0.25, pdf_colors.black),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [pdf_colors.whitesmoke, pdf_colors.lightgrey]),
+    ])
+    flowables = []
+    if part.report_title:
+        flowables.append(Paragraph(options.title, styles["Title"]))
+    if part.title:
+        flowables.append(Paragraph(part.title, styles["Heading2"]))
+    # Un tableau par page, lignes de hauteur fixe : reportlab n'a rien à mesurer
+    for start in range(0, len(part.rows), layout.rows_per_table):
+        chunk = [layout.header] + part.rows[start:start + layout.rows_per_table]
+        table = Table(chunk, colWidths=layout.col_widths, rowHeights=options.row_height, repeatRows=1)
+        table.setStyle(table_style)
+        flowables.append(table)
+    if part.subtotal:
+        flowables.append(Spacer(1, 6))
+        flowables.append(Paragraph(part.subtotal, styles["Heading4"]))
+    if part.total:
+        flowables.append(Spacer(1, 12))
+        flowables.append(Paragraph(part.total, styles["Heading3"]))
+    return flowables
+
+
+def _pdf_document(file_path: str, layout: _PdfLayout) -> SimpleDocTemplate:
+    from reportlab.lib.pagesizes import landscape, A4
+    from reportlab.platypus import SimpleDocTemplate
+
+    margin = layout.options.margin
+    return SimpleDocTemplate(file_path, pagesize=landscape(A4), leftMargin=margin, rightMargin=margin,
+                             topMargin=margin, bottomMargin=margin)
+
+
+def _render_pdf_part(file_path: str, part: _PdfPart, layout: _PdfLayout) -> str:
+    # Exécuté dans un processus du pool : une partie = un fichier PDF
+    _pdf_document(file_path, layout).build(_pdf_flowables(part, layout))
+    return file_path
+
+
+def _iter_pdf_parts(rows: Iterable[list], columns: List[str], section_position: Optional[int],
+                    section_label: str, layout: _PdfLayout, rows_per_part: int) -> Iterator[_PdfPart]:
+    """
+    Découpe les lignes (triées par section) en parties d'au plus rows_per_part
+    lignes. La dernière partie d'une section porte son sous-total, et la
+    dernière partie du rapport le total général.
+    """
+    kms_position = columns.index("releve_kms") if "releve_kms" in columns else None
+    sentinel = object()
+    key, buffer, section_count, section_kms = sentinel, [], 0, 0
+    total_count, total_kms, first = 0, 0, True
+
+    def totals(label: str, count_: int, kms: int) -> str:
+        text = f"{label} : {count_} véhicule{'s' if count_ > 1 else ''}"
+        if kms_position is not None:
+            text += ", " + f"{kms:,} km".replace(",", " ")
+        return text
+
+    def part(last: bool) -> _PdfPart:
+        nonlocal first
+        title = None
+        if section_position is not None and key is not sentinel:
+            title = f"{section_label} : {key or 'Non renseigné'}"
+            if section_count > len(buffer):
+                title += " (suite)"
+        subtotal = None
+        if last and section_position is not None and key is not sentinel:
+            subtotal = totals(f"Sous-total {key or 'Non renseigné'}", section_count, section_kms)
+        result = _PdfPart(title, buffer, subtotal, report_title=first)
+        first = False
+        return result
+
+    for row in rows:
+        row_key = row[section_position] if section_position is not None else None
+        if key is not sentinel and row_key != key:
+            yield part(last=True)
+            buffer, section_count, section_kms = [], 0, 0
+        key = row_key
+        buffer.append(_pdf_cells(row[:len(columns)], layout.max_chars))
+        kms = row[kms_position] if kms_position is not None else None
+        if isinstance(kms, int):
+            section_kms += kms
+            total_kms += kms
+        section_count += 1
+        total_count += 1
+        if len(buffer) >= rows_per_part:
+            yield part(last=False)
+            buffer = []
+
+    # La dernière partie est toujours produite (rapport vide compris) et porte le total général
+    last_part = part(last=True)
+    if section_position is not None:
+        last_part.total = totals("Total général", total_count, total_kms)
+    yield last_part
+
+
+def _write_pdf_report(file_path: str, columns: List[str], rows: Iterable[list],
+                      options: Optional[PdfReportOptions] = None,
+                      section_position: Optional[int] = None) -> int:
+    """
+    Rapport PDF paginé : tableaux d'une page de hauteur, colonnes et largeurs
+    choisies, sections avec sous-totaux si options.section_by. Les gros
+    rapports sont rendus par parties dans un pool de processus puis fusionnés.
+    Retourne le nombre de véhicules écrits.
+    """
+    options = options or PdfReportOptions()
+    layout = _pdf_layout(columns, options)
+    section_label = EXPORT_HEADERS.get(options.section_by, options.section_by or "")
+    written = 0
+
+    def counted(source):
+        nonlocal written
+        for row in source:
+            written += 1
+            yield row
+
+    parts = _iter_pdf_parts(counted(rows), columns, section_position, section_label, layout, PDF_ROWS_PER_PART)
+
+    # Les premières parties décident du mode : un petit rapport ne paie pas
+    # le démarrage des processus
+    first_parts = []
+    for part in parts:
+        first_parts.append(part)
+        if written >= PDF_PARALLEL_MIN_ROWS:
+            break
+    parallel = options.parallel and (os.cpu_count() or 1) > 1 and written >= PDF_PARALLEL_MIN_ROWS
+
+    with _atomic_output(file_path) as temp_path:
+        if not parallel:
+            from reportlab.platypus import PageBreak
+
+            # Chaque partie commence une page, comme dans le rendu en parallèle
+            flowables = []
+            for part in chain(first_parts, parts):
+                if flowables:
+                    flowables.append(PageBreak())
+                flowables += _pdf_flowables(part, layout)
+            _pdf_document(temp_path, layout).build(flowables)
+        else:
+            from pypdf import PdfWriter
+
+            max_workers = options.max_workers or os.cpu_count() or 1
+            with tempfile.TemporaryDirectory() as directory:
+                pool = ProcessPoolExecutor(max_workers=max_workers,
+                                           mp_context=multiprocessing.get_context("spawn"))
+                try:
+                    # Les parties sont soumises au fil de la lecture des lignes, au
+                    # plus 2 * max_workers à la fois : les lignes en attente de rendu
+                    # restent bornées. Chaque partie rendue est un fichier du dossier
+                    # temporaire, fusionnés dans l'ordre une fois toutes rendues.
+                    in_flight: Deque[Future] = deque()
+                    part_paths = []
+                    for number, part in enumerate(chain(first_parts, parts)):
+                        if len(in_flight) >= 2 * max_workers:
+                            part_paths.append(in_flight.popleft().result())
+                        in_flight.append(pool.submit(
+                            _render_pdf_part, os.path.join(directory, f"{number:05d}.pdf"), part, layout,
+                        ))
+                    part_paths += [future.result() for future in in_flight]
+                    merged = PdfWriter()
+                    for part_path in part_paths:
+                        merged.append(part_path)
+                    with open(temp_path, "wb") as output:
+                        merged.write(output)
+                finally:
+                    # Export annulé ou en erreur : les parties en attente ne sont pas rendues
+                    pool.shutdown(wait=True, cancel_futures=True)
+    return written
+
+
+_EXPORT_WRITERS = {"CSV": _write_csv, "Excel": _write_xlsx}
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def _track_progress(rows: Iterable[list], progress: Optional[Callable[[int], None]],
+                    cancel: Optional[threading.Event], every: int) -> Iterator[list]:
+    # Interrompt l'export dès que cancel est levé et signale l'avancement
+    # toutes les `every` lignes écrites
+    written = 0
+    for row in rows:
+        if cancel is not None and cancel.is_set():
+            raise ExportCancelled()
+        yield row
+        written += 1
+        if progress is not None and written % every == 0:
+            progress(written)
+
+
+@timed("export.export_vehicles", rows=int)
+def export_vehicles(repository: VehicleRepository, file_path: str, format: str = "Excel",
+                    columns: Optional[List[str]] = None, filters: Optional[Dict[str, object]] = None,
+                    chunk_size: int = EXPORT_CHUNK_SIZE, progress: Optional[Callable[[int], None]] = None,
+                    cancel: Optional[threading.Event] = None,
+                    pdf_options: Optional[PdfReportOptions] = None) -> int:
+    """
+    Exporte les véhicules au format CSV, Excel ou PDF. CSV et Excel sont
+    écrits en flux : les lignes sont lues par paquets et écrites au fil de
+    l'eau (csv.writer, classeur openpyxl write_only). columns choisit les
+    champs exportés (l'ID est toujours inclus) et filters restreint les
+    véhicules, par exemple {"site": "ELAN"}.
+    Le PDF est mis en page selon pdf_options (sections, largeurs de colonnes).
+    progress reçoit le nombre de lignes écrites à chaque paquet ; si cancel
+    est levé, l'export s'arrête (ExportCancelled) sans laisser de fichier.
+    Retourne le nombre de véhicules exportés.
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError("Format d'exportation non pris en charge.")
+    columns = list(columns or VEHICLE_FIELDS)
+    names = ["id"] + columns
+    if format == "PDF":
+        # Lignes triées par section ; le champ de section est lu même s'il n'est pas exporté
+        pdf_options = pdf_options or PdfReportOptions()
+        section_by = pdf_options.section_by
+        query_columns = columns + [section_by] if section_by and section_by not in columns else columns
+        rows = _track_progress(
+            iter_export_rows(repository, query_columns, filters, chunk_size, [section_by] if section_by else None),
+            progress, cancel, chunk_size,
+        )
+        section_position = (["id"] + query_columns).index(section_by) if section_by else None
+        written = _write_pdf_report(file_path, names, rows, pdf_options, section_position)
+    else:
+        header = [EXPORT_HEADERS.get(name, name) for name in names]
+        rows = _track_progress(iter_export_rows(repository, columns, filters, chunk_size), progress, cancel, chunk_size)
+        written = _EXPORT_WRITERS[format](file_path, header, rows)
+    if progress is not None:
+        progress(written)
+    return written
+
+
+# États d'une tâche d'export
+EXPORT_RUNNING = "en cours"
+EXPORT_DONE = "terminé"
+EXPORT_CANCELLED = "annulé"
+EXPORT_FAILED = "erreur"
+
+
+@dataclass
+class ExportJob:
+    job_id: int
+    file_path: str
+    format: str
+    # Nombre de véhicules à exporter, compté au démarrage de l'export
+    total: Optional[int] = None
+    written: int = 0
+    status: str = EXPORT_RUNNING
+    error: Optional[str] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def progress(self) -> Optional[float]:
+        # None tant que le total n'est pas connu (progression indéterminée)
+        if self.total is None:
+            return None
+        return min(1.0, self.written / self.total) if self.total else 1.0
+
+
+class ExportWorker:
+    """
+    Exécute les exports dans un pool de threads : le gestionnaire
+    d'événements de l'interface rend la main immédiatement. Les callbacks
+    on_progress(job) et on_done(job) sont appelés depuis le thread de l'export ;
+    le premier on_progress signale job.total, compté par l'export lui-même.
+    jobs ne contient que les exports en cours : un export terminé en est
+    retiré avant l'appel de on_done.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export")
+        self._job_ids = count(1)
+        self.jobs: Dict[int, ExportJob] = {}
+
+    def submit(self, repository: VehicleRepository, file_path: str, format: str = "Excel",
+               columns: Optional[List[str]] = None, filters: Optional[Dict[str, object]] = None,
+               on_progress: Optional[Callable[[ExportJob], None]] = None,
+               on_done: Optional[Callable[[ExportJob], None]] = None,
+               pdf_options: Optional[PdfReportOptions] = None) -> ExportJob:
+        # Le comptage lit la base : fait dans le thread de l'export, pas dans celui de l'appelant
+        job = ExportJob(next(self._job_ids), file_path, format)
+        self.jobs[job.job_id] = job
+
+        def progress(written: int):
+            job.written = written
+            if on_progress is not None:
+                on_progress(job)
+
+        def run():
+            try:
+                job.total = repository.count_rows(filters)
+                progress(0)
+                export_vehicles(repository, file_path, format, columns, filters,
+                                progress=progress, cancel=job.cancel_event, pdf_options=pdf_options)
+                job.status = EXPORT_DONE
+            except ExportCancelled:
+                job.status = EXPORT_CANCELLED
+            except Exception as error:
+                job.status = EXPORT_FAILED
+                job.error = str(error)
+            self.jobs.pop(job.job_id, None)
+            if on_done is not None:
+                on_done(job)
+
+        self._executor.submit(run)
+        return job
+
+    def cancel(self, job_id: int):
+        job = self.jobs.get(job_id)
+        if job is not None:
+            job.cancel()
+
+    def shutdown(self, cancel_running: bool = True):
+        if cancel_running:
+            for job in list(self.jobs.values()):
+                job.cancel()
+        self._executor.shutdown(wait=True)
+
+
+_shared_export_worker: Optional[ExportWorker] = None
+_shared_export_lock = threading.Lock()
+
+
+def shared_export_worker() -> ExportWorker:
+    """
+    Pool d'exports unique du processus, partagé par toutes les sessions de
+    l'interface : une session fermée annule ses propres exports.
+    """
+    global _shared_export_worker
+    with _shared_export_lock:
+        if _shared_export_worker is None:
+            _shared_export_worker = ExportWorker()
+        return _shared_export_worker
@@ -0,0 +1,111 @@
+"""
+Import de véhicules depuis un fichier CSV ou Excel, lu en flux et validé ligne à ligne.
+"""
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterator, List, Tuple
+
+from .models import EXCEL_HEADERS, VEHICLE_FIELDS, _normalize_cell, vehicle_model
+
+if TYPE_CHECKING:
+    from pydantic import ValidationError
+
+    from .repository import VehicleRepository
+
+
+IMPORT_CHUNK_SIZE = 1000
+
+# En-têtes acceptés à l'import : libellés du classeur CarLogix ou noms des champs
+_IMPORT_HEADERS = {
+    **{header.lower(): name for header, name in zip(EXCEL_HEADERS, ["id"] + VEHICLE_FIELDS)},
+    **{name: name for name in ["id"] + VEHICLE_FIELDS},
+}
+
+
+@dataclass
+class ImportReport:
+    imported_ids: List[int]
+    rejects: List[Tuple[int, str]]
+
+
+def _iter_source_rows(file_path: str) -> Iterator[tuple]:
+    if file_path.lower().endswith(".csv"):
+        with open(file_path, newline="", encoding="utf-8-sig") as source:
+            try:
+                dialect = csv.Sniffer().sniff(source.read(4096), delimiters=",;\t")
+            except csv.Error:
+                dialect = csv.excel
+            source.seek(0)
+            for row in csv.reader(source, dialect):
+                yield tuple(value.strip() or None for value in row)
+    else:
+        import openpyxl
+
+        wb = openpyxl.load_workbook(file_path, read_only=True)
+        try:
+            yield from wb.active.iter_rows(values_only=True)
+        finally:
+            wb.close()
+
+
+def read_vehicle_rows(file_path: str, chunk_size: int = IMPORT_CHUNK_SIZE) -> Iterator[List[Tuple[int, dict]]]:
+    """
+    Lit un fichier CSV ou Excel ligne à ligne et produit des paquets de
+    (numéro de ligne, champs du véhicule). Le fichier n'est jamais chargé en entier.
+    """
+    rows = _iter_source_rows(file_path)
+    header = next(rows, None)
+    if header is None:
+        return
+    columns = [_IMPORT_HEADERS.get(str(value or "").strip().lower()) for value in header]
+    missing = set(VEHICLE_FIELDS) - set(columns)
+    if missing:
+        raise ValueError(f"Colonnes manquantes : {', '.join(sorted(missing))}")
+
+    chunk = []
+    for row_number, row in enumerate(rows, start=2):
+        if not any(value is not None for value in row):
+            continue
+        values = {
+            name: _normalize_cell(value)
+            for name, value in zip(columns, row)
+            if name and name != "id"
+        }
+        chunk.append((row_number, values))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}" for detail in error.errors()
+    )
+
+
+def import_vehicles(repository: VehicleRepository, file_path: str,
+                    chunk_size: int = IMPORT_CHUNK_SIZE) -> ImportReport:
+    """
+    Importe un fichier CSV ou Excel : chaque ligne est validée avec VehicleModel,
+    les lignes valides sont enregistrées en une seule écriture et les lignes
+    rejetées sont retournées avec leur numéro.
+    """
+    from pydantic import ValidationError
+
+    VehicleModel = vehicle_model()
+    rejects = []
+
+    def valid_vehicles():
+        for chunk in read_vehicle_rows(file_path, chunk_size):
+            for row_number, values in chunk:
+                try:
+                    yield VehicleModel(**values)
+                except ValidationError as error:
+                    rejects.append((row_number, _format_validation_error(error)))
+
+    imported_ids = repository.add_vehicles(valid_vehicles(), chunk_size)
+    return ImportReport(imported_ids, rejects)
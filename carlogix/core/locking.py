@@ -0,0 +1,84 @@
+"""
+Verrou de fichier entre processus (plusieurs instances de CarLogix sur la même base).
+"""
+from __future__ import annotations
+
+import os
+import time
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+class FileLock:
+    """
+    Verrou exclusif posé par le système sur un fichier (fcntl.flock sous
+    Linux et macOS, msvcrt.locking sous Windows). Réentrant : seul le premier
+    acquire pose le verrou et le dernier release le lève. Les threads d'un même
+    processus doivent être sérialisés par ailleurs (verrou du dépôt).
+    Lève TimeoutError si le verrou n'est pas obtenu en timeout secondes.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0, poll_interval: float = 0.05):
+        self.path = path
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._file = None
+        self._depth = 0
+
+    def _try_lock(self) -> bool:
+        try:
+            if os.name == "nt":
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False
+        return True
+
+    def _unlock(self):
+        if os.name == "nt":
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    def acquire(self):
+        if self._depth == 0:
+            if self._file is None:
+                self._file = open(self.path, "a+b")
+            deadline = time.monotonic() + self.timeout
+            while not self._try_lock():
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Verrou {self.path} occupé depuis plus de {self.timeout:g} s")
+                time.sleep(self.poll_interval)
+        self._depth += 1
+
+    def release(self):
+        if self._depth == 0:
+            raise RuntimeError("Verrou non acquis")
+        self._depth -= 1
+        if self._depth == 0:
+            self._unlock()
+
+    @property
+    def locked(self) -> bool:
+        return self._depth > 0
+
+    def close(self):
+        if self._depth:
+            self._depth = 0
+            self._unlock()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
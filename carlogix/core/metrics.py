@@ -0,0 +1,269 @@
+"""
+Mesure des chemins critiques : nombre d'appels, latences (p50/p95/p99) et
+lignes traitées par opération, affichées dans les paramètres et exposées au
+format texte Prometheus.
+
+Désactivée par défaut (CARLOGIX_METRICS=1 pour l'activer au démarrage) : une
+fonction instrumentée ne fait alors qu'un test de booléen de plus.
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional
+
+# Bornes des histogrammes (secondes), comme les buckets Prometheus
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Dernières durées conservées par opération pour les percentiles
+RECENT_SAMPLES = 1024
+METRICS_PORT = 9464
+
+
+@dataclass
+class OperationStats:
+    name: str
+    count: int
+    errors: int
+    rows: int
+    total_seconds: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+
+class _Histogram:
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.rows = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, seconds: float, rows: int, error: bool):
+        index = 0
+        while index < len(LATENCY_BUCKETS) and seconds > LATENCY_BUCKETS[index]:
+            index += 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.errors += error
+        self.rows += rows
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    # samples triés
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class _Timer:
+    """
+    Mesure en cours (METRICS.measure) : rows peut être renseigné dans le bloc.
+    """
+    __slots__ = ("rows",)
+
+    def __init__(self):
+        self.rows = 0
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, _Histogram] = {}
+
+    def observe(self, name: str, seconds: float, rows: int = 0, error: bool = False):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = _Histogram()
+            histogram.observe(seconds, rows, error)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[_Timer]:
+        """
+        Mesure le bloc with ; timer.rows = lignes traitées.
+        """
+        timer = _Timer()
+        if not self.enabled:
+            yield timer
+            return
+        error = False
+        start = time.perf_counter()
+        try:
+            yield timer
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, timer.rows, error)
+
+    def timed(self, name: str, rows: Optional[Callable[[object], int]] = None):
+        """
+        Décorateur : mesure chaque appel sous name. rows(résultat) donne le
+        nombre de lignes traitées ; pour un générateur, rows est appliqué à
+        chaque élément produit et seul le temps passé dans le générateur compte.
+        """
+        def decorate(function):
+            if inspect.isgeneratorfunction(function):
+                @functools.wraps(function)
+                def generator_wrapper(*args, **kwargs):
+                    generator = function(*args, **kwargs)
+                    if not self.enabled:
+                        return generator
+                    return self._timed_generator(name, generator, rows)
+                return generator_wrapper
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    result = function(*args, **kwargs)
+                except BaseException:
+                    self.observe(name, time.perf_counter() - start, error=True)
+                    raise
+                elapsed = time.perf_counter() - start
+                self.observe(name, elapsed, rows(result) if rows is not None and result is not None else 0)
+                return result
+            return wrapper
+        return decorate
+
+    def _timed_generator(self, name: str, generator: Iterator, rows: Optional[Callable[[object], int]]):
+        elapsed, count, error = 0.0, 0, False
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(generator)
+                except StopIteration:
+                    elapsed += time.perf_counter() - start
+                    return
+                elapsed += time.perf_counter() - start
+                if rows is not None:
+                    count += rows(item)
+                yield item
+        except Exception:
+            error = True
+            raise
+        finally:
+            generator.close()
+            self.observe(name, elapsed, count, error)
+
+    def stats(self) -> List[OperationStats]:
+        """
+        Statistiques par opération, triées par temps total décroissant.
+        """
+        with self._lock:
+            items = [(name, histogram, sorted(histogram.recent)) for name, histogram in self._histograms.items()]
+        stats = [
+            OperationStats(
+                name, histogram.count, histogram.errors, histogram.rows, histogram.total,
+                _percentile(samples, 0.50), _percentile(samples, 0.95), _percentile(samples, 0.99), histogram.max,
+            )
+            for name, histogram, samples in items
+        ]
+        return sorted(stats, key=lambda operation: operation.total_seconds, reverse=True)
+
+    def to_prometheus(self) -> str:
+        """
+        Histogrammes au format texte d'exposition Prometheus (version 0.0.4).
+        """
+        lines = [
+            "# HELP carlogix_operation_duration_seconds Durée des opérations instrumentées.",
+            "# TYPE carlogix_operation_duration_seconds histogram",
+        ]
+        with self._lock:
+            histograms = sorted((name, histogram) for name, histogram in self._histograms.items())
+            for name, histogram in histograms:
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), histogram.buckets):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'carlogix_operation_duration_seconds_bucket{{operation="{name}",le="{le}"}} {cumulative}')
+                lines.append(f'carlogix_operation_duration_seconds_sum{{operation="{name}"}} {histogram.total!r}')
+                lines.append(f'carlogix_operation_duration_seconds_count{{operation="{name}"}} {histogram.count}')
+            lines += [
+                "# HELP carlogix_operation_rows_total Lignes traitées par les opérations instrumentées.",
+                "# TYPE carlogix_operation_rows_total counter",
+            ]
+            lines += [f'carlogix_operation_rows_total{{operation="{name}"}} {histogram.rows}'
+                      for name, histogram in histograms]
+            lines += [
+                "# HELP carlogix_operation_errors_total Appels terminés par une exception.",
+                "# TYPE carlogix_operation_errors_total counter",
+            ]
+            lines += [f'carlogix_operation_errors_total{{operation="{name}"}} {histogram.errors}'
+                      for name, histogram in histograms]
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry(enabled=os.environ.get("CARLOGIX_METRICS", "") not in ("", "0"))
+
+
+def timed(name: str, rows: Optional[Callable[[object], int]] = None):
+    return METRICS.timed(name, rows)
+
+
+def serve_metrics(port: int = METRICS_PORT, host: str = "127.0.0.1", registry: MetricsRegistry = METRICS):
+    """
+    Sert registry.to_prometheus() sur http://host:port/metrics, dans un
+    thread démon. Retourne le serveur (server.shutdown() pour l'arrêter).
+    Par défaut, seule la machine locale y a accès : les métriques n'ont pas
+    d'authentification, host="0.0.0.0" les expose à tout le réseau.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="carlogix-metrics", daemon=True).start()
+    return server
+
+
+_shared_metrics_server = None
+_shared_metrics_lock = threading.Lock()
+
+
+def shared_metrics_server(port: int = METRICS_PORT, host: str = "127.0.0.1"):
+    """
+    Serveur des métriques METRICS unique du processus, démarré au premier
+    appel (au lancement ou à l'activation des mesures dans les paramètres).
+    Lève OSError si le port est déjà pris ; un appel suivant réessaie.
+    """
+    global _shared_metrics_server
+    with _shared_metrics_lock:
+        if _shared_metrics_server is None:
+            _shared_metrics_server = serve_metrics(port, host, METRICS)
+        return _shared_metrics_server
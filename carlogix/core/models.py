@@ -0,0 +1,262 @@
+"""
+Modèle de données d'un véhicule : champs, conversions des dates et des
+kilométrages, validation des saisies (pydantic, chargé à la demande).
+"""
+from __future__ import annotations
+
+import re
+import sys
+from dataclasses import dataclass, fields
+from datetime import date, datetime
+from functools import lru_cache
+from typing import List, Optional
+
+
+DATE_FORMAT = '%d/%m/%Y'
+
+
+def parse_date(value) -> Optional[date]:
+    """
+    Convertit une date saisie (JJ/MM/AAAA), stockée (AAAA-MM-JJ) ou lue dans
+    Excel (datetime) en date. Lève ValueError si la valeur n'est pas une date.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        value = value.strip()
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            return datetime.strptime(value, DATE_FORMAT).date()
+    raise ValueError(f"Date invalide : {value!r}")
+
+
+def parse_kms(value) -> Optional[int]:
+    """
+    Convertit un kilométrage en entier. Lève ValueError si la valeur n'est pas un nombre entier.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f"Kilométrage invalide : {value!r}")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and re.match(r'^\d+$', value.strip()):
+        return int(value)
+    raise ValueError(f"Kilométrage invalide : {value!r}")
+
+
+def format_date(value: Optional[date]) -> str:
+    return value.strftime(DATE_FORMAT) if value else ""
+
+
+def format_field(value) -> str:
+    """
+    Texte affiché pour une valeur de Vehicle (dates au format JJ/MM/AAAA).
+    """
+    # Une valeur absente de pandas (NaN, NaT, NA) suppose pandas déjà chargé
+    pandas = sys.modules.get("pandas")
+    if value is None or (pandas is not None and not isinstance(value, str) and pandas.isna(value)):
+        return ""
+    if isinstance(value, date):
+        return format_date(value)
+    return str(value)
+
+
+@dataclass(slots=True)
+class Vehicle:
+    id: int
+    immatriculation: str
+    code_carte: str
+    societe_proprietaire: str
+    site: str
+    utilisateur: str
+    marque: str
+    vehicule: str
+    modele: str
+    date_mise_en_service: Optional[date]
+    crit_air: str
+    carburant: str
+    type_huile: str
+    fluide_dispo: str
+    releve_kms: Optional[int]
+    date_derniere_revision: Optional[date]
+    derniere_revision: Optional[int]
+    periodicite_revision: Optional[int]
+    prochain_ct: Optional[date]
+    double_clef: str
+    numero_scelle: str
+    statut: str
+    # Version de la ligne, incrémentée à chaque modification (concurrence optimiste)
+    row_version: int = 1
+
+# Champs typés : convertis une seule fois au chargement et à l'écriture
+DATE_FIELDS = ("date_mise_en_service", "date_derniere_revision", "prochain_ct")
+KMS_FIELDS = ("releve_kms", "derniere_revision", "periodicite_revision")
+
+@lru_cache(maxsize=None)
+def vehicle_model() -> type:
+    """
+    Classe VehicleModel (pydantic) qui valide un véhicule saisi ou importé.
+    Construite au premier appel : pydantic n'est chargé qu'à la première validation.
+    """
+    from pydantic import BaseModel, field_validator
+
+    class VehicleModel(BaseModel):
+        id: Optional[int] = None
+        immatriculation: str
+        code_carte: str
+        societe_proprietaire: str
+        site: str
+        utilisateur: str
+        marque: str
+        vehicule: str
+        modele: str
+        date_mise_en_service: date
+        crit_air: str
+        carburant: str
+        type_huile: str
+        fluide_dispo: str
+        releve_kms: int
+        date_derniere_revision: date
+        derniere_revision: int
+        periodicite_revision: int
+        prochain_ct: date
+        double_clef: str
+        numero_scelle: str
+        statut: str
+        # Version lue avant la modification : une version périmée est refusée
+        row_version: Optional[int] = None
+
+        @field_validator('immatriculation')
+        @classmethod
+        def validate_immatriculation(cls, value):
+            if not re.match(r'^[A-Za-z]{2}-\d{3}-[A-Za-z]{2}$', value):
+                raise ValueError('L\'immatriculation doit être sous format AB-123-CD')
+            return value
+
+        @field_validator('code_carte')
+        @classmethod
+        def validate_code_carte(cls, value):
+            if not re.match(r'^\d{4}$', value):
+                raise ValueError('Le code carte doit contenir 4 chiffres')
+            return value
+
+        @field_validator('numero_scelle')
+        @classmethod
+        def validate_numeric(cls, value):
+            if not re.match(r'^\d+$', value):
+                raise ValueError('Ce champ doit contenir uniquement des chiffres')
+            return value
+
+        @field_validator(*KMS_FIELDS, mode='before')
+        @classmethod
+        def validate_kms(cls, value):
+            try:
+                kms = parse_kms(value)
+            except ValueError:
+                raise ValueError('Ce champ doit contenir uniquement des chiffres')
+            if kms is None:
+                raise ValueError('Ce champ est obligatoire')
+            return kms
+
+        @field_validator(*DATE_FIELDS, mode='before')
+        @classmethod
+        def validate_date(cls, value):
+            try:
+                parsed = parse_date(value)
+            except ValueError:
+                raise ValueError('La date doit être au format JJ/MM/AAAA')
+            if parsed is None:
+                raise ValueError('Ce champ est obligatoire')
+            return parsed
+
+    return VehicleModel
+
+
+def __getattr__(name: str):
+    # CarLogix.VehicleModel reste disponible sans charger pydantic à l'import
+    if name == "VehicleModel":
+        return vehicle_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+EXCEL_HEADERS = [
+    "ID", "Immatriculation", "Code Carte", "Société Propriétaire", "Site", "Utilisateur",
+    "Marque", "Véhicule", "Modèle", "Date de mise en service", "CRIT AIR", "Carburant",
+    "Type Huile", "Fluide Dispo", "Relevé KMS", "Date Dernière Révision",
+    "Dernière Révision", "Périodicité Révision", "Prochain C.T.", "Double de clef", "N° Scellé du double", "Statut",
+]
+
+# Colonnes de la table "vehicles", dans l'ordre des champs de Vehicle (hors ID et row_version)
+VEHICLE_FIELDS = [field.name for field in fields(Vehicle)][1:-1]
+
+_DATE_POSITIONS = [VEHICLE_FIELDS.index(name) for name in DATE_FIELDS]
+_KMS_POSITIONS = [VEHICLE_FIELDS.index(name) for name in KMS_FIELDS]
+
+
+@dataclass
+class DataQualityIssue:
+    vehicle_id: int
+    field: str
+    value: object
+    message: str
+
+
+def _to_storage(values: list) -> list:
+    """
+    Convertit les valeurs d'un véhicule (hors ID) pour SQLite : dates au format
+    ISO, kilométrages en entiers. Une valeur illisible est conservée telle quelle
+    et sera signalée dans le rapport de qualité des données.
+    """
+    stored = list(values)
+    for position in _DATE_POSITIONS:
+        try:
+            parsed = parse_date(stored[position])
+        except ValueError:
+            continue
+        stored[position] = parsed.isoformat() if parsed else None
+    for position in _KMS_POSITIONS:
+        try:
+            stored[position] = parse_kms(stored[position])
+        except ValueError:
+            continue
+    return stored
+
+
+def _to_storage_value(name: str, value):
+    # Valeur d'un seul champ au format stocké (filtres SQL)
+    return _to_storage([value if other == name else None for other in VEHICLE_FIELDS])[VEHICLE_FIELDS.index(name)]
+
+
+def _vehicle_from_row(row: tuple, issues: List[DataQualityIssue]) -> Vehicle:
+    values = list(row)
+    for parse, positions, message in (
+        (parse_date, _DATE_POSITIONS, "Date illisible"),
+        (parse_kms, _KMS_POSITIONS, "Kilométrage illisible"),
+    ):
+        for position in positions:
+            try:
+                values[position + 1] = parse(values[position + 1])
+            except ValueError:
+                issues.append(DataQualityIssue(row[0], VEHICLE_FIELDS[position], values[position + 1], message))
+                values[position + 1] = None
+    return Vehicle(*values)
+
+
+def _normalize_cell(value):
+    """
+    Convertit une cellule Excel en texte, comme saisi dans l'application.
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.strftime('%d/%m/%Y')
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
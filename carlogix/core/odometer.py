@@ -0,0 +1,261 @@
+"""
+Historique des relevés kilométriques et projection du rythme de roulage
+(km/jour) et de la date de la prochaine révision.
+"""
+from __future__ import annotations
+
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .alerts import _kms_column
+from .columns import FleetColumns
+from .metrics import timed
+from .models import Vehicle
+
+# Relevés retenus pour le rythme : ceux des RATE_WINDOW_DAYS jours précédant
+# le dernier relevé du véhicule, s'ils couvrent au moins MIN_RATE_SPAN_DAYS jours
+RATE_WINDOW_DAYS = 365
+MIN_RATE_SPAN_DAYS = 14
+DAYS_PER_MONTH = 365.25 / 12
+# Projection bornée à un siècle (rythme quasi nul) : reste une date valide
+MAX_PROJECTION_DAYS = 36525
+
+# Clé = ID << 32 | (jour + _DAY_OFFSET), triée dans un array('q') : les
+# relevés d'un véhicule sont contigus et dans l'ordre chronologique
+_DAY_BITS = 32
+_DAY_MASK = (1 << _DAY_BITS) - 1
+_DAY_OFFSET = 1 << 31
+_EPOCH = date(1970, 1, 1)
+# Converti en datetime64 : NaT
+_NAT_DAY = np.iinfo(np.int64).min
+
+
+@dataclass(frozen=True)
+class OdometerReading:
+    vehicle_id: int
+    date: date
+    kms: int
+
+
+def _day(value: date) -> int:
+    return (value - _EPOCH).days
+
+
+def _key(vehicle_id: int, day: int) -> int:
+    return (vehicle_id << _DAY_BITS) | (day + _DAY_OFFSET)
+
+
+class OdometerHistory:
+    """
+    Relevés kilométriques de la flotte, en colonnes : 16 octets par relevé
+    (clé véhicule/jour et kilométrage), triés par véhicule puis par date.
+    Les relevés sont ajoutés, jamais modifiés ; ceux d'un véhicule supprimé
+    sont retirés avec lui.
+    """
+
+    def __init__(self):
+        self._keys = array("q")
+        self._kms = array("q")
+
+    @classmethod
+    def from_rows(cls, rows: List[tuple]) -> "OdometerHistory":
+        """
+        Construit l'historique à partir des lignes SQLite (vehicle_id, jour
+        depuis 1970, kms), quel que soit leur ordre.
+        """
+        history = cls()
+        if not rows:
+            return history
+        columns = np.array(rows, dtype=np.int64)
+        keys = (columns[:, 0] << _DAY_BITS) | (columns[:, 1] + _DAY_OFFSET)
+        # Tri stable : à date égale, les relevés restent dans l'ordre d'enregistrement
+        order = np.argsort(keys, kind="stable")
+        history._keys.frombytes(keys[order].tobytes())
+        history._kms.frombytes(columns[order, 2].tobytes())
+        return history
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _range(self, vehicle_id: int) -> Tuple[int, int]:
+        return (bisect_left(self._keys, _key(vehicle_id, -_DAY_OFFSET)),
+                bisect_right(self._keys, _key(vehicle_id, _DAY_MASK - _DAY_OFFSET)))
+
+    def add(self, vehicle_id: int, when: date, kms: int):
+        key = _key(vehicle_id, _day(when))
+        position = bisect_right(self._keys, key)
+        self._keys.insert(position, key)
+        self._kms.insert(position, kms)
+
+    def remove_vehicle(self, vehicle_id: int):
+        start, end = self._range(vehicle_id)
+        del self._keys[start:end]
+        del self._kms[start:end]
+
+    def readings(self, vehicle_id: int) -> List[OdometerReading]:
+        start, end = self._range(vehicle_id)
+        return [
+            OdometerReading(vehicle_id, _EPOCH + timedelta(days=(key & _DAY_MASK) - _DAY_OFFSET), kms)
+            for key, kms in zip(self._keys[start:end], self._kms[start:end])
+        ]
+
+    def columns(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (ID, jour depuis 1970, kms) de tous les relevés, triés par véhicule
+        puis par date. Vues sur le stockage : valables jusqu'au prochain ajout.
+        """
+        keys = np.frombuffer(self._keys, dtype=np.int64) if self._keys else np.zeros(0, dtype=np.int64)
+        kms = np.frombuffer(self._kms, dtype=np.int64) if self._kms else np.zeros(0, dtype=np.int64)
+        return keys >> _DAY_BITS, (keys & _DAY_MASK) - _DAY_OFFSET, kms
+
+    def latest(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (ID, jour, kms) du dernier relevé de chaque véhicule, par ID croissant.
+        """
+        vehicle_ids, days, kms = self.columns()
+        if not len(vehicle_ids):
+            return vehicle_ids, days, kms
+        last = np.r_[vehicle_ids[1:] != vehicle_ids[:-1], True]
+        return vehicle_ids[last], days[last], kms[last]
+
+    def memory_usage(self) -> int:
+        return (len(self._keys) + len(self._kms)) * 8
+
+
+@dataclass
+class FleetProjection:
+    """
+    Projection par véhicule, dans l'ordre de ids : rythme en km/jour (NaN si
+    inconnu) et date prévue de la prochaine révision, au premier des deux
+    termes atteint (kilométrage projeté ou date de la dernière révision +
+    intervalle ; NaT si aucun n'est connu).
+    """
+    ids: np.ndarray
+    kms_per_day: np.ndarray
+    revision_kms_date: np.ndarray
+    revision_date: np.ndarray
+
+    def row(self, position: int) -> Tuple[Optional[float], Optional[date]]:
+        """
+        (rythme en km/jour, date prévue de révision) du véhicule n° position, None si inconnus.
+        """
+        rate = self.kms_per_day[position]
+        revision_date = self.revision_date[position]
+        return (None if np.isnan(rate) else float(rate),
+                None if np.isnat(revision_date) else revision_date.astype(date))
+
+    @property
+    def avg_monthly_kms(self) -> float:
+        known = self.kms_per_day[~np.isnan(self.kms_per_day)]
+        return float(known.mean() * DAYS_PER_MONTH) if len(known) else 0.0
+
+
+def _history_rates(history: OdometerHistory) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    # Par véhicule ayant des relevés : (ID, jour et kms du dernier relevé, rythme ou NaN)
+    vehicle_ids, days, kms = history.columns()
+    if not len(vehicle_ids):
+        return vehicle_ids, days, kms, np.zeros(0)
+    first_of_vehicle = np.r_[True, vehicle_ids[1:] != vehicle_ids[:-1]]
+    starts = np.flatnonzero(first_of_vehicle)
+    last = np.r_[starts[1:], len(vehicle_ids)] - 1
+    group = np.cumsum(first_of_vehicle) - 1
+    # Premier relevé de la fenêtre de chaque véhicule
+    in_window = days >= days[last][group] - RATE_WINDOW_DAYS
+    first = np.minimum.reduceat(np.where(in_window, np.arange(len(days)), len(days)), starts)
+    span = days[last] - days[first]
+    travelled = kms[last] - kms[first]
+    # Compteur remplacé ou relevé corrigé à la baisse : rythme non estimé
+    valid = (span >= MIN_RATE_SPAN_DAYS) & (travelled >= 0)
+    rates = np.where(valid, travelled / np.where(valid, span, 1), np.nan)
+    return vehicle_ids[starts], days[last], kms[last], rates
+
+
+@timed("odometer.project_fleet", rows=lambda projection: len(projection.ids))
+def project_fleet(fleet: FleetColumns, history: Optional[OdometerHistory] = None,
+                  revision_interval_days: int = 365) -> FleetProjection:
+    """
+    Rythme et date prévue de révision de toute la flotte, en une passe vectorisée.
+
+    Rythme : pente des relevés de la fenêtre RATE_WINDOW_DAYS, à défaut
+    moyenne depuis la mise en service jusqu'au dernier relevé daté (dernier
+    relevé de l'historique ou dernière révision). Le kilométrage de la
+    prochaine révision est projeté à ce rythme depuis ce même relevé.
+    """
+    ids = fleet.ids
+    revision = fleet.column("date_derniere_revision").astype("datetime64[D]").astype(np.int64)
+    revision_valid = ~np.isnat(fleet.column("date_derniere_revision"))
+    service = fleet.column("date_mise_en_service").astype("datetime64[D]").astype(np.int64)
+    service_valid = ~np.isnat(fleet.column("date_mise_en_service"))
+    derniere_revision = _kms_column(fleet, "derniere_revision")
+    periodicite = _kms_column(fleet, "periodicite_revision")
+
+    # Relevé de référence : la dernière révision, ou le dernier relevé s'il est plus récent
+    anchor_day = revision.copy()
+    anchor_kms = derniere_revision.copy()
+    anchor_valid = revision_valid.copy()
+    history_rate = np.full(len(ids), np.nan)
+    if history is not None and len(history):
+        vehicle_ids, last_day, last_kms, rates = _history_rates(history)
+        positions = np.searchsorted(ids, vehicle_ids)
+        known = positions < len(ids)
+        known[known] = ids[positions[known]] == vehicle_ids[known]
+        positions, last_day, last_kms, rates = positions[known], last_day[known], last_kms[known], rates[known]
+        newer = ~anchor_valid[positions] | (last_day >= anchor_day[positions])
+        anchor_day[positions[newer]] = last_day[newer]
+        anchor_kms[positions[newer]] = last_kms[newer]
+        anchor_valid[positions] = True
+        history_rate[positions] = rates
+
+    lifetime_span = anchor_day - service
+    lifetime_valid = anchor_valid & service_valid & (lifetime_span > 0) & (anchor_kms > 0)
+    lifetime_rate = np.where(lifetime_valid, anchor_kms / np.where(lifetime_valid, lifetime_span, 1), np.nan)
+    kms_per_day = np.where(np.isnan(history_rate), lifetime_rate, history_rate)
+
+    projected = revision_valid & anchor_valid & (kms_per_day > 0)
+    safe_rate = np.where(projected, kms_per_day, 1.0)
+    days_to_revision = np.clip(
+        np.ceil((derniere_revision + periodicite - anchor_kms) / safe_rate), -MAX_PROJECTION_DAYS, MAX_PROJECTION_DAYS,
+    )
+    revision_kms_day = anchor_day + np.where(projected, days_to_revision, 0).astype(np.int64)
+    revision_kms_date = np.where(projected, revision_kms_day, _NAT_DAY).astype("datetime64[D]")
+    revision_date = np.where(
+        projected, np.minimum(revision_kms_day, revision + revision_interval_days), revision + revision_interval_days,
+    )
+    revision_date = np.where(revision_valid, revision_date, _NAT_DAY).astype("datetime64[D]")
+    return FleetProjection(ids.copy(), kms_per_day, revision_kms_date, revision_date)
+
+
+def project_vehicle(vehicle: Vehicle, history: Optional[OdometerHistory] = None) -> Tuple[Optional[float], Optional[date]]:
+    """
+    Mêmes règles que project_fleet, pour un seul véhicule :
+    (rythme en km/jour, date où le kilométrage de révision sera atteint).
+    """
+    readings = history.readings(vehicle.id) if history is not None else []
+    rate = None
+    anchor_day = _day(vehicle.date_derniere_revision) if vehicle.date_derniere_revision is not None else None
+    anchor_kms = int(vehicle.derniere_revision or 0)
+    if readings:
+        last = readings[-1]
+        if anchor_day is None or _day(last.date) >= anchor_day:
+            anchor_day, anchor_kms = _day(last.date), last.kms
+        window = [reading for reading in readings if _day(reading.date) >= _day(last.date) - RATE_WINDOW_DAYS]
+        span = _day(last.date) - _day(window[0].date)
+        travelled = last.kms - window[0].kms
+        if span >= MIN_RATE_SPAN_DAYS and travelled >= 0:
+            rate = travelled / span
+    if rate is None and anchor_day is not None and vehicle.date_mise_en_service is not None:
+        span = anchor_day - _day(vehicle.date_mise_en_service)
+        if span > 0 and anchor_kms > 0:
+            rate = anchor_kms / span
+    if vehicle.date_derniere_revision is None or anchor_day is None or not rate or rate <= 0:
+        return rate, None
+    target = int(vehicle.derniere_revision or 0) + int(vehicle.periodicite_revision or 0)
+    days_to_revision = min(max(math.ceil((target - anchor_kms) / rate), -MAX_PROJECTION_DAYS), MAX_PROJECTION_DAYS)
+    return rate, _EPOCH + timedelta(days=anchor_day + days_to_revision)
+
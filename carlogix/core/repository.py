@@ -0,0 +1,882 @@
+"""
+Dépôt SQLite des véhicules, avec la flotte en cache mémoire.
+"""
+from __future__ import annotations
+
+import atexit
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .alerts import AlertThresholds
+from .columns import FleetColumns
+from .deadlines import Deadline, DeadlineIndex
+from .events import CHANGE_ADDED, CHANGE_DELETED, CHANGE_RELOADED, CHANGE_UPDATED, VehicleChange
+from .export import export_vehicles
+from .locking import FileLock
+from .metrics import METRICS, timed
+from .models import (
+    EXCEL_HEADERS, KMS_FIELDS, VEHICLE_FIELDS, DataQualityIssue, Vehicle,
+    _normalize_cell, _to_storage, _to_storage_value, _vehicle_from_row,
+)
+from .odometer import FleetProjection, OdometerHistory, OdometerReading, project_fleet
+from .search import VehicleSearchIndex
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from .models import VehicleModel
+
+
+_INSERT_VEHICLE_SQL = (
+    f"INSERT INTO vehicles (id, {', '.join(VEHICLE_FIELDS)}) "
+    f"VALUES ({', '.join('?' * (len(VEHICLE_FIELDS) + 1))})"
+)
+# Chaque modification incrémente row_version ; la variante conditionnelle
+# n'écrit que si la ligne est toujours à la version lue
+_UPDATE_VEHICLE_SQL = (
+    f"UPDATE vehicles SET {', '.join(f'{name} = ?' for name in VEHICLE_FIELDS)}, "
+    "row_version = row_version + 1 WHERE id = ?"
+)
+_UPDATE_VEHICLE_IF_VERSION_SQL = _UPDATE_VEHICLE_SQL + " AND row_version = ?"
+_DELETE_VEHICLE_SQL = "DELETE FROM vehicles WHERE id = ?"
+_SELECT_VEHICLES_SQL = f"SELECT id, {', '.join(VEHICLE_FIELDS)}, row_version FROM vehicles"
+
+_INSERT_READING_SQL = "INSERT INTO releves_kms (vehicle_id, date, kms) VALUES (?, ?, ?)"
+# Relevés appliqués en masse (apply_odometer_readings), un par véhicule
+_ODOMETER_FEED_TABLE_SQL = (
+    "CREATE TEMP TABLE IF NOT EXISTS releves_flux "
+    "(vehicle_id INTEGER PRIMARY KEY, date TEXT NOT NULL, kms INTEGER NOT NULL)"
+)
+# Dates converties par SQLite en jours depuis 1970, dans l'ordre d'enregistrement
+_SELECT_READINGS_SQL = (
+    "SELECT vehicle_id, CAST(julianday(date) - 2440587.5 AS INTEGER), kms FROM releves_kms ORDER BY rowid"
+)
+
+# Version du schéma (PRAGMA user_version) : 2 = dates ISO et kilométrages
+# entiers, 3 = version de ligne (row_version), 4 = relevés kilométriques
+SCHEMA_VERSION = 4
+_VEHICLES_TABLE_SQL = (
+    "CREATE TABLE IF NOT EXISTS vehicles (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+    + ", ".join(f"{name} {'INTEGER' if name in KMS_FIELDS else 'TEXT'}" for name in VEHICLE_FIELDS)
+    + ", row_version INTEGER NOT NULL DEFAULT 1)"
+)
+_READINGS_TABLE_SQL = (
+    "CREATE TABLE IF NOT EXISTS releves_kms (vehicle_id INTEGER NOT NULL, date TEXT NOT NULL, kms INTEGER NOT NULL)"
+)
+# Historique des relevés tenu par SQLite, quel que soit le chemin d'écriture
+# (saisie, import, write-behind) : un relevé daté du jour chaque fois que
+# releve_kms est renseigné ou modifié, retirés avec le véhicule. _cache_put
+# applique la même règle à l'historique en mémoire.
+_READINGS_TRIGGERS_SQL = (
+    "CREATE TRIGGER IF NOT EXISTS releves_kms_insert AFTER INSERT ON vehicles "
+    "WHEN NEW.releve_kms IS NOT NULL BEGIN "
+    "INSERT INTO releves_kms (vehicle_id, date, kms) VALUES (NEW.id, date('now', 'localtime'), NEW.releve_kms); END",
+    "CREATE TRIGGER IF NOT EXISTS releves_kms_update AFTER UPDATE OF releve_kms ON vehicles "
+    "WHEN NEW.releve_kms IS NOT NULL AND NEW.releve_kms IS NOT OLD.releve_kms BEGIN "
+    "INSERT INTO releves_kms (vehicle_id, date, kms) VALUES (NEW.id, date('now', 'localtime'), NEW.releve_kms); END",
+    "CREATE TRIGGER IF NOT EXISTS releves_kms_delete AFTER DELETE ON vehicles BEGIN "
+    "DELETE FROM releves_kms WHERE vehicle_id = OLD.id; END",
+)
+
+
+class StaleVehicleError(Exception):
+    """
+    Modification refusée : le véhicule a été modifié ou supprimé depuis sa
+    lecture (row_version différente).
+    """
+
+    def __init__(self, vehicle_id: int, message: str):
+        super().__init__(message)
+        self.vehicle_id = vehicle_id
+
+
+def _excel_id(value) -> Optional[int]:
+    # ID lu dans la première colonne du classeur ; None si absent ou illisible
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class VehicleRepository:
+    def __init__(self, db_path="CarLogix_DATA.db", xlsx_path="CarLogix_DATA.xlsx",
+                 write_behind: bool = False, flush_interval: float = 2.0, flush_threshold: int = 100):
+        self.db_path = db_path
+        self.xlsx_path = xlsx_path
+        self._lock = threading.RLock()
+        self._in_transaction = False
+        self._cache: Optional[FleetColumns] = None
+        self._cache_signature = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._search_index: Optional[VehicleSearchIndex] = None
+        self._deadline_index: Optional[DeadlineIndex] = None
+        self._odometer: Optional[OdometerHistory] = None
+        self._quality_issues: Dict[int, List[DataQualityIssue]] = {}
+        # Incrémenté à chaque changement de l'état en mémoire de la flotte, y
+        # compris l'abandon du cache : une version lue avant fleet_columns()
+        # ne correspond jamais à des données plus anciennes que cette lecture
+        self.version = 0
+        self._listeners: List[Callable[[VehicleChange], None]] = []
+
+        # Mode write-behind : les écritures sont appliquées en mémoire puis
+        # regroupées dans une seule transaction (minuterie ou N écritures)
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._pending: List[tuple] = []
+        self._flush_timer: Optional[threading.Timer] = None
+        self._next_id: Optional[int] = None
+
+        # Sérialise les écritures des autres processus (autres instances, workers)
+        self._file_lock = FileLock(f"{self.db_path}.lock")
+        with self._file_lock:
+            if not os.path.exists(self.db_path) and self.xlsx_path and os.path.exists(self.xlsx_path):
+                self._migrate_from_xlsx()
+            self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+            # Mode WAL : les lectures longues (iter_rows) ne bloquent pas les écritures
+            self.connection.execute("PRAGMA journal_mode = WAL")
+        self.create_schema()
+        if self.write_behind:
+            atexit.register(self.close)
+
+    def _migrate_from_xlsx(self):
+        # Migration initiale depuis le classeur : la base est construite à côté
+        # puis mise en place d'un bloc (os.replace). Si l'import échoue, aucune
+        # base n'est créée et la migration est retentée au prochain démarrage.
+        building_path = f"{self.db_path}.migration"
+        if os.path.exists(building_path):
+            os.remove(building_path)
+        try:
+            repository = VehicleRepository(building_path, xlsx_path=None)
+            try:
+                repository.import_xlsx(self.xlsx_path, keep_ids=True)
+            finally:
+                repository.close()
+            os.replace(building_path, self.db_path)
+        except BaseException:
+            if os.path.exists(building_path):
+                os.remove(building_path)
+            raise
+        finally:
+            if os.path.exists(f"{building_path}.lock"):
+                os.remove(f"{building_path}.lock")
+
+    @timed("repository.create_schema")
+    def create_schema(self):
+        with self.transaction() as connection:
+            if not connection.in_transaction:
+                connection.execute("BEGIN")
+            table_exists = connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'vehicles'"
+            ).fetchone()
+            schema_version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if table_exists and schema_version < 2:
+                self._migrate_typed_columns(connection)
+            elif table_exists and schema_version < 3:
+                connection.execute("ALTER TABLE vehicles ADD COLUMN row_version INTEGER NOT NULL DEFAULT 1")
+            else:
+                connection.execute(_VEHICLES_TABLE_SQL)
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_vehicles_immatriculation ON vehicles (immatriculation)"
+            )
+            # Filtres d'export les plus courants, appliqués par SQLite
+            connection.execute("CREATE INDEX IF NOT EXISTS idx_vehicles_site ON vehicles (site)")
+            connection.execute("CREATE INDEX IF NOT EXISTS idx_vehicles_statut ON vehicles (statut)")
+            # Schéma 4 : l'historique commence vide, les relevés sont datés à partir de la migration
+            connection.execute(_READINGS_TABLE_SQL)
+            connection.execute("CREATE INDEX IF NOT EXISTS idx_releves_kms_vehicle ON releves_kms (vehicle_id, date)")
+            for trigger in _READINGS_TRIGGERS_SQL:
+                connection.execute(trigger)
+            connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _migrate_typed_columns(self, connection: sqlite3.Connection):
+        # Schéma 1 (tout en texte, dates JJ/MM/AAAA) vers schéma 2. La table est
+        # recréée pour que les kilométrages aient l'affinité INTEGER ; la
+        # séquence AUTOINCREMENT est conservée pour ne jamais réutiliser d'ID.
+        row = connection.execute("SELECT seq FROM sqlite_sequence WHERE name = 'vehicles'").fetchone()
+        last_id = row[0] if row else 0
+        connection.execute("ALTER TABLE vehicles RENAME TO vehicles_v1")
+        connection.execute(_VEHICLES_TABLE_SQL)
+        rows = connection.execute(f"SELECT id, {', '.join(VEHICLE_FIELDS)} FROM vehicles_v1").fetchall()
+        connection.executemany(_INSERT_VEHICLE_SQL, [[row[0]] + _to_storage(row[1:]) for row in rows])
+        connection.execute("DROP TABLE vehicles_v1")
+        connection.execute("DELETE FROM sqlite_sequence WHERE name IN ('vehicles', 'vehicles_v1')")
+        connection.execute(
+            "INSERT INTO sqlite_sequence (name, seq) VALUES ('vehicles', MAX(?, (SELECT IFNULL(MAX(id), 0) FROM vehicles)))",
+            (last_id,),
+        )
+
+    @contextmanager
+    def transaction(self):
+        """
+        Regroupe plusieurs écritures dans une seule transaction SQLite.
+        Les transactions imbriquées sont fusionnées dans la transaction englobante.
+        Le verrou du dépôt sérialise les threads, le verrou de fichier les processus.
+        """
+        with self._lock:
+            if self._in_transaction:
+                yield self.connection
+                return
+            self._in_transaction = True
+            try:
+                with self._file_lock, self.connection:
+                    yield self.connection
+            finally:
+                self._in_transaction = False
+                self.invalidate_cache()
+
+    def _file_signature(self):
+        # mtime/taille du fichier et data_version détectent les écritures
+        # faites par d'autres connexions ou d'autres processus
+        stat = os.stat(self.db_path)
+        data_version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+        return stat.st_mtime_ns, stat.st_size, data_version
+
+    def invalidate_cache(self):
+        with self._lock:
+            if self._pending:
+                # l'état en mémoire contient des écritures pas encore enregistrées
+                return
+            if self._cache is not None:
+                self.version += 1
+            self._cache = None
+            self._cache_signature = None
+            self._search_index = None
+            self._deadline_index = None
+            self._odometer = None
+
+    def cache_stats(self) -> dict:
+        return {"hits": self.cache_hits, "misses": self.cache_misses}
+
+    def _fleet(self) -> FleetColumns:
+        # À appeler sous self._lock. Le cache est stocké en colonnes, trié par ID.
+        # Tant que des écritures sont en attente, l'état en mémoire fait foi.
+        if self._cache_is_valid():
+            self.cache_hits += 1
+            return self._cache
+
+        self.cache_misses += 1
+        # Cache abandonné par invalidate_cache : la version a déjà été incrémentée
+        replaced = self._cache is not None
+        with METRICS.measure("repository.load_fleet") as timer:
+            signature = self._file_signature()
+            rows = self.connection.execute(f"{_SELECT_VEHICLES_SQL} ORDER BY id").fetchall()
+            issues: List[DataQualityIssue] = []
+            self._cache = FleetColumns.from_rows(rows, issues)
+            timer.rows = len(rows)
+        self._quality_issues = {}
+        for issue in issues:
+            self._quality_issues.setdefault(issue.vehicle_id, []).append(issue)
+        self._cache_signature = signature
+        self._search_index = None
+        self._deadline_index = None
+        self._odometer = None
+        if replaced:
+            self.version += 1
+        return self._cache
+
+    def _cache_put(self, fleet: FleetColumns, vehicle: Vehicle):
+        is_update = vehicle.id in fleet
+        previous = fleet.get(vehicle.id) if is_update else None
+        # Les échéances dépendent de l'historique : désindexées avant le nouveau relevé
+        if self._deadline_index is not None and previous is not None:
+            self._deadline_index.remove(previous)
+        if self._odometer is not None and vehicle.releve_kms is not None and (
+            previous is None or previous.releve_kms != vehicle.releve_kms
+        ):
+            self._odometer.add(vehicle.id, date.today(), vehicle.releve_kms)
+        if self._deadline_index is not None:
+            self._deadline_index.add(vehicle)
+        fleet.put(vehicle)
+        self._quality_issues.pop(vehicle.id, None)
+        self.version += 1
+        if self._search_index is not None:
+            if is_update:
+                self._search_index.update(vehicle)
+            else:
+                self._search_index.add(vehicle)
+
+    def _cache_remove(self, fleet: FleetColumns, vehicle_id: int) -> bool:
+        previous = fleet.get(vehicle_id) if self._deadline_index is not None else None
+        if not fleet.remove(vehicle_id):
+            return False
+        if previous is not None:
+            self._deadline_index.remove(previous)
+        if self._odometer is not None:
+            self._odometer.remove_vehicle(vehicle_id)
+        self._quality_issues.pop(vehicle_id, None)
+        self.version += 1
+        if self._search_index is not None:
+            self._search_index.remove(vehicle_id)
+        return True
+
+    def _cache_is_valid(self) -> bool:
+        return self._cache is not None and (bool(self._pending) or self._file_signature() == self._cache_signature)
+
+    @timed("repository.fetch_all_vehicles", rows=len)
+    def fetch_all_vehicles(self) -> List[Vehicle]:
+        with self._lock:
+            return list(self._fleet().values())
+
+    @timed("repository.fleet_columns", rows=len)
+    def fleet_columns(self) -> FleetColumns:
+        """
+        Flotte en colonnes, à lire sans la modifier : instantané du cache
+        (FleetColumns.snapshot), que les écritures suivantes ne modifient
+        pas. Peut être lu hors du verrou, depuis n'importe quel thread.
+        """
+        with self._lock:
+            return self._fleet().snapshot()
+
+    @timed("repository.get_vehicle")
+    def get_vehicle(self, id: int) -> Optional[Vehicle]:
+        with self._lock:
+            if self._cache_is_valid():
+                self.cache_hits += 1
+                return self._cache.get(id)
+            row = self.connection.execute(f"{_SELECT_VEHICLES_SQL} WHERE id = ?", (id,)).fetchone()
+            return _vehicle_from_row(row, []) if row else None
+
+    @timed("repository.get_vehicles", rows=len)
+    def get_vehicles(self, ids: Iterable[int]) -> Dict[int, Vehicle]:
+        """
+        Véhicules d'identifiants ids, lus sous un seul verrou. Les identifiants
+        inconnus (véhicules supprimés) sont absents du résultat.
+        """
+        with self._lock:
+            fleet = self._fleet()
+            vehicles = {}
+            for id in ids:
+                vehicle = fleet.get(id)
+                if vehicle is not None:
+                    vehicles[id] = vehicle
+            return vehicles
+
+    @timed("repository.data_quality_report", rows=len)
+    def data_quality_report(self) -> List[DataQualityIssue]:
+        """
+        Cellules illisibles détectées au chargement (dates, kilométrages).
+        Elles valent None dans les Vehicle retournés par le dépôt.
+        """
+        with self._lock:
+            self._fleet()
+            return [issue for issues in self._quality_issues.values() for issue in issues]
+
+    @timed("repository.search_vehicles", rows=len)
+    def search_vehicles(self, text: str) -> List[Vehicle]:
+        """
+        Recherche par sous-chaîne sur l'immatriculation, la marque, le véhicule,
+        l'utilisateur et le site. L'index est construit à la première recherche
+        puis tenu à jour à chaque écriture.
+        """
+        with self._lock:
+            fleet = self._fleet()
+            return [fleet.get(vehicle_id) for vehicle_id in self.search_vehicle_ids(text)]
+
+    @timed("repository.search_vehicle_ids", rows=len)
+    def search_vehicle_ids(self, text: str) -> List[int]:
+        """
+        Comme search_vehicles, mais ne retourne que les ID (croissants) :
+        les véhicules ne sont pas créés.
+        """
+        with self._lock:
+            fleet = self._fleet()
+            if self._search_index is None:
+                self._search_index = VehicleSearchIndex(fleet.values())
+            return self._search_index.search(text)
+
+    def _odometer_history(self) -> OdometerHistory:
+        # À appeler sous self._lock. Lu avec la flotte et tenu à jour avec elle ;
+        # les écritures en attente sont d'abord enregistrées (relevés compris).
+        self._fleet()
+        if self._odometer is None:
+            self.flush()
+            with METRICS.measure("repository.load_odometer") as timer:
+                rows = self.connection.execute(_SELECT_READINGS_SQL).fetchall()
+                self._odometer = OdometerHistory.from_rows(rows)
+                timer.rows = len(rows)
+        return self._odometer
+
+    def _deadlines(self, revision_interval_days: int) -> DeadlineIndex:
+        # À appeler sous self._lock. Construit à la première requête, puis
+        # tenu à jour par _cache_put et _cache_remove.
+        fleet = self._fleet()
+        history = self._odometer_history()
+        if (self._deadline_index is None or self._deadline_index.revision_interval_days != revision_interval_days
+                or self._deadline_index.history is not history):
+            self._deadline_index = DeadlineIndex(fleet, revision_interval_days, history)
+        return self._deadline_index
+
+    @timed("repository.due_vehicle_ids", rows=len)
+    def due_vehicle_ids(self, kind: str, since: Optional[date] = None, until: Optional[date] = None,
+                        revision_interval_days: int = 365) -> List[int]:
+        """
+        ID des véhicules dont l'échéance kind (DEADLINE_CT, DEADLINE_REVISION
+        ou DEADLINE_REVISION_KMS) tombe entre since et until inclus (None =
+        sans borne), par date croissante. Ex. : en retard = until hier.
+        """
+        with self._lock:
+            return self._deadlines(revision_interval_days).due_between(kind, since, until)
+
+    @timed("repository.next_deadlines", rows=len)
+    def next_deadlines(self, count: int = 20, today: Optional[date] = None,
+                       revision_interval_days: int = 365) -> List[Deadline]:
+        with self._lock:
+            return self._deadlines(revision_interval_days).next_deadlines(count, today)
+
+    @timed("repository.alert_candidates", rows=lambda candidates: sum(map(len, candidates)))
+    def alert_candidates(self, thresholds: Optional[AlertThresholds] = None,
+                         today: Optional[date] = None) -> Tuple[FleetColumns, FleetColumns]:
+        """
+        Véhicules pouvant être en alerte de révision, puis de contrôle
+        technique, trouvés par l'index des échéances sans parcourir la flotte.
+        compute_fleet_alerts sur ces colonnes donne les mêmes alertes que
+        sur toute la flotte.
+        """
+        thresholds = thresholds or AlertThresholds()
+        with self._lock:
+            fleet = self._fleet()
+            deadlines = self._deadlines(thresholds.revision_interval_days)
+            return (
+                fleet.take(deadlines.maintenance_candidates(thresholds, today)),
+                fleet.take(deadlines.ct_candidates(thresholds, today)),
+            )
+
+    @timed("repository.revision_projection", rows=lambda projection: len(projection.ids))
+    def revision_projection(self, fleet: Optional[FleetColumns] = None,
+                            revision_interval_days: int = 365) -> FleetProjection:
+        """
+        Rythme (km/jour) et date prévue de la prochaine révision des véhicules
+        de fleet (par défaut toute la flotte), d'après l'historique des relevés.
+        """
+        with self._lock:
+            history = self._odometer_history()
+            return project_fleet(self._fleet() if fleet is None else fleet, history, revision_interval_days)
+
+    @timed("repository.odometer_history")
+    def odometer_history(self) -> OdometerHistory:
+        """
+        Historique des relevés de la flotte, partagé avec le dépôt : à lire
+        sans le modifier, valable jusqu'à la prochaine écriture.
+        """
+        with self._lock:
+            return self._odometer_history()
+
+    @timed("repository.latest_odometer_readings")
+    def latest_odometer_readings(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (ID, jour, kms) du dernier relevé de chaque véhicule, par ID croissant :
+        copies lues sous le verrou, utilisables pendant les écritures suivantes.
+        """
+        with self._lock:
+            return self._odometer_history().latest()
+
+    @timed("repository.odometer_readings", rows=len)
+    def odometer_readings(self, vehicle_id: int) -> List[OdometerReading]:
+        """
+        Relevés kilométriques du véhicule, par date croissante.
+        """
+        with self._lock:
+            return self._odometer_history().readings(vehicle_id)
+
+    @timed("repository.add_odometer_readings", rows=int)
+    def add_odometer_readings(self, readings: Iterable[OdometerReading], chunk_size: int = 10000) -> int:
+        """
+        Ajoute des relevés datés (reprise d'historique) en une seule
+        transaction, sans modifier releve_kms. L'itérable est consommé par
+        paquets : il peut être un générateur. Retourne le nombre de relevés.
+        """
+        count = 0
+        with self._lock:
+            self.flush()
+            iterator = iter(readings)
+            with self.transaction() as connection:
+                while True:
+                    chunk = list(islice(iterator, chunk_size))
+                    if not chunk:
+                        break
+                    connection.executemany(
+                        _INSERT_READING_SQL,
+                        [(reading.vehicle_id, reading.date.isoformat(), reading.kms) for reading in chunk],
+                    )
+                    count += len(chunk)
+        return count
+
+    @timed("repository.apply_odometer_readings", rows=int)
+    def apply_odometer_readings(self, readings: Iterable[OdometerReading], chunk_size: int = 10000) -> int:
+        """
+        Applique en une seule transaction des relevés récents, un par véhicule
+        au plus (télématique) : releve_kms prend la valeur du relevé, qui est
+        ajouté à l'historique avec sa date. Un relevé inférieur au
+        kilométrage actuel du véhicule est ignoré : le compteur ne recule
+        jamais, même si le véhicule a été modifié depuis la lecture du flux.
+        Retourne le nombre de relevés enregistrés.
+        """
+        with self._lock:
+            self.flush()
+            iterator = iter(readings)
+            with self.transaction() as connection:
+                connection.execute(_ODOMETER_FEED_TABLE_SQL)
+                connection.execute("DELETE FROM temp.releves_flux")
+                while True:
+                    chunk = list(islice(iterator, chunk_size))
+                    if not chunk:
+                        break
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO temp.releves_flux (vehicle_id, date, kms) VALUES (?, ?, ?)",
+                        [(reading.vehicle_id, reading.date.isoformat(), reading.kms) for reading in chunk],
+                    )
+                last_reading = connection.execute("SELECT IFNULL(MAX(rowid), 0) FROM releves_kms").fetchone()[0]
+                connection.execute(
+                    "UPDATE vehicles SET releve_kms = flux.kms, row_version = row_version + 1 "
+                    "FROM temp.releves_flux AS flux WHERE vehicles.id = flux.vehicle_id "
+                    "AND (vehicles.releve_kms IS NULL OR vehicles.releve_kms < flux.kms)"
+                )
+                # Les relevés datés du jour par le déclencheur sont remplacés par
+                # ceux du flux, avec leur date (y compris à kilométrage inchangé)
+                connection.execute("DELETE FROM releves_kms WHERE rowid > ?", (last_reading,))
+                count = connection.execute(
+                    "INSERT INTO releves_kms (vehicle_id, date, kms) SELECT flux.vehicle_id, flux.date, flux.kms "
+                    "FROM temp.releves_flux AS flux JOIN vehicles ON vehicles.id = flux.vehicle_id "
+                    "WHERE vehicles.releve_kms = flux.kms"
+                ).rowcount
+                connection.execute("DELETE FROM temp.releves_flux")
+            if count:
+                self._publish(VehicleChange(CHANGE_RELOADED))
+        return count
+
+    def subscribe(self, listener: Callable[[VehicleChange], None]) -> Callable[[], None]:
+        """
+        Appelle listener(change) après chaque modification (VehicleChange),
+        depuis le thread qui écrit et sous le verrou du dépôt : listener doit
+        rendre la main rapidement (l'interface relaie vers page.pubsub).
+        Retourne la fonction qui désabonne listener.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+        def unsubscribe():
+            with self._lock:
+                if listener in self._listeners:
+                    self._listeners.remove(listener)
+        return unsubscribe
+
+    def _publish(self, change: VehicleChange):
+        for listener in list(self._listeners):
+            listener(change)
+
+    @timed("repository.add_vehicle")
+    def add_vehicle(self, vehicle: VehicleModel) -> int:
+        values = [getattr(vehicle, name) for name in VEHICLE_FIELDS]
+        with self._lock:
+            if self.write_behind:
+                new_id = self._allocate_id()
+                self._cache_put(self._fleet(), Vehicle(new_id, *values))
+                self._enqueue((_INSERT_VEHICLE_SQL, [new_id] + _to_storage(values)))
+            else:
+                cursor, fleet = self._commit([(_INSERT_VEHICLE_SQL, [None] + _to_storage(values))])
+                new_id = cursor.lastrowid
+                if fleet is not None:
+                    self._cache_put(fleet, Vehicle(new_id, *values))
+            self._publish(VehicleChange(CHANGE_ADDED, new_id, tuple(VEHICLE_FIELDS), 1))
+            return new_id
+
+    @timed("repository.update_vehicle")
+    def update_vehicle(self, vehicle: VehicleModel):
+        """
+        Enregistre les champs d'un véhicule. Si vehicle.row_version est
+        renseignée (version lue avant la modification) et que la ligne a changé
+        ou disparu depuis, la modification est refusée (StaleVehicleError).
+        """
+        values = [getattr(vehicle, name) for name in VEHICLE_FIELDS]
+        expected = getattr(vehicle, "row_version", None)
+        with self._lock:
+            if self.write_behind:
+                # Les écritures en attente font foi : la version est celle en mémoire
+                fleet = self._fleet()
+                current = fleet.get(vehicle.id)
+                self._check_row_version(vehicle.id, current.row_version if current else None, expected)
+                self._enqueue((_UPDATE_VEHICLE_SQL, _to_storage(values) + [vehicle.id]))
+                if current is not None:
+                    self._cache_put(fleet, Vehicle(vehicle.id, *values, current.row_version + 1))
+                    self._publish_update(current, values)
+                return
+
+            # Lecture de la version et écriture sous le verrou de fichier :
+            # aucun autre processus ne peut modifier la ligne entre les deux
+            with self._file_lock:
+                row = self.connection.execute("SELECT row_version FROM vehicles WHERE id = ?", (vehicle.id,)).fetchone()
+                current = row[0] if row else None
+                self._check_row_version(vehicle.id, current, expected)
+                if current is None:
+                    return
+                _, fleet = self._commit([(_UPDATE_VEHICLE_IF_VERSION_SQL, _to_storage(values) + [vehicle.id, current])])
+            previous = fleet.get(vehicle.id) if fleet is not None else None
+            if previous is not None:
+                self._cache_put(fleet, Vehicle(vehicle.id, *values, current + 1))
+                self._publish_update(previous, values)
+            else:
+                self._publish(VehicleChange(CHANGE_UPDATED, vehicle.id, tuple(VEHICLE_FIELDS), current + 1))
+
+    def _publish_update(self, previous: Vehicle, values: list):
+        # Seuls les champs dont la valeur a changé sont annoncés
+        changed = tuple(name for name, value in zip(VEHICLE_FIELDS, values) if getattr(previous, name) != value)
+        self._publish(VehicleChange(CHANGE_UPDATED, previous.id, changed, previous.row_version + 1))
+
+    @staticmethod
+    def _check_row_version(vehicle_id: int, current: Optional[int], expected: Optional[int]):
+        if expected is None:
+            return
+        if current is None:
+            raise StaleVehicleError(vehicle_id, "Ce véhicule a été supprimé par un autre utilisateur.")
+        if current != expected:
+            raise StaleVehicleError(
+                vehicle_id,
+                "Ce véhicule a été modifié par un autre utilisateur depuis son ouverture. "
+                "Rouvrez-le pour voir les dernières données avant de le modifier.",
+            )
+
+    @timed("repository.delete_vehicle")
+    def delete_vehicle(self, id: int):
+        with self._lock:
+            if self.write_behind:
+                removed = self._cache_remove(self._fleet(), id)
+                self._enqueue((_DELETE_VEHICLE_SQL, (id,)))
+                if not removed:
+                    return
+            else:
+                cursor, fleet = self._commit([(_DELETE_VEHICLE_SQL, (id,))])
+                if fleet is not None:
+                    self._cache_remove(fleet, id)
+                if not cursor.rowcount:
+                    return
+            self._publish(VehicleChange(CHANGE_DELETED, id))
+
+    @timed("repository.add_vehicles", rows=len)
+    def add_vehicles(self, vehicles: Iterable[VehicleModel], chunk_size: int = 1000) -> List[int]:
+        """
+        Ajoute un lot de véhicules en une seule transaction.
+        L'itérable est consommé par paquets : il peut être un générateur.
+        """
+        new_ids = []
+        with self._lock:
+            self.flush()
+            iterator = iter(vehicles)
+            with self.transaction() as connection:
+                next_id = self._allocate_id()
+                while True:
+                    chunk = list(islice(iterator, chunk_size))
+                    if not chunk:
+                        break
+                    rows = []
+                    for vehicle in chunk:
+                        new_ids.append(next_id)
+                        rows.append([next_id] + _to_storage([getattr(vehicle, name) for name in VEHICLE_FIELDS]))
+                        next_id += 1
+                    connection.executemany(_INSERT_VEHICLE_SQL, rows)
+            self._next_id = next_id
+            if new_ids:
+                self._publish(VehicleChange(CHANGE_RELOADED))
+        return new_ids
+
+    def _allocate_id(self) -> int:
+        # Même séquence que AUTOINCREMENT (sqlite_sequence), complétée par les
+        # ID déjà attribués en mémoire : un ID n'est jamais réutilisé.
+        row = self.connection.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'vehicles'"
+        ).fetchone()
+        new_id = max((row[0] if row else 0) + 1, self._next_id or 1)
+        self._next_id = new_id + 1
+        return new_id
+
+    def _commit(self, statements: List[tuple]) -> Tuple[sqlite3.Cursor, Optional[FleetColumns]]:
+        # Exécute les requêtes dans une transaction. Si le cache était à jour
+        # avant l'écriture, il est conservé et retourné pour être corrigé sur
+        # place ; sinon il sera relu (écriture d'un autre processus entre-temps).
+        cache = self._cache if self._cache_is_valid() else None
+        # Les index et l'historique suivent le cache : conservés avec lui, puis corrigés sur place
+        indexes = (self._search_index, self._deadline_index, self._odometer) if cache is not None else (None,) * 3
+        try:
+            with self.transaction() as connection:
+                for query, parameters in statements:
+                    cursor = connection.execute(query, parameters)
+        except Exception:
+            self._cache = cache
+            self._search_index, self._deadline_index, self._odometer = indexes
+            raise
+
+        if cache is not None:
+            self._cache = cache
+            self._search_index, self._deadline_index, self._odometer = indexes
+            self._cache_signature = self._file_signature()
+        return cursor, cache
+
+    def _enqueue(self, statement: tuple):
+        self._pending.append(statement)
+        if len(self._pending) >= self.flush_threshold:
+            self.flush()
+        elif self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    @timed("repository.flush", rows=int)
+    def flush(self) -> int:
+        """
+        Enregistre en une seule transaction les écritures en attente.
+        Retourne le nombre d'écritures enregistrées.
+        """
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._pending:
+                return 0
+
+            # Le cache contient déjà ces écritures : _commit le conserve tel quel
+            pending, self._pending = self._pending, []
+            cache = self._cache
+            try:
+                self._commit(pending)
+            except Exception:
+                self._pending = pending + self._pending
+                self._cache = cache
+                raise
+            return len(pending)
+
+    @timed("repository.close")
+    def close(self):
+        with self._lock:
+            self.flush()
+            atexit.unregister(self.close)
+            self.connection.close()
+            self._file_lock.close()
+
+    @timed("repository.import_xlsx", rows=int)
+    def import_xlsx(self, file_path: str, keep_ids: bool = False) -> int:
+        """
+        Importe les véhicules d'un classeur Excel au format CarLogix.
+        Avec keep_ids=True (migration initiale), les ID du classeur sont
+        conservés ; un ID absent, déjà pris ou en double (anciennes versions)
+        est remplacé par un nouvel ID, attribué après tous les ID conservés.
+        """
+        import openpyxl
+
+        self.flush()
+        wb = openpyxl.load_workbook(file_path, read_only=True)
+        ws = wb.active
+        count = 0
+        try:
+            with self.transaction() as connection:
+                used_ids = {row[0] for row in connection.execute("SELECT id FROM vehicles")} if keep_ids else set()
+                renumbered = []
+                for row in ws.iter_rows(min_row=2, values_only=True):
+                    if row[0] is None and not any(row[1:]):
+                        continue
+                    values = [_normalize_cell(value) for value in row[1:len(EXCEL_HEADERS)]]
+                    values += [None] * (len(VEHICLE_FIELDS) - len(values))
+                    vehicle_id = _excel_id(row[0]) if keep_ids else None
+                    if keep_ids and (vehicle_id is None or vehicle_id in used_ids):
+                        # Numérotés à la fin : un nouvel ID ne doit pas prendre celui d'une ligne suivante
+                        renumbered.append(values)
+                        continue
+                    used_ids.add(vehicle_id)
+                    connection.execute(_INSERT_VEHICLE_SQL, [vehicle_id] + _to_storage(values))
+                    count += 1
+                for values in renumbered:
+                    connection.execute(_INSERT_VEHICLE_SQL, [None] + _to_storage(values))
+                    count += 1
+        finally:
+            wb.close()
+            self._next_id = None
+        if count:
+            self._publish(VehicleChange(CHANGE_RELOADED))
+        return count
+
+    @staticmethod
+    def _where_clause(filters: Dict[str, object]) -> Tuple[str, list]:
+        unknown = set(filters) - set(VEHICLE_FIELDS)
+        if unknown:
+            raise ValueError(f"Colonnes inconnues : {', '.join(sorted(unknown))}")
+        clauses, parameters = [], []
+        for name, value in filters.items():
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            clauses.append(f"{name} IN ({', '.join('?' * len(values))})")
+            parameters += [_to_storage_value(name, value) for value in values]
+        return (f" WHERE {' AND '.join(clauses)}" if clauses else ""), parameters
+
+    @timed("repository.count_rows")
+    def count_rows(self, filters: Optional[Dict[str, object]] = None) -> int:
+        where, parameters = self._where_clause(filters or {})
+        with self._lock:
+            self.flush()
+            return self.connection.execute(f"SELECT COUNT(*) FROM vehicles{where}", parameters).fetchone()[0]
+
+    @timed("repository.iter_rows", rows=len)
+    def iter_rows(self, columns: Optional[List[str]] = None, filters: Optional[Dict[str, object]] = None,
+                  chunk_size: int = 1000, order_by: Optional[List[str]] = None) -> Iterator[List[tuple]]:
+        """
+        Lit la table par paquets de chunk_size lignes (ID puis columns, valeurs
+        telles que stockées), sans passer par le cache. Les filtres
+        {champ: valeur ou liste de valeurs} sont appliqués par SQLite, et les
+        lignes triées par order_by puis par ID.
+        Les paquets sont lus sur une connexion dédiée, en lecture seule, dans
+        une seule transaction : le parcours voit la table telle qu'elle était
+        à son début, même si des écritures ont lieu entre deux paquets, et
+        peut se faire depuis n'importe quel thread sans prendre le verrou.
+        """
+        columns = list(columns or VEHICLE_FIELDS)
+        order_by = list(order_by or [])
+        unknown = (set(columns) | set(order_by)) - set(VEHICLE_FIELDS)
+        if unknown:
+            raise ValueError(f"Colonnes inconnues : {', '.join(sorted(unknown))}")
+        where, parameters = self._where_clause(filters or {})
+        query = f"SELECT id, {', '.join(columns)} FROM vehicles{where} ORDER BY {', '.join(order_by + ['id'])}"
+
+        self.flush()
+        connection = sqlite3.connect(
+            f"{Path(os.path.abspath(self.db_path)).as_uri()}?mode=ro", uri=True, check_same_thread=False
+        )
+        try:
+            connection.execute("BEGIN")
+            cursor = connection.execute(query, parameters)
+            while True:
+                chunk = cursor.fetchmany(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+        finally:
+            connection.close()
+
+    @timed("repository.export_xlsx")
+    def export_xlsx(self, file_path: Optional[str] = None):
+        """
+        Exporte la flotte au format Excel historique (une ligne par véhicule).
+        """
+        export_vehicles(self, file_path or self.xlsx_path, "Excel")
+
+
+_shared_repositories: Dict[str, VehicleRepository] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_repository(db_path: str = "CarLogix_DATA.db", xlsx_path: Optional[str] = "CarLogix_DATA.xlsx") -> VehicleRepository:
+    """
+    Dépôt unique du processus pour db_path, partagé par toutes les sessions
+    de l'interface (une session par navigateur en mode web) : un seul cache
+    et un seul verrou d'écriture. Fermé à l'arrêt du processus.
+    """
+    key = os.path.abspath(db_path)
+    with _shared_lock:
+        repository = _shared_repositories.get(key)
+        if repository is None:
+            repository = _shared_repositories[key] = VehicleRepository(db_path, xlsx_path)
+            atexit.register(repository.close)
+        return repository
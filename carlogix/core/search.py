@@ -0,0 +1,104 @@
+"""
+Index de recherche de la barre d'application.
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List
+
+from .models import Vehicle
+
+
+# Champs couverts par la recherche de la barre d'application
+SEARCH_FIELDS = ("immatriculation", "marque", "vehicule", "utilisateur", "site")
+
+
+class VehicleSearchIndex:
+    """
+    Index de recherche par sous-chaîne sur les champs SEARCH_FIELDS.
+    Chaque mot est associé aux véhicules qui le contiennent, et chaque
+    trigramme aux mots qui le contiennent : une recherche ne parcourt que
+    les mots candidats au lieu de toute la flotte.
+    """
+
+    def __init__(self, vehicles: Iterable[Vehicle] = ()):
+        self._texts: Dict[int, str] = {}
+        self._tokens: Dict[int, set] = {}
+        self._postings: Dict[str, set] = {}
+        self._trigrams: Dict[str, set] = {}
+        for vehicle in vehicles:
+            self.add(vehicle)
+
+    @staticmethod
+    def text_of(vehicle: Vehicle) -> str:
+        return " ".join(str(getattr(vehicle, name) or "") for name in SEARCH_FIELDS).lower()
+
+    @staticmethod
+    def matches(vehicle: Vehicle, text: str) -> bool:
+        return text.lower() in VehicleSearchIndex.text_of(vehicle)
+
+    @staticmethod
+    def _trigrams_of(text: str) -> set:
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def add(self, vehicle: Vehicle):
+        text = self.text_of(vehicle)
+        tokens = set(text.split())
+        self._texts[vehicle.id] = text
+        self._tokens[vehicle.id] = tokens
+        for token in tokens:
+            ids = self._postings.get(token)
+            if ids is None:
+                ids = self._postings[token] = set()
+                for trigram in self._trigrams_of(token):
+                    self._trigrams.setdefault(trigram, set()).add(token)
+            ids.add(vehicle.id)
+
+    def remove(self, vehicle_id: int):
+        self._texts.pop(vehicle_id, None)
+        for token in self._tokens.pop(vehicle_id, ()):
+            ids = self._postings[token]
+            ids.discard(vehicle_id)
+            if not ids:
+                del self._postings[token]
+                for trigram in self._trigrams_of(token):
+                    tokens = self._trigrams[trigram]
+                    tokens.discard(token)
+                    if not tokens:
+                        del self._trigrams[trigram]
+
+    def update(self, vehicle: Vehicle):
+        self.remove(vehicle.id)
+        self.add(vehicle)
+
+    def _matching_tokens(self, term: str) -> Iterable[str]:
+        if len(term) < 3:
+            return [token for token in self._postings if term in token]
+        candidates = sorted((self._trigrams.get(trigram, set()) for trigram in self._trigrams_of(term)), key=len)
+        tokens = set.intersection(*candidates) if candidates[0] else set()
+        return [token for token in tokens if term in token]
+
+    def search(self, text: str) -> List[int]:
+        """
+        Retourne, triés, les ID des véhicules dont les champs recherchés
+        contiennent text (même sémantique que l'ancienne recherche linéaire).
+        """
+        query = text.lower()
+        terms = query.split()
+        if not terms:
+            # Requête vide ou faite d'espaces : sous-chaîne cherchée telle quelle
+            # (plusieurs espaces ne se trouvent qu'autour d'un champ vide)
+            return sorted(vehicle_id for vehicle_id, text in self._texts.items() if query in text)
+
+        result = None
+        for term in terms:
+            ids = set()
+            for token in self._matching_tokens(term):
+                ids |= self._postings[token]
+            result = ids if result is None else result & ids
+            if not result:
+                return []
+
+        if len(terms) > 1 or query != terms[0]:
+            # Requête à plusieurs mots : vérifier la sous-chaîne complète
+            result = [vehicle_id for vehicle_id in result if query in self._texts[vehicle_id]]
+        return sorted(result)
@@ -0,0 +1,74 @@
+"""
+Statistiques du tableau de bord.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+from .alerts import FleetAlerts
+from .columns import FleetColumns
+from .metrics import timed
+from .odometer import FleetProjection, project_fleet
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Colonnes lues par le tableau de bord
+SNAPSHOT_COLUMNS = ("marque", "carburant", "societe_proprietaire", "site", "releve_kms")
+
+
+@dataclass
+class FleetSnapshot:
+    """
+    Statistiques du tableau de bord, calculées une fois par version de la flotte.
+    """
+    version: int
+    total_vehicles: int
+    total_kms: int
+    avg_kms: float
+    avg_monthly_kms: float
+    marque_distribution: pd.Series
+    carburant_distribution: pd.Series
+    societe_distribution: pd.Series
+    site_distribution: pd.Series
+    maintenance_count: int
+    ct_count: int
+
+
+def _distribution(column: pd.Series, normalize: bool) -> pd.Series:
+    # Les catégories sans véhicule (valeurs modifiées ou supprimées) sont ignorées
+    counts = column.value_counts()
+    counts = counts[counts > 0]
+    return counts / counts.sum() * 100 if normalize else counts
+
+
+@timed("stats.compute_fleet_snapshot", rows=lambda snapshot: snapshot.total_vehicles)
+def compute_fleet_snapshot(fleet: FleetColumns, alerts: FleetAlerts, version: int,
+                           projection: Optional[FleetProjection] = None) -> FleetSnapshot:
+    """
+    Tire toutes les statistiques d'un DataFrame construit sans copie sur les
+    colonnes de la flotte (catégories + relevés km). Le kilométrage mensuel
+    est la moyenne des rythmes de projection (sans historique des relevés :
+    rythmes depuis la mise en service).
+    """
+    projection = projection if projection is not None else project_fleet(fleet)
+    frame = fleet.to_frame(SNAPSHOT_COLUMNS)
+
+    total_kms = int(frame["releve_kms"].sum())
+    avg_kms = float(frame["releve_kms"].mean()) if frame["releve_kms"].notna().any() else 0.0
+
+    return FleetSnapshot(
+        version=version,
+        total_vehicles=len(frame),
+        total_kms=total_kms,
+        avg_kms=avg_kms,
+        avg_monthly_kms=projection.avg_monthly_kms,
+        marque_distribution=_distribution(frame["marque"], normalize=True),
+        carburant_distribution=_distribution(frame["carburant"], normalize=True),
+        societe_distribution=_distribution(frame["societe_proprietaire"], normalize=True),
+        site_distribution=_distribution(frame["site"], normalize=False),
+        maintenance_count=alerts.maintenance_count,
+        ct_count=alerts.ct_count,
+    )
@@ -0,0 +1,269 @@
+"""
+Ingestion des relevés kilométriques de la télématique (exports CSV
+quotidiens : plusieurs millions de lignes, plusieurs relevés par véhicule).
+
+Le fichier est lu par paquets, chaque ligne rattachée à son véhicule par
+l'immatriculation (index des plaques de la flotte) ; seul le dernier relevé
+de chaque véhicule est conservé, à condition que le compteur n'ait pas
+reculé (relevés ordonnés à la seconde près). Les relevés retenus sont enregistrés en une seule écriture
+(VehicleRepository.apply_odometer_readings). La mémoire utilisée dépend de
+la taille des paquets et de la flotte, pas de celle du fichier.
+
+En ligne de commande : python -m carlogix releves flux.csv (voir carlogix/__main__.py).
+"""
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .alerts import _kms_column
+from .metrics import METRICS
+from .odometer import OdometerReading
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from .columns import FleetColumns
+    from .repository import VehicleRepository
+
+
+FEED_CHUNK_SIZE = 500000
+# Exemples conservés dans le rapport (plaques inconnues, reculs du compteur)
+REPORT_SAMPLE_SIZE = 20
+
+# En-têtes acceptés (sans tenir compte de la casse) pour chaque colonne du flux
+FEED_HEADERS = {
+    "immatriculation": ("immatriculation", "plaque", "plate", "license_plate"),
+    "date": ("date", "date_releve", "horodatage", "timestamp", "datetime"),
+    "kms": ("kms", "releve_kms", "kilometrage", "kilométrage", "odometer", "mileage"),
+}
+
+# Kilométrage plus grand : valeur aberrante, ligne rejetée
+MAX_KMS = 10 ** 8
+_EPOCH = date(1970, 1, 1)
+_DAY_SECONDS = 86400
+# Horodatage illisible, ou dernier relevé d'un véhicule sans historique (NaT)
+_NO_TIME = np.iinfo(np.int64).min
+# Dates au format français, essayées quand l'horodatage n'est pas ISO 8601
+_FRENCH_FORMATS = ("%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%Y")
+# Clé du maximum glissant par véhicule : position << _KMS_BITS | kms
+_KMS_BITS = 32
+
+
+@dataclass
+class IngestReport:
+    # Lignes lues, hors en-tête
+    rows: int = 0
+    # Relevés enregistrés (au plus un par véhicule)
+    applied: int = 0
+    # Plaque, date ou kilométrage absent ou illisible
+    invalid_rows: int = 0
+    # Plaque absente de la flotte (ou portée par plusieurs véhicules)
+    unknown_rows: int = 0
+    # Kilométrage inférieur à un relevé antérieur du même véhicule
+    rollback_rows: int = 0
+    # Relevés déjà connus, dépassés par un relevé plus récent ou sans changement du compteur
+    ignored_rows: int = 0
+    unknown_plates: List[str] = field(default_factory=list)
+    # (immatriculation, date, kms du relevé, dernier kms retenu pour le véhicule)
+    rollbacks: List[Tuple[str, date, int, int]] = field(default_factory=list)
+
+
+def _normalize_plates(plates: pd.Series) -> pd.Series:
+    # AB-123-CD, ab 123 cd et AB123CD désignent le même véhicule
+    return plates.astype(str).str.upper().str.replace(r"[^0-9A-Z]", "", regex=True)
+
+
+def _plate_index(fleet: FleetColumns) -> pd.Series:
+    """
+    Positions dans fleet, indexées par plaque normalisée. Une plaque portée par
+    plusieurs véhicules n'est pas indexée : ses relevés seraient ambigus.
+    """
+    import pandas as pd
+
+    plates = _normalize_plates(pd.Series(fleet.column("immatriculation"), dtype=object).fillna(""))
+    positions = np.flatnonzero(~plates.duplicated(keep=False).to_numpy() & (plates != "").to_numpy())
+    return pd.Series(positions, index=pd.Index(plates.to_numpy()[positions]))
+
+
+def _feed_columns(file_path: str, delimiter: Optional[str]) -> Tuple[str, List[str]]:
+    """
+    Séparateur et en-têtes du fichier (immatriculation, date, kms), tels qu'écrits.
+    """
+    with open(file_path, newline="", encoding="utf-8-sig") as source:
+        sample = source.read(4096)
+    if delimiter is None:
+        try:
+            delimiter = csv.Sniffer().sniff(sample, delimiters=",;\t").delimiter
+        except csv.Error:
+            delimiter = ","
+    header = next(csv.reader(sample.splitlines()[:1], delimiter=delimiter), [])
+    names = {value.strip().lower(): value for value in header}
+    columns, missing = [], []
+    for name, aliases in FEED_HEADERS.items():
+        found = next((names[alias] for alias in aliases if alias in names), None)
+        if found is None:
+            missing.append(name)
+        columns.append(found)
+    if missing:
+        raise ValueError(f"Colonnes manquantes : {', '.join(missing)}")
+    return delimiter, columns
+
+
+def _parse_times(values: pd.Series) -> np.ndarray:
+    """
+    Secondes depuis 1970 (UTC) de chaque horodatage : ISO 8601 (avec ou sans
+    heure et fuseau) ou JJ/MM/AAAA [HH:MM[:SS]]. _NO_TIME si illisible.
+    """
+    import pandas as pd
+
+    times = pd.to_datetime(values, format="ISO8601", errors="coerce", utc=True)
+    for date_format in _FRENCH_FORMATS:
+        unparsed = times.isna() & values.notna()
+        if not unparsed.any():
+            break
+        times[unparsed] = pd.to_datetime(values[unparsed], format=date_format, errors="coerce", utc=True)
+    # NaT converti en entier : _NO_TIME
+    return times.dt.tz_convert(None).to_numpy().astype("datetime64[s]").astype(np.int64)
+
+
+def _read_feed(file_path: str, chunk_size: int, delimiter: Optional[str]) -> Iterator[pd.DataFrame]:
+    import pandas as pd
+
+    delimiter, (plate, day, kms) = _feed_columns(file_path, delimiter)
+    chunks = pd.read_csv(
+        file_path, sep=delimiter, usecols=[plate, day, kms], dtype={plate: str, day: str},
+        encoding="utf-8-sig", chunksize=chunk_size, skipinitialspace=True,
+    )
+    for chunk in chunks:
+        yield chunk.rename(columns={plate: "immatriculation", day: "date", kms: "kms"})
+
+
+class _Frontier:
+    """
+    Dernier relevé retenu de chaque véhicule de la flotte (horodatage, kms),
+    dans l'ordre de ses positions : 17 octets par véhicule, quelle que soit
+    la taille du flux.
+    """
+
+    def __init__(self, fleet: FleetColumns, history_latest: Tuple[np.ndarray, np.ndarray, np.ndarray]):
+        # Point de départ : kilométrage actuel, daté du début du jour du dernier relevé connu
+        self.kms = _kms_column(fleet, "releve_kms").astype(np.int64)
+        self.times = np.full(len(fleet), _NO_TIME, dtype=np.int64)
+        vehicle_ids, days, _ = history_latest
+        positions = np.searchsorted(fleet.ids, vehicle_ids)
+        known = positions < len(fleet)
+        known[known] = fleet.ids[positions[known]] == vehicle_ids[known]
+        self.times[positions[known]] = days[known] * _DAY_SECONDS
+        # Véhicules dont un relevé du flux a été retenu (horodatage précis)
+        self.changed = np.zeros(len(fleet), dtype=bool)
+
+    def advance(self, positions: np.ndarray, times: np.ndarray, kms: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Ajoute des relevés valides, dans n'importe quel ordre. Retourne les
+        masques (retenus, reculs) des relevés, dans l'ordre reçu.
+        """
+        order = np.lexsort((kms, times, positions))
+        positions, times, kms = positions[order], times[order], kms[order]
+        known_times, known_kms = self.times[positions], self.kms[positions]
+        # Relevé connu par l'historique : daté au jour près, un relevé du même
+        # jour n'est plus récent que s'il est plus élevé (jamais un recul)
+        precise = self.changed[positions]
+        newer = (times > known_times) & (precise | (times >= known_times + _DAY_SECONDS) | (kms > known_kms))
+        newer |= (times == known_times) & (kms > known_kms)
+        # Relevé antérieur au dernier retenu mais plus élevé : c'est le compteur qui a reculé depuis
+        rollback = ~newer & (times < known_times) & (kms > known_kms)
+
+        # Maximum des relevés plus récents qui précèdent, par véhicule (au moins known_kms)
+        keys = np.where(newer, (positions << _KMS_BITS) | kms, -1)
+        running = np.maximum.accumulate(keys)
+        previous = np.r_[-1, running[:-1]]
+        same_vehicle = (previous >= 0) & ((previous >> _KMS_BITS) == positions)
+        highest = np.maximum(np.where(same_vehicle, previous & ((1 << _KMS_BITS) - 1), 0), known_kms)
+        rollback |= newer & (kms < highest)
+        # Compteur inchangé : rien à enregistrer, comme pour une saisie
+        accepted = newer & (kms > highest)
+
+        # Le dernier relevé retenu de chaque véhicule devient son relevé connu
+        kept = np.flatnonzero(accepted)
+        last = kept[np.r_[positions[kept][1:] != positions[kept][:-1], True]] if len(kept) else kept
+        self.times[positions[last]] = times[last]
+        self.kms[positions[last]] = kms[last]
+        self.changed[positions[last]] = True
+        inverse = np.empty_like(order)
+        inverse[order] = np.arange(len(order))
+        return accepted[inverse], rollback[inverse]
+
+
+def _ingest_chunk(chunk: pd.DataFrame, plates: pd.Series, frontier: _Frontier, report: IngestReport):
+    import pandas as pd
+
+    report.rows += len(chunk)
+    plate_codes, plate_uniques = chunk["immatriculation"].factorize()
+    fleet_positions = plates.reindex(_normalize_plates(pd.Series(plate_uniques, dtype=object))).to_numpy()
+    # Code -1 (plaque absente) : NaN, comme une plaque inconnue
+    positions = np.r_[fleet_positions, np.nan][plate_codes]
+    times = _parse_times(chunk["date"])
+    kms = pd.to_numeric(chunk["kms"], errors="coerce").to_numpy(dtype=np.float64)
+
+    valid = (plate_codes >= 0) & (times != _NO_TIME) & (kms >= 0) & (kms < MAX_KMS) & (kms == np.floor(kms))
+    known = valid & ~np.isnan(positions)
+    report.invalid_rows += int(np.count_nonzero(~valid))
+    report.unknown_rows += int(np.count_nonzero(valid & ~known))
+    if len(report.unknown_plates) < REPORT_SAMPLE_SIZE and not known.all():
+        unknown = pd.unique(chunk["immatriculation"].to_numpy()[valid & ~known])
+        for plate in unknown[:REPORT_SAMPLE_SIZE - len(report.unknown_plates)]:
+            if plate not in report.unknown_plates:
+                report.unknown_plates.append(plate)
+
+    rows = np.flatnonzero(known)
+    accepted, rollback = frontier.advance(
+        positions[rows].astype(np.int64), times[rows], kms[rows].astype(np.int64)
+    )
+    report.rollback_rows += int(np.count_nonzero(rollback))
+    report.ignored_rows += int(np.count_nonzero(~accepted & ~rollback))
+    if len(report.rollbacks) < REPORT_SAMPLE_SIZE:
+        for row in rows[rollback][:REPORT_SAMPLE_SIZE - len(report.rollbacks)]:
+            position = int(positions[row])
+            report.rollbacks.append((
+                chunk["immatriculation"].iat[row], _EPOCH + timedelta(days=int(times[row]) // _DAY_SECONDS),
+                int(kms[row]), int(frontier.kms[position]),
+            ))
+
+
+def ingest_odometer_feed(repository: VehicleRepository, file_path: str, chunk_size: int = FEED_CHUNK_SIZE,
+                         delimiter: Optional[str] = None, dry_run: bool = False) -> IngestReport:
+    """
+    Ingère un flux CSV de relevés (immatriculation, date, kms) : le dernier
+    relevé de chaque véhicule, s'il est plus récent que ceux déjà connus et
+    que le compteur n'a pas reculé, devient son releve_kms et est ajouté à
+    son historique. Toutes les écritures sont faites en une transaction ;
+    dry_run n'écrit rien (applied = relevés qui seraient enregistrés).
+    """
+    with METRICS.measure("telematics.ingest_odometer_feed") as timer:
+        # Tout ce qui sert après la lecture du flux est copié maintenant : les
+        # écritures faites pendant la lecture ne décalent ni IDs ni positions
+        fleet = repository.fleet_columns()
+        vehicle_ids = fleet.ids.copy()
+        frontier = _Frontier(fleet, repository.latest_odometer_readings())
+        plates = _plate_index(fleet)
+        del fleet
+        report = IngestReport()
+        for chunk in _read_feed(file_path, chunk_size, delimiter):
+            _ingest_chunk(chunk, plates, frontier, report)
+        timer.rows = report.rows
+
+        positions = np.flatnonzero(frontier.changed)
+        if dry_run:
+            report.applied = len(positions)
+            return report
+        ids, days, kms = vehicle_ids[positions], frontier.times[positions] // _DAY_SECONDS, frontier.kms[positions]
+        report.applied = repository.apply_odometer_readings(
+            OdometerReading(int(vehicle_id), _EPOCH + timedelta(days=int(day)), int(value))
+            for vehicle_id, day, value in zip(ids, days, kms)
+        )
+        return report
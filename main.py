@@ -1,3 +1,4 @@
+import multiprocessing
 import flet as ft
 from CarLogix import main
 
@@ -5,4 +6,5 @@ def main_app():
     ft.app(target=main)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main_app()
@@ -0,0 +1,28 @@
+"""
+Fixtures communes : une petite flotte synthétique (benchmarks/synthetic_fleet.py)
+dans une base temporaire, et le dépôt ouvert dessus.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "benchmarks")]
+
+from carlogix.core import VehicleRepository
+from synthetic_fleet import make_database
+
+FLEET_SIZE = 50
+
+
+@pytest.fixture
+def fleet_db(tmp_path) -> str:
+    return make_database(FLEET_SIZE, str(tmp_path))
+
+
+@pytest.fixture
+def repository(fleet_db):
+    repository = VehicleRepository(db_path=fleet_db, xlsx_path=None)
+    yield repository
+    repository.close()
@@ -0,0 +1,28 @@
+"""
+Fonctions communes aux tests : véhicules modifiés ou ajoutés à partir d'un
+véhicule de la flotte, et lecture directe de la base.
+"""
+import sqlite3
+from contextlib import closing
+from dataclasses import asdict
+
+from carlogix.core import VehicleModel
+
+
+def edited(vehicle, **changes) -> VehicleModel:
+    values = asdict(vehicle)
+    values.update(changes)
+    return VehicleModel(**values)
+
+
+def new_vehicle(template, immatriculation: str) -> VehicleModel:
+    values = asdict(template)
+    del values["id"], values["row_version"]
+    values["immatriculation"] = immatriculation
+    return VehicleModel(**values)
+
+
+def stored_count(db_path: str, query: str, *parameters) -> int:
+    # Lu sur une autre connexion : ce qui est réellement enregistré dans la base
+    with closing(sqlite3.connect(db_path)) as connection:
+        return connection.execute(query, parameters).fetchone()[0]
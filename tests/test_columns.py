@@ -0,0 +1,65 @@
+"""
+Stockage en colonnes de la flotte : ajouts au-delà de la capacité, codes
+catégoriels élargis, suppressions et copie sur écriture des snapshots.
+"""
+from dataclasses import replace
+
+import numpy as np
+
+from carlogix.core.columns import FleetColumns
+
+
+def test_put_grows_and_keeps_rows_sorted(repository):
+    fleet = repository.fetch_all_vehicles()
+    store = FleetColumns.from_vehicles(fleet[:3])
+    for vehicle in reversed(fleet[3:]):
+        store.put(vehicle)
+
+    assert len(store) == len(fleet)
+    assert list(store.ids) == sorted(vehicle.id for vehicle in fleet)
+    assert list(store.values()) == sorted(fleet, key=lambda vehicle: vehicle.id)
+
+
+def test_put_widens_category_codes_without_losing_values(repository):
+    vehicle = repository.get_vehicle(1)
+    store = FleetColumns.from_vehicles([vehicle])
+    # 130 marques distinctes : les codes passent de int8 à int16 en cours de route
+    added = [replace(vehicle, id=1000 + index, marque=f"Marque {index}") for index in range(130)]
+    for new in added:
+        store.put(new)
+
+    assert store.column("marque").dtype == np.int16
+    assert [store.get(new.id).marque for new in added] == [new.marque for new in added]
+    assert store.get(vehicle.id) == vehicle
+    # Remplacement d'une ligne existante par une nouvelle catégorie
+    store.put(replace(vehicle, marque="Marque 130"))
+    assert store.get(vehicle.id).marque == "Marque 130"
+
+
+def test_remove(repository):
+    fleet = repository.fetch_all_vehicles()
+    store = FleetColumns.from_vehicles(fleet)
+
+    assert store.remove(fleet[10].id)
+    assert not store.remove(fleet[10].id)
+    assert fleet[10].id not in store
+    assert list(store.values()) == fleet[:10] + fleet[11:]
+
+
+def test_snapshot_is_not_modified_by_later_writes(repository):
+    fleet = repository.fetch_all_vehicles()
+    store = FleetColumns.from_vehicles(fleet)
+    snapshot = store.snapshot()
+
+    store.put(replace(fleet[0], marque="Nouvelle marque", releve_kms=1))
+    store.remove(fleet[1].id)
+    store.put(replace(fleet[0], id=10_000))
+
+    assert list(snapshot.values()) == fleet
+    assert store.get(fleet[0].id).marque == "Nouvelle marque"
+    assert len(store) == len(fleet)
+    # Un second snapshot partage à nouveau les tableaux, le premier reste intact
+    second = store.snapshot()
+    store.remove(10_000)
+    assert 10_000 in second and 10_000 not in store
+    assert list(snapshot.values()) == fleet
@@ -0,0 +1,124 @@
+"""
+Index des échéances : recherches par intervalle comparées à un parcours de
+la flotte, candidats d'alerte comparés au moteur d'alertes, et mises à jour
+véhicule par véhicule comparées à un index reconstruit.
+"""
+from dataclasses import replace
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from carlogix.core import AlertThresholds, compute_fleet_alerts
+from carlogix.core.columns import FleetColumns
+from carlogix.core.deadlines import (
+    DEADLINE_CT, DEADLINE_KINDS, DEADLINE_REVISION, DEADLINE_REVISION_KMS, DeadlineIndex,
+)
+from carlogix.core.odometer import OdometerHistory, project_vehicle
+from synthetic_fleet import generate_fleet, generate_odometer_readings
+
+SIZE = 500
+TODAY = date(2026, 3, 2)
+
+
+@pytest.fixture(scope="module")
+def vehicles():
+    return list(generate_fleet(SIZE, reference=TODAY))
+
+
+@pytest.fixture(scope="module")
+def history():
+    history = OdometerHistory()
+    for reading in generate_odometer_readings(SIZE, reference=TODAY, months=6):
+        history.add(reading.vehicle_id, reading.date, reading.kms)
+    return history
+
+
+def due_date(vehicle, kind, history, interval=365):
+    if kind == DEADLINE_CT:
+        return vehicle.prochain_ct
+    if vehicle.date_derniere_revision is None:
+        return None
+    if kind == DEADLINE_REVISION:
+        return vehicle.date_derniere_revision + timedelta(days=interval)
+    return project_vehicle(vehicle, history)[1]
+
+
+def scan(vehicles, kind, history, since=None, until=None):
+    # Parcours de la flotte : ce que l'index doit trouver, dans le même ordre
+    found = []
+    for vehicle in vehicles:
+        due = due_date(vehicle, kind, history)
+        if due is not None and (since is None or due >= since) and (until is None or due <= until):
+            found.append((due, vehicle.id))
+    return [vehicle_id for _, vehicle_id in sorted(found)]
+
+
+def contents(index):
+    return ({kind: index.due_between(kind, None, None) for kind in DEADLINE_KINDS},
+            index.kms_remaining_at_most(10 ** 9))
+
+
+@pytest.mark.parametrize("kind", DEADLINE_KINDS)
+def test_range_queries_match_a_scan(vehicles, history, kind):
+    index = DeadlineIndex(FleetColumns.from_vehicles(vehicles), history=history)
+
+    assert index.due_between(kind, None, None) == scan(vehicles, kind, history)
+    assert index.due_within(kind, 30, TODAY) == scan(vehicles, kind, history, TODAY, TODAY + timedelta(days=30))
+    assert index.overdue(kind, TODAY) == scan(vehicles, kind, history, until=TODAY - timedelta(days=1))
+
+
+def test_next_deadlines_are_the_earliest_from_today(vehicles, history):
+    index = DeadlineIndex(FleetColumns.from_vehicles(vehicles), history=history)
+
+    deadlines = index.next_deadlines(20, TODAY)
+
+    upcoming = sorted(
+        (due, kind, vehicle.id) for vehicle in vehicles for kind in DEADLINE_KINDS
+        for due in [due_date(vehicle, kind, history)] if due is not None and due >= TODAY
+    )
+    assert [(deadline.due, deadline.kind, deadline.vehicle_id) for deadline in deadlines] == upcoming[:20]
+
+
+@pytest.mark.parametrize("offset", [0, 90, 400])
+def test_alert_candidates_give_the_alerts_of_the_whole_fleet(vehicles, history, offset):
+    fleet = FleetColumns.from_vehicles(vehicles)
+    index = DeadlineIndex(fleet, history=history)
+    thresholds = AlertThresholds()
+    today = TODAY + timedelta(days=offset)
+
+    alerts = compute_fleet_alerts(fleet, thresholds, today)
+    maintenance = compute_fleet_alerts(fleet.take(index.maintenance_candidates(thresholds, today)), thresholds, today)
+    ct = compute_fleet_alerts(fleet.take(index.ct_candidates(thresholds, today)), thresholds, today)
+
+    assert alerts.maintenance_count and alerts.ct_count
+    assert list(maintenance.ids[maintenance.maintenance_rows()]) == list(alerts.ids[alerts.maintenance_rows()])
+    assert list(maintenance.maintenance_severity[maintenance.maintenance_rows()]) == \
+        list(alerts.maintenance_severity[alerts.maintenance_rows()])
+    # Les candidats au contrôle technique sont exactement les véhicules en alerte
+    assert list(ct.ids) == list(alerts.ids[alerts.ct_rows()])
+    assert np.all(ct.ct_severity == alerts.ct_severity[alerts.ct_rows()])
+
+
+def test_incremental_updates_match_a_rebuilt_index(vehicles, history):
+    index = DeadlineIndex(FleetColumns.from_vehicles(vehicles[:-10]), history=history)
+    for vehicle in vehicles[-10:]:
+        index.add(vehicle)
+    current = {vehicle.id: vehicle for vehicle in vehicles}
+    for vehicle in vehicles[:40:4]:
+        changed = replace(vehicle, prochain_ct=TODAY + timedelta(days=vehicle.id), releve_kms=vehicle.releve_kms + 5000)
+        index.update(vehicle, changed)
+        current[vehicle.id] = changed
+    for vehicle in vehicles[1:40:4]:
+        index.remove(vehicle)
+        del current[vehicle.id]
+    # Date de révision effacée : le véhicule ne garde que son échéance de contrôle technique
+    cleared = replace(current[3], date_derniere_revision=None)
+    index.update(current[3], cleared)
+    current[3] = cleared
+
+    rebuilt = DeadlineIndex(FleetColumns.from_vehicles(list(current.values())), history=history)
+    assert contents(index) == contents(rebuilt)
+    assert 3 in index.due_between(DEADLINE_CT, None, None)
+    assert 3 not in index.due_between(DEADLINE_REVISION, None, None)
+    assert 3 not in index.due_between(DEADLINE_REVISION_KMS, None, None)
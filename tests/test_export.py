@@ -0,0 +1,81 @@
+"""
+Lecture par paquets des exports (iter_rows), écriture atomique des fichiers,
+rapport PDF rendu en parallèle et exports en arrière-plan.
+"""
+import os
+import threading
+
+from pypdf import PdfReader
+
+from carlogix.core import ExportWorker, PdfReportOptions, export_vehicles
+from carlogix.core import export
+from carlogix.core.export import EXPORT_DONE, _atomic_output
+from helpers import edited
+
+
+def test_iter_rows_reads_the_table_as_it_was_when_iteration_started(repository):
+    chunks = repository.iter_rows(["immatriculation"], chunk_size=10)
+    first = next(chunks)
+    repository.delete_vehicle(45)
+    repository.update_vehicle(edited(repository.get_vehicle(40), immatriculation="ZZ-040-ZZ"))
+    rows = first + [row for chunk in chunks for row in chunk]
+
+    assert [row[0] for row in rows] == list(range(1, 51))
+    assert "ZZ-040-ZZ" not in {row[1] for row in rows}
+    assert sum(len(chunk) for chunk in repository.iter_rows()) == 49
+
+
+def test_concurrent_outputs_to_the_same_file_use_separate_temp_files(tmp_path):
+    target = str(tmp_path / "export.csv")
+    with _atomic_output(target) as first:
+        with _atomic_output(target) as second:
+            assert first != second
+            for path, text in ((first, "premier"), (second, "second")):
+                with open(path, "w") as output:
+                    output.write(text)
+        with open(target) as exported:
+            assert exported.read() == "second"
+
+    with open(target) as exported:
+        assert exported.read() == "premier"
+    assert os.listdir(tmp_path) == ["export.csv"]
+
+
+def test_worker_counts_rows_in_the_export_thread(repository, tmp_path):
+    worker = ExportWorker(max_workers=1)
+    reported, done = [], threading.Event()
+    try:
+        job = worker.submit(
+            repository, str(tmp_path / "export.csv"), "CSV", filters={"site": repository.get_vehicle(1).site},
+            on_progress=lambda job: reported.append((job.written, job.total, threading.current_thread())),
+            on_done=lambda job: done.set(),
+        )
+        assert done.wait(10)
+    finally:
+        worker.shutdown()
+
+    expected = sum(len(chunk) for chunk in repository.iter_rows(filters={"site": repository.get_vehicle(1).site}))
+    assert job.status == EXPORT_DONE
+    assert reported[0][:2] == (0, expected)
+    assert reported[-1][:2] == (expected, expected) and job.progress == 1.0
+    assert threading.current_thread() not in {thread for _, _, thread in reported}
+
+
+def test_parallel_pdf_report_merges_parts_in_order(repository, tmp_path, monkeypatch):
+    # 50 véhicules en parties de 4 lignes : 13 parties pour 2 processus,
+    # soit plusieurs fois la fenêtre de parties en cours de rendu
+    monkeypatch.setattr(export, "PDF_ROWS_PER_PART", 4)
+    monkeypatch.setattr(export, "PDF_PARALLEL_MIN_ROWS", 4)
+    monkeypatch.setattr(export.os, "cpu_count", lambda: 2)
+    directory = tmp_path / "exports"
+    directory.mkdir()
+    file_path = str(directory / "rapport.pdf")
+
+    written = export_vehicles(repository, file_path, "PDF", ["immatriculation"],
+                              pdf_options=PdfReportOptions(max_workers=2))
+
+    pages = PdfReader(file_path).pages
+    assert written == 50 and len(pages) == 13
+    plates = [repository.get_vehicle(vehicle_id).immatriculation for vehicle_id in (1, 49)]
+    assert plates[0] in pages[0].extract_text() and plates[1] in pages[-1].extract_text()
+    assert os.listdir(directory) == ["rapport.pdf"]
@@ -0,0 +1,25 @@
+"""
+Point d'accès Prometheus : un seul serveur par processus, démarré à la demande.
+"""
+from urllib.request import urlopen
+
+from carlogix.core import metrics
+
+
+def test_shared_server_is_started_once_and_serves_metrics(monkeypatch):
+    monkeypatch.setattr(metrics, "_shared_metrics_server", None)
+    registry = metrics.MetricsRegistry(enabled=True)
+    monkeypatch.setattr(metrics, "METRICS", registry)
+    registry.observe("test.operation", 0.002, rows=3)
+
+    server = metrics.shared_metrics_server(0)
+    try:
+        assert metrics.shared_metrics_server(0) is server
+        host, port = server.server_address[:2]
+        with urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+            body = response.read().decode("utf-8")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert 'carlogix_operation_rows_total{operation="test.operation"} 3' in body
@@ -0,0 +1,105 @@
+"""
+Migrations : classeur XLSX historique vers SQLite au premier démarrage, et
+bases des schémas précédents vers le schéma courant.
+"""
+import os
+import sqlite3
+from datetime import date
+
+import pytest
+
+from carlogix.core import SCHEMA_VERSION, VEHICLE_FIELDS, VehicleRepository, export_vehicles
+from helpers import edited, new_vehicle
+
+
+def test_xlsx_migration_renumbers_colliding_ids(tmp_path):
+    import openpyxl
+    from synthetic_fleet import write_database
+
+    source = VehicleRepository(db_path=write_database(4, str(tmp_path / "source.db")), xlsx_path=None)
+    xlsx_path = str(tmp_path / "CarLogix_DATA.xlsx")
+    export_vehicles(source, xlsx_path, "Excel")
+    source.close()
+    workbook = openpyxl.load_workbook(xlsx_path)
+    for row, vehicle_id in zip(range(2, 6), (1, 3, 3, None)):
+        workbook.active.cell(row, 1).value = vehicle_id
+    workbook.save(xlsx_path)
+
+    db_path = str(tmp_path / "migrated.db")
+    migrated = VehicleRepository(db_path=db_path, xlsx_path=xlsx_path)
+    try:
+        # ID conservés quand c'est possible, nouveaux ID après les ID conservés sinon
+        assert [vehicle.id for vehicle in migrated.fetch_all_vehicles()] == [1, 3, 4, 5]
+    finally:
+        migrated.close()
+    assert not os.path.exists(f"{db_path}.migration")
+
+
+def test_failed_xlsx_migration_leaves_no_database(tmp_path):
+    xlsx_path = tmp_path / "CarLogix_DATA.xlsx"
+    xlsx_path.write_text("pas un classeur")
+    db_path = str(tmp_path / "CarLogix_DATA.db")
+
+    with pytest.raises(Exception):
+        VehicleRepository(db_path=db_path, xlsx_path=str(xlsx_path))
+    # Au prochain démarrage, la migration est retentée au lieu d'ouvrir une base vide
+    assert not os.path.exists(db_path)
+    assert not os.path.exists(f"{db_path}.migration")
+
+
+def write_v1_database(db_path: str):
+    # Schéma 1 : tout en texte, dates JJ/MM/AAAA, sans row_version ni historique
+    connection = sqlite3.connect(db_path)
+    connection.execute(
+        f"CREATE TABLE vehicles (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        f"{', '.join(f'{name} TEXT' for name in VEHICLE_FIELDS)})"
+    )
+    row = dict(
+        immatriculation="AB-123-CD", code_carte="1234", societe_proprietaire="JIVAGO", site="ELAN",
+        utilisateur="Camille MICHEL", marque="FORD", vehicule="Fiesta", modele="1.0 EcoBoost 100",
+        date_mise_en_service="15/03/2021", crit_air="1", carburant="Essence", type_huile="5W30",
+        fluide_dispo="Oui", releve_kms="45000", date_derniere_revision="01/02/2024", derniere_revision="40000",
+        periodicite_revision="20000", prochain_ct="15/03/2025", double_clef="Oui", numero_scelle="845655",
+        statut="En service",
+    )
+    rows = [row, dict(row, immatriculation="EF-456-GH", date_mise_en_service="pas de date")]
+    for vehicle_id, row in zip((3, 7), rows):
+        names = ["id"] + list(row)
+        connection.execute(
+            f"INSERT INTO vehicles ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+            [vehicle_id] + list(row.values()),
+        )
+    # Véhicule 9 supprimé : son ID ne doit jamais être réattribué
+    connection.execute("UPDATE sqlite_sequence SET seq = 9 WHERE name = 'vehicles'")
+    connection.commit()
+    connection.close()
+
+
+def test_v1_database_is_migrated_to_current_schema(tmp_path):
+    db_path = str(tmp_path / "v1.db")
+    write_v1_database(db_path)
+
+    repository = VehicleRepository(db_path=db_path, xlsx_path=None)
+    try:
+        assert repository.connection.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        vehicle = repository.get_vehicle(3)
+        assert vehicle.date_mise_en_service == date(2021, 3, 15)
+        assert vehicle.prochain_ct == date(2025, 3, 15)
+        assert (vehicle.releve_kms, vehicle.derniere_revision, vehicle.periodicite_revision) == (45000, 40000, 20000)
+        assert vehicle.row_version == 1
+
+        # Cellules illisibles : None dans le véhicule, signalées par le rapport de qualité
+        unreadable = repository.get_vehicle(7)
+        assert unreadable.date_mise_en_service is None
+        assert {(issue.vehicle_id, issue.field) for issue in repository.data_quality_report()} >= {
+            (7, "date_mise_en_service"),
+        }
+
+        # Historique des relevés (schéma 4) : vide à la migration, alimenté par les écritures
+        assert repository.odometer_readings(3) == []
+        repository.update_vehicle(edited(vehicle, releve_kms=46000))
+        assert [reading.kms for reading in repository.odometer_readings(3)] == [46000]
+
+        assert repository.add_vehicle(new_vehicle(vehicle, "IJ-789-KL")) == 10
+    finally:
+        repository.close()
@@ -0,0 +1,112 @@
+"""
+Historique des relevés kilométriques et projection du rythme de roulage :
+fenêtre de calcul du rythme, durée minimale couverte, repli sur le rythme
+depuis la mise en service.
+"""
+from dataclasses import replace
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from carlogix.core.columns import FleetColumns
+from carlogix.core.odometer import (
+    MIN_RATE_SPAN_DAYS, RATE_WINDOW_DAYS, OdometerHistory, project_fleet, project_vehicle,
+)
+from synthetic_fleet import generate_fleet
+
+TODAY = date(2026, 3, 2)
+
+
+@pytest.fixture
+def vehicle():
+    # Mis en service il y a 1000 jours avec 20 000 km : 20 km/jour depuis la mise en service
+    return replace(
+        next(generate_fleet(1, reference=TODAY)),
+        date_mise_en_service=TODAY - timedelta(days=1000), releve_kms=20000,
+        date_derniere_revision=TODAY - timedelta(days=100), derniere_revision=18000, periodicite_revision=15000,
+    )
+
+
+def history_of(vehicle_id, readings):
+    history = OdometerHistory()
+    for days_ago, kms in readings:
+        history.add(vehicle_id, TODAY - timedelta(days=days_ago), kms)
+    return history
+
+
+def projections(vehicle, history):
+    # Même véhicule projeté seul et avec toute la flotte : les deux doivent concorder
+    fleet = project_fleet(FleetColumns.from_vehicles([vehicle]), history)
+    rate, revision_kms = fleet.row(0)[0], fleet.revision_kms_date[0]
+    return (rate, None if np.isnat(revision_kms) else revision_kms.astype(date)), project_vehicle(vehicle, history)
+
+
+def test_history_keeps_readings_sorted_and_removes_a_vehicle():
+    history = history_of(2, [(10, 500), (30, 100), (20, 300)])
+    history.add(1, TODAY, 50)
+
+    assert [reading.kms for reading in history.readings(2)] == [100, 300, 500]
+    ids, days, kms = history.latest()
+    assert list(ids) == [1, 2] and list(kms) == [50, 500]
+    history.remove_vehicle(2)
+    assert history.readings(2) == [] and len(history) == 1
+
+
+def test_rate_uses_only_the_readings_of_the_window(vehicle):
+    # 10 km/jour sur la fenêtre ; le relevé plus ancien (à 0 km) la fausserait
+    history = history_of(vehicle.id, [
+        (RATE_WINDOW_DAYS + 200, 0), (RATE_WINDOW_DAYS, 16000), (100, 18650), (0, 19650),
+    ])
+
+    (rate, revision_kms), single = projections(vehicle, history)
+
+    assert rate == pytest.approx(10.0)
+    # 33 000 km à atteindre depuis 19 650 km, à 10 km/jour
+    assert revision_kms == TODAY + timedelta(days=1335)
+    assert single == (pytest.approx(rate), revision_kms)
+
+
+def test_short_span_falls_back_to_the_lifetime_rate(vehicle):
+    # Relevés sur moins de MIN_RATE_SPAN_DAYS jours : pas de rythme estimé sur l'historique
+    history = history_of(vehicle.id, [(MIN_RATE_SPAN_DAYS - 1, 19000), (0, 20000)])
+
+    (rate, _), single = projections(vehicle, history)
+
+    # Repli : 20 000 km depuis la mise en service, au dernier relevé
+    assert rate == pytest.approx(20.0)
+    assert single[0] == pytest.approx(rate)
+
+    history.add(vehicle.id, TODAY - timedelta(days=MIN_RATE_SPAN_DAYS), 19000)
+    (rate, _), single = projections(vehicle, history)
+    assert rate == pytest.approx(1000 / MIN_RATE_SPAN_DAYS)
+    assert single[0] == pytest.approx(rate)
+
+
+def test_lower_reading_is_not_a_rate(vehicle):
+    # Compteur remplacé : kilométrage en baisse sur la fenêtre, rythme depuis la mise en service
+    history = history_of(vehicle.id, [(60, 30000), (0, 20000)])
+
+    (rate, _), single = projections(vehicle, history)
+
+    assert rate == pytest.approx(20.0)
+    assert single[0] == pytest.approx(rate)
+
+
+def test_fleet_projection_matches_the_vehicle_projection():
+    vehicles = list(generate_fleet(200, reference=TODAY))
+    history = OdometerHistory()
+    for vehicle in vehicles[::3]:
+        for days_ago in (200, 90, 7):
+            history.add(vehicle.id, TODAY - timedelta(days=days_ago), vehicle.releve_kms - days_ago * (vehicle.id % 40))
+
+    fleet = project_fleet(FleetColumns.from_vehicles(vehicles), history)
+
+    for position, vehicle in enumerate(vehicles):
+        rate, revision_kms = project_vehicle(vehicle, history)
+        expected = fleet.row(position)[0]
+        assert (rate is None) == (expected is None)
+        if rate is not None:
+            assert rate == pytest.approx(expected)
+        assert revision_kms == (None if np.isnat(fleet.revision_kms_date[position])
+                                else fleet.revision_kms_date[position].astype(date))
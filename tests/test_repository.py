@@ -0,0 +1,10 @@
+"""
+Lectures groupées du dépôt.
+"""
+
+
+def test_get_vehicles_skips_unknown_ids(repository):
+    repository.delete_vehicle(2)
+    vehicles = repository.get_vehicles([1, 2, 3, 999])
+    assert sorted(vehicles) == [1, 3]
+    assert vehicles[3] == repository.get_vehicle(3)
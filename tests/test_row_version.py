@@ -0,0 +1,37 @@
+"""
+Contrôle de version des lignes : une modification faite sur une lecture
+dépassée est refusée, dans un même dépôt comme entre deux processus.
+"""
+import pytest
+
+from carlogix.core import StaleVehicleError, VehicleRepository
+from helpers import edited
+
+
+def test_update_with_stale_row_version_is_refused(fleet_db, repository):
+    read = repository.get_vehicle(1)
+    repository.update_vehicle(edited(read, utilisateur="Première"))
+    assert repository.get_vehicle(1).row_version == read.row_version + 1
+
+    # Modification faite sur une lecture antérieure à la précédente
+    with pytest.raises(StaleVehicleError) as error:
+        repository.update_vehicle(edited(read, utilisateur="Seconde"))
+    assert error.value.vehicle_id == 1
+    assert repository.get_vehicle(1).utilisateur == "Première"
+
+    # Même contrôle entre deux dépôts (deux processus) sur la même base
+    other = VehicleRepository(db_path=fleet_db, xlsx_path=None)
+    try:
+        current = repository.get_vehicle(1)
+        other.update_vehicle(edited(other.get_vehicle(1), utilisateur="Autre"))
+        with pytest.raises(StaleVehicleError):
+            repository.update_vehicle(edited(current, utilisateur="Perdue"))
+        other.delete_vehicle(1)
+        with pytest.raises(StaleVehicleError):
+            repository.update_vehicle(edited(current, utilisateur="Perdue"))
+    finally:
+        other.close()
+
+    # Sans row_version, la modification est appliquée sans contrôle
+    repository.update_vehicle(edited(repository.get_vehicle(2), utilisateur="Forcée", row_version=None))
+    assert repository.get_vehicle(2).utilisateur == "Forcée"
@@ -0,0 +1,63 @@
+"""
+Index de recherche de la barre d'application : mêmes résultats que la
+recherche linéaire (VehicleSearchIndex.matches), y compris après des ajouts,
+modifications et suppressions.
+"""
+import random
+from dataclasses import replace
+
+import pytest
+
+from carlogix.core.search import VehicleSearchIndex
+from synthetic_fleet import generate_fleet
+
+
+@pytest.fixture(scope="module")
+def vehicles():
+    return list(generate_fleet(300))
+
+
+def linear_search(vehicles, text):
+    return sorted(vehicle.id for vehicle in vehicles if VehicleSearchIndex.matches(vehicle, text))
+
+
+def queries(vehicles, count=200, seed=0):
+    # Sous-chaînes prises dans le texte recherché : à cheval sur deux mots ou
+    # deux champs, courtes (moins d'un trigramme), avec espaces et majuscules
+    rng = random.Random(seed)
+    fixed = ["", " ", "a", "EL", "peugeot", "GEOT 2", "  ", "zzz", "ab-", "-1"]
+    texts = [VehicleSearchIndex.text_of(vehicle) for vehicle in vehicles]
+    for _ in range(count):
+        text = rng.choice(texts)
+        start = rng.randrange(len(text))
+        query = text[start:start + rng.randint(1, 12)]
+        fixed.append(query.upper() if rng.random() < 0.3 else query)
+    return fixed
+
+
+def test_search_matches_the_linear_scan(vehicles):
+    index = VehicleSearchIndex(vehicles)
+    for query in queries(vehicles):
+        assert index.search(query) == linear_search(vehicles, query), query
+
+
+def test_incremental_updates_match_the_linear_scan(vehicles):
+    index = VehicleSearchIndex(vehicles[:250])
+    current = {vehicle.id: vehicle for vehicle in vehicles[:250]}
+    for vehicle in vehicles[250:]:
+        index.add(vehicle)
+        current[vehicle.id] = vehicle
+    for vehicle in vehicles[:100:3]:
+        changed = replace(vehicle, utilisateur="Zoé NOUVELLE", marque=None, site=vehicle.site.lower())
+        index.update(changed)
+        current[vehicle.id] = changed
+    for vehicle in vehicles[1:100:3]:
+        index.remove(vehicle.id)
+        del current[vehicle.id]
+    index.remove(10_000)
+
+    fleet = list(current.values())
+    for query in queries(vehicles, seed=1) + ["zoé", "nouvelle", "é nou", vehicles[0].marque]:
+        assert index.search(query) == linear_search(fleet, query), query
+    # Les mots qui n'apparaissent plus ne restent pas dans l'index
+    assert index.search(vehicles[1].immatriculation) == []
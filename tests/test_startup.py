@@ -0,0 +1,22 @@
+"""
+Démarrage : budget du premier affichage et imports différés, mesurés comme
+benchmarks/startup_benchmark.py --check, dans un nouvel interpréteur.
+"""
+from startup_benchmark import STARTUP_BUDGET, run_child, run_core_import
+
+
+def test_first_paint_within_budget(fleet_db):
+    # Meilleur de trois démarrages, comme le benchmark : le premier paie le cache disque
+    runs = [run_child(fleet_db) for _ in range(3)]
+    paint = min(run[0] for run in runs)
+    assert paint <= STARTUP_BUDGET, f"premier affichage en {paint:.2f} s"
+
+
+def test_no_heavy_module_before_first_paint(fleet_db):
+    _, _, loaded, _ = run_child(fleet_db)
+    assert loaded == []
+
+
+def test_core_import_loads_neither_flet_nor_heavy_modules():
+    _, loaded = run_core_import()
+    assert loaded == []
@@ -0,0 +1,81 @@
+"""
+Ingestion des flux de relevés kilométriques : relevés retenus, reculs du
+compteur, plaques inconnues, et commande python -m carlogix releves.
+"""
+import csv
+from datetime import date, timedelta
+
+from carlogix.__main__ import main
+from carlogix.core import ingest_odometer_feed
+
+
+def write_feed(path, rows) -> str:
+    with open(path, "w", newline="", encoding="utf-8") as feed:
+        writer = csv.writer(feed)
+        writer.writerow(["immatriculation", "horodatage", "kms"])
+        writer.writerows(rows)
+    return str(path)
+
+
+def test_feed_applies_latest_reading_and_reports_rollbacks_and_unknown_plates(repository, tmp_path):
+    today = date.today().isoformat()
+    first, second, third = (repository.get_vehicle(vehicle_id) for vehicle_id in (1, 2, 3))
+    feed = write_feed(tmp_path / "flux.csv", [
+        (first.immatriculation, f"{today}T08:00:00", first.releve_kms + 120),
+        # Plus récent mais inférieur au relevé de 8 h : recul du compteur
+        (first.immatriculation, f"{today}T09:00:00", first.releve_kms + 50),
+        # Inférieur au relevé enregistré le même jour (daté au jour près) : ignoré
+        (second.immatriculation, f"{today}T10:00:00", second.releve_kms - 10),
+        # Antérieur au relevé enregistré mais plus élevé : le compteur a reculé depuis
+        (second.immatriculation, (date.today() - timedelta(days=1)).isoformat(), second.releve_kms + 500),
+        # Plaque écrite autrement (minuscules, sans tirets) : même véhicule
+        (third.immatriculation.lower().replace("-", ""), f"{today}T11:00:00", third.releve_kms + 5),
+        ("ZZ-999-ZZ", f"{today}T12:00:00", 1000),
+        (first.immatriculation, "pas une date", 5),
+    ])
+
+    report = ingest_odometer_feed(repository, feed, chunk_size=2)
+
+    assert (report.rows, report.applied, report.invalid_rows) == (7, 2, 1)
+    assert (report.unknown_rows, report.unknown_plates) == (1, ["ZZ-999-ZZ"])
+    assert (report.rollback_rows, report.ignored_rows) == (2, 1)
+    assert sorted(report.rollbacks) == sorted([
+        (first.immatriculation, date.today(), first.releve_kms + 50, first.releve_kms + 120),
+        (second.immatriculation, date.today() - timedelta(days=1), second.releve_kms + 500, second.releve_kms),
+    ])
+    assert repository.get_vehicle(1).releve_kms == first.releve_kms + 120
+    assert repository.get_vehicle(2).releve_kms == second.releve_kms
+    assert repository.get_vehicle(3).releve_kms == third.releve_kms + 5
+    latest = repository.odometer_readings(1)[-1]
+    assert (latest.date, latest.kms) == (date.today(), first.releve_kms + 120)
+
+    # Relevés déjà enregistrés : un second passage n'écrit rien
+    again = ingest_odometer_feed(repository, feed)
+    assert again.applied == 0
+
+
+def test_dry_run_writes_nothing(repository, tmp_path):
+    vehicle = repository.get_vehicle(1)
+    feed = write_feed(tmp_path / "flux.csv", [(vehicle.immatriculation, date.today().isoformat(), vehicle.releve_kms + 1)])
+
+    report = ingest_odometer_feed(repository, feed, dry_run=True)
+
+    assert report.applied == 1
+    assert repository.get_vehicle(1).releve_kms == vehicle.releve_kms
+    assert repository.get_vehicle(1).row_version == vehicle.row_version
+
+
+def test_command_refuses_a_missing_database(tmp_path, capsys):
+    feed = write_feed(tmp_path / "flux.csv", [])
+    db_path = tmp_path / "absente.db"
+
+    assert main(["releves", feed, "--db", str(db_path)]) == 1
+    assert "introuvable" in capsys.readouterr().err
+    assert not db_path.exists()
+
+
+def test_command_ingests_a_feed(fleet_db, tmp_path, capsys):
+    feed = write_feed(tmp_path / "flux.csv", [("ZZ-999-ZZ", date.today().isoformat(), 1000)])
+
+    assert main(["releves", feed, "--db", fleet_db]) == 0
+    assert "ZZ-999-ZZ" in capsys.readouterr().out
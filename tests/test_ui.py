@@ -0,0 +1,55 @@
+"""
+VehicleManagementApp sans navigateur (HeadlessPage) : alertes C.T et
+statistiques du tableau de bord après une écriture, pages de la liste des
+véhicules.
+"""
+from dataclasses import asdict
+from datetime import date, timedelta
+
+from benchmark_suite import HeadlessPage
+from CarLogix import VehicleManagementApp
+from carlogix.core import VehicleModel
+
+
+def set_prochain_ct(repository, vehicle_id: int, days: int):
+    values = asdict(repository.get_vehicle(vehicle_id))
+    values["prochain_ct"] = date.today() + timedelta(days=days)
+    repository.update_vehicle(VehicleModel(**values))
+
+
+def test_ct_messages(repository):
+    for vehicle_id, days in ((1, 0), (2, -3), (3, 4)):
+        set_prochain_ct(repository, vehicle_id, days)
+    app = VehicleManagementApp(HeadlessPage(), repository)
+
+    messages = {info[0].id: info[3] for info in app.calculate_ct_info()}
+
+    assert messages[1] == "C.T à passer aujourd'hui"
+    assert messages[2] == "C.T périmé depuis 3 jours"
+    assert messages[3] == "C.T valide pour encore 4 jours"
+
+
+def test_fleet_snapshot_follows_writes(repository):
+    app = VehicleManagementApp(HeadlessPage(), repository)
+    snapshot = app.fleet_snapshot()
+    assert app.fleet_snapshot() is snapshot
+
+    repository.delete_vehicle(1)
+    assert app.fleet_snapshot().total_vehicles == snapshot.total_vehicles - 1
+
+    # Cache abandonné (import en échec, écriture d'un autre processus) : recalculé aussi
+    snapshot = app.fleet_snapshot()
+    repository.invalidate_cache()
+    assert app.fleet_snapshot() is not snapshot
+
+
+def test_vehicle_pages_stay_under_the_update_size(repository):
+    app = VehicleManagementApp(HeadlessPage(), repository)
+    app.VEHICLES_PAGE_SIZE = 20
+    app.update_vehicles_list()
+    assert app.window_end == 20 and app.bytes_per_card
+
+    # Message limité à 5 cartes : les pages suivantes sont réduites d'autant
+    app.MAX_PAGE_UPDATE_BYTES = 5 * app.bytes_per_card
+    app._append_vehicles_page()
+    assert app.window_end == 25
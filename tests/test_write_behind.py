@@ -0,0 +1,41 @@
+"""
+Mode write-behind : écritures appliquées en mémoire, enregistrées par lots.
+"""
+from carlogix.core import VehicleRepository
+from helpers import edited, new_vehicle, stored_count
+
+
+def test_write_behind_keeps_writes_in_memory_until_flush(fleet_db):
+    repository = VehicleRepository(db_path=fleet_db, xlsx_path=None, write_behind=True,
+                                   flush_interval=60, flush_threshold=100)
+    try:
+        vehicle = repository.get_vehicle(1)
+        repository.update_vehicle(edited(vehicle, utilisateur="Camille"))
+        new_id = repository.add_vehicle(new_vehicle(vehicle, "ZZ-001-ZZ"))
+        repository.delete_vehicle(2)
+
+        # Le dépôt voit ses écritures, la base pas encore
+        assert repository.get_vehicle(1).utilisateur == "Camille"
+        assert repository.get_vehicle(new_id).immatriculation == "ZZ-001-ZZ"
+        assert repository.get_vehicle(2) is None
+        assert stored_count(fleet_db, "SELECT COUNT(*) FROM vehicles WHERE id = ?", new_id) == 0
+        assert stored_count(fleet_db, "SELECT COUNT(*) FROM vehicles WHERE id = 2") == 1
+
+        assert repository.flush() == 3
+        assert repository.flush() == 0
+        assert stored_count(fleet_db, "SELECT COUNT(*) FROM vehicles WHERE id = 1 AND utilisateur = 'Camille'") == 1
+        assert stored_count(fleet_db, "SELECT COUNT(*) FROM vehicles WHERE id = ?", new_id) == 1
+        assert stored_count(fleet_db, "SELECT COUNT(*) FROM vehicles WHERE id = 2") == 0
+    finally:
+        repository.close()
+
+
+def test_write_behind_flushes_at_threshold_and_on_close(fleet_db):
+    repository = VehicleRepository(db_path=fleet_db, xlsx_path=None, write_behind=True,
+                                   flush_interval=60, flush_threshold=2)
+    repository.delete_vehicle(1)
+    repository.delete_vehicle(2)
+    repository.delete_vehicle(3)
+    assert stored_count(fleet_db, "SELECT COUNT(*) FROM vehicles WHERE id IN (1, 2, 3)") == 1
+    repository.close()
+    assert stored_count(fleet_db, "SELECT COUNT(*) FROM vehicles WHERE id IN (1, 2, 3)") == 0